@@ -0,0 +1,89 @@
+"""float coordinates on buoy_location
+
+Revision ID: buoy_coordinates_20261017
+Revises: place_neighbor_20261017
+Create Date: 2026-10-17
+
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'buoy_coordinates_20261017'
+down_revision = 'place_neighbor_20261017'
+branch_labels = None
+depends_on = None
+
+RTREE = 'buoy_location_rtree'
+
+
+# frozen copy of BuoyLocation.parse_location as of this revision
+LOCATION_PATTERN = r'([+-]?\d+(?:\.\d+)?)\s*([NS])[, ]+([+-]?\d+(?:\.\d+)?)\s*([EW])'
+
+
+def _parse_location(location):
+    """Parse buoy location text such as '34.5 N 120.5 W' to (longitude, latitude)"""
+    match = re.search(LOCATION_PATTERN, (location or '').strip().replace(',', ' '))
+    if not match:
+        raise ValueError(f'Invalid location format: {location}')
+    lat, lat_dir, lng, lng_dir = match.groups()
+    lat = float(lat) * (-1 if lat_dir.upper() == 'S' else 1)
+    lng = float(lng) * (-1 if lng_dir.upper() == 'W' else 1)
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValueError('Latitude or longitude out of range')
+    return lng, lat
+
+
+def upgrade():
+    # add_column rather than batch_alter_table so sqlite keeps the table (and its R*Tree rows)
+    op.add_column('buoy_location', sa.Column('latitude', sa.Float(), nullable=True))
+    op.add_column('buoy_location', sa.Column('longitude', sa.Float(), nullable=True))
+
+    bind = op.get_bind()
+    for row in bind.execute(sa.text('SELECT id, location_id, location FROM buoy_location')).all():
+        try:
+            lng, lat = _parse_location(row.location)
+        except ValueError:
+            print(f'buoy {row.location_id} has an unparseable location {row.location!r}, leaving coordinates empty')
+            continue
+        bind.execute(
+            sa.text('UPDATE buoy_location SET latitude = :lat, longitude = :lng WHERE id = :id'),
+            {'id': row.id, 'lat': lat, 'lng': lng},
+        )
+
+    if bind.dialect.name != 'sqlite':
+        return
+
+    # the R*Tree was synced from app code while coordinates were text; hand it to triggers now
+    op.execute(f'''CREATE TRIGGER IF NOT EXISTS {RTREE}_insert AFTER INSERT ON buoy_location
+        WHEN new.latitude IS NOT NULL AND new.longitude IS NOT NULL
+        BEGIN
+            INSERT OR REPLACE INTO {RTREE} VALUES (new.id, new.latitude, new.latitude, new.longitude, new.longitude);
+        END''')
+    op.execute(f'''CREATE TRIGGER IF NOT EXISTS {RTREE}_update AFTER UPDATE OF latitude, longitude ON buoy_location
+        BEGIN
+            DELETE FROM {RTREE} WHERE id = old.id;
+            INSERT INTO {RTREE} SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude
+            WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL;
+        END''')
+    op.execute(f'''CREATE TRIGGER IF NOT EXISTS {RTREE}_delete AFTER DELETE ON buoy_location
+        BEGIN
+            DELETE FROM {RTREE} WHERE id = old.id;
+        END''')
+    op.execute(f'DELETE FROM {RTREE}')
+    op.execute(
+        f'INSERT INTO {RTREE} SELECT id, latitude, latitude, longitude, longitude FROM buoy_location '
+        'WHERE latitude IS NOT NULL AND longitude IS NOT NULL'
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        for event in ('insert', 'update', 'delete'):
+            op.execute(f'DROP TRIGGER IF EXISTS {RTREE}_{event}')
+
+    with op.batch_alter_table('buoy_location') as batch_op:
+        batch_op.drop_column('longitude')
+        batch_op.drop_column('latitude')
@@ -0,0 +1,147 @@
+"""along-coast ordering on spot_location
+
+Revision ID: coast_order_20261017
+Revises: buoy_coordinates_20261017
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import numpy as np
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'coast_order_20261017'
+down_revision = 'buoy_coordinates_20261017'
+branch_labels = None
+depends_on = None
+
+# frozen copy of app.services.coast_order.compute_coast_order as of this revision
+EARTH_RADIUS_MILES = 3958.7613
+
+# spot_location R*Tree sync triggers as of this revision
+SPOT_RTREE_TRIGGERS = [
+    '''CREATE TRIGGER IF NOT EXISTS spot_location_rtree_insert AFTER INSERT ON spot_location
+    WHEN new.latitude IS NOT NULL AND new.longitude IS NOT NULL
+    BEGIN
+        INSERT OR REPLACE INTO spot_location_rtree VALUES (new.id, new.latitude, new.latitude, new.longitude, new.longitude);
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS spot_location_rtree_update AFTER UPDATE OF latitude, longitude ON spot_location
+    BEGIN
+        DELETE FROM spot_location_rtree WHERE id = old.id;
+        INSERT INTO spot_location_rtree SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude
+        WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL;
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS spot_location_rtree_delete AFTER DELETE ON spot_location
+    BEGIN
+        DELETE FROM spot_location_rtree WHERE id = old.id;
+    END''',
+]
+
+
+def _haversine_miles(latitudes, longitudes, target_latitudes, target_longitudes):
+    """Pairwise haversine distances in miles as a (points x targets) matrix"""
+    lat1 = np.radians(np.asarray(latitudes, dtype=float))[:, None]
+    lng1 = np.radians(np.asarray(longitudes, dtype=float))[:, None]
+    lat2 = np.radians(np.asarray(target_latitudes, dtype=float))[None, :]
+    lng2 = np.radians(np.asarray(target_longitudes, dtype=float))[None, :]
+    a = np.sin((lat2 - lat1) / 2.0) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2.0) ** 2
+    return 2.0 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _step_miles(lats, lngs):
+    """Great-circle miles between each consecutive pair of points"""
+    lat1, lat2 = np.radians(lats[:-1]), np.radians(lats[1:])
+    dlat = lat2 - lat1
+    dlng = np.radians(lngs[1:] - lngs[:-1])
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _axis_order(records):
+    """Order one subregion's spots along the principal axis of their coordinates"""
+    if len(records) < 3:
+        return sorted(records, key=lambda r: (-r['latitude'], r['longitude']))
+    lats = np.array([r['latitude'] for r in records])
+    lngs = np.array([r['longitude'] for r in records])
+    xy = np.column_stack((lats - lats.mean(), (lngs - lngs.mean()) * np.cos(np.radians(lats.mean()))))
+    _, _, vt = np.linalg.svd(xy, full_matrices=False)
+    projection = xy @ vt[0]
+    return [records[i] for i in np.argsort(projection, kind='stable')]
+
+
+def _compute_coast_order(records):
+    """Spot id -> (coast_rank, coast_position in miles)"""
+    groups = {}
+    for record in records:
+        key = record.get('subregion_name') or f"spot:{record['id']}"
+        groups.setdefault(key, []).append(record)
+    if not groups:
+        return {}
+
+    ordered = {key: _axis_order(members) for key, members in groups.items()}
+    keys = list(ordered)
+    centroids = np.array([
+        [np.mean([r['latitude'] for r in ordered[key]]), np.mean([r['longitude'] for r in ordered[key]])]
+        for key in keys
+    ])
+
+    current = int(np.argmax(centroids[:, 0]))
+    chain = ordered[keys[current]]
+    if chain[0]['latitude'] < chain[-1]['latitude']:
+        chain.reverse()
+    remaining = set(range(len(keys))) - {current}
+    sequence = list(chain)
+
+    while remaining:
+        tail = sequence[-1]
+        candidates = sorted(remaining)
+        gaps = _haversine_miles([tail['latitude']], [tail['longitude']], centroids[candidates, 0], centroids[candidates, 1])[0]
+        current = candidates[int(np.argmin(gaps))]
+        remaining.discard(current)
+        chain = ordered[keys[current]]
+        ends = _haversine_miles(
+            [tail['latitude']], [tail['longitude']],
+            [chain[0]['latitude'], chain[-1]['latitude']], [chain[0]['longitude'], chain[-1]['longitude']],
+        )[0]
+        if ends[1] < ends[0]:
+            chain = chain[::-1]
+        sequence.extend(chain)
+
+    lats = np.array([r['latitude'] for r in sequence])
+    lngs = np.array([r['longitude'] for r in sequence])
+    positions = np.concatenate(([0.0], np.cumsum(_step_miles(lats, lngs))))
+    return {record['id']: (rank, float(position)) for rank, (record, position) in enumerate(zip(sequence, positions))}
+
+
+def upgrade():
+    # add_column rather than batch_alter_table so sqlite keeps the spot_location R*Tree triggers
+    op.add_column('spot_location', sa.Column('coast_rank', sa.Integer(), nullable=True))
+    op.add_column('spot_location', sa.Column('coast_position', sa.Float(), nullable=True))
+    op.create_index('ix_spot_location_coast_rank', 'spot_location', ['coast_rank'])
+
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(
+        'SELECT id, subregion_name, latitude, longitude FROM spot_location '
+        'WHERE latitude IS NOT NULL AND longitude IS NOT NULL'
+    )).all()
+    order = _compute_coast_order([
+        {'id': row.id, 'subregion_name': row.subregion_name, 'latitude': float(row.latitude), 'longitude': float(row.longitude)}
+        for row in rows
+    ])
+    for spot_id, (rank, position) in order.items():
+        bind.execute(
+            sa.text('UPDATE spot_location SET coast_rank = :rank, coast_position = :position WHERE id = :id'),
+            {'id': spot_id, 'rank': rank, 'position': position},
+        )
+
+
+def downgrade():
+    op.drop_index('ix_spot_location_coast_rank', table_name='spot_location')
+    with op.batch_alter_table('spot_location') as batch_op:
+        batch_op.drop_column('coast_position')
+        batch_op.drop_column('coast_rank')
+
+    # batch mode recreates spot_location on sqlite, which drops its R*Tree triggers
+    if op.get_bind().dialect.name == 'sqlite':
+        for statement in SPOT_RTREE_TRIGGERS:
+            op.execute(statement)
@@ -0,0 +1,37 @@
+"""create place_neighbor table
+
+Revision ID: place_neighbor_20261017
+Revises: spatial_rtree_20261017
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'place_neighbor_20261017'
+down_revision = 'spatial_rtree_20261017'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'place_neighbor',
+        sa.Column('id', sa.Integer, primary_key=True, nullable=False),
+        sa.Column('source_type', sa.String, nullable=False),
+        sa.Column('source_id', sa.String, nullable=False),
+        sa.Column('neighbor_type', sa.String, nullable=False),
+        sa.Column('neighbor_id', sa.String, nullable=False),
+        sa.Column('neighbor_name', sa.String, nullable=True),
+        sa.Column('rank', sa.Integer, nullable=False),
+        sa.Column('distance', sa.Float, nullable=False),
+        sa.Column('bearing', sa.Float, nullable=False),
+        sa.Column('date_updated', sa.TIMESTAMP(timezone=False), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index('ix_place_neighbor_source', 'place_neighbor', ['source_type', 'source_id', 'neighbor_type', 'rank'])
+    op.create_index('ix_place_neighbor_neighbor', 'place_neighbor', ['neighbor_type', 'neighbor_id'])
+
+def downgrade():
+    op.drop_index('ix_place_neighbor_neighbor', table_name='place_neighbor')
+    op.drop_index('ix_place_neighbor_source', table_name='place_neighbor')
+    op.drop_table('place_neighbor')
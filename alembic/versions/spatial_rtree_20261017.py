@@ -0,0 +1,104 @@
+"""float coordinates and R*Tree spatial index
+
+Revision ID: spatial_rtree_20261017
+Revises: spot_accuracy_rating_20250918
+Create Date: 2026-10-17
+
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'spatial_rtree_20261017'
+down_revision = 'spot_accuracy_rating_20250918'
+branch_labels = None
+depends_on = None
+
+RTREE_TABLES = ['spot_location_rtree', 'buoy_location_rtree', 'tide_stations_rtree']
+TRIGGER_SYNCED_TABLES = {
+    'spot_location': 'spot_location_rtree',
+    'tide_stations': 'tide_stations_rtree',
+}
+
+
+# frozen copy of BuoyLocation.parse_location as of this revision
+LOCATION_PATTERN = r'([+-]?\d+(?:\.\d+)?)\s*([NS])[, ]+([+-]?\d+(?:\.\d+)?)\s*([EW])'
+
+
+def _parse_location(location):
+    """Parse buoy location text such as '34.5 N 120.5 W' to (longitude, latitude)"""
+    match = re.search(LOCATION_PATTERN, (location or '').strip().replace(',', ' '))
+    if not match:
+        raise ValueError(f'Invalid location format: {location}')
+    lat, lat_dir, lng, lng_dir = match.groups()
+    lat = float(lat) * (-1 if lat_dir.upper() == 'S' else 1)
+    lng = float(lng) * (-1 if lng_dir.upper() == 'W' else 1)
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValueError('Latitude or longitude out of range')
+    return lng, lat
+
+
+def _alter_coordinates(table_name, from_type, to_type, using=None):
+    with op.batch_alter_table(table_name) as batch_op:
+        for column in ('latitude', 'longitude'):
+            kwargs = {'postgresql_using': f'{column}::{using}'} if using else {}
+            batch_op.alter_column(column, existing_type=from_type, type_=to_type, **kwargs)
+
+
+def upgrade():
+    _alter_coordinates('spot_location', sa.String(), sa.Float(), using='double precision')
+    _alter_coordinates('tide_stations', sa.String(), sa.Float(), using='double precision')
+
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return
+
+    for table in RTREE_TABLES:
+        op.execute(f'CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING rtree(id, min_lat, max_lat, min_lng, max_lng)')
+
+    for source, rtree in TRIGGER_SYNCED_TABLES.items():
+        op.execute(f'''CREATE TRIGGER IF NOT EXISTS {rtree}_insert AFTER INSERT ON {source}
+            WHEN new.latitude IS NOT NULL AND new.longitude IS NOT NULL
+            BEGIN
+                INSERT OR REPLACE INTO {rtree} VALUES (new.id, new.latitude, new.latitude, new.longitude, new.longitude);
+            END''')
+        op.execute(f'''CREATE TRIGGER IF NOT EXISTS {rtree}_update AFTER UPDATE OF latitude, longitude ON {source}
+            BEGIN
+                DELETE FROM {rtree} WHERE id = old.id;
+                INSERT INTO {rtree} SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude
+                WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL;
+            END''')
+        op.execute(f'''CREATE TRIGGER IF NOT EXISTS {rtree}_delete AFTER DELETE ON {source}
+            BEGIN
+                DELETE FROM {rtree} WHERE id = old.id;
+            END''')
+        op.execute(
+            f'INSERT OR REPLACE INTO {rtree} SELECT id, latitude, latitude, longitude, longitude FROM {source} '
+            'WHERE latitude IS NOT NULL AND longitude IS NOT NULL'
+        )
+
+    # buoy coordinates are free text, parse them once here
+    for row in bind.execute(sa.text('SELECT id, location FROM buoy_location')).all():
+        try:
+            lng, lat = _parse_location(row.location)
+        except ValueError:
+            continue
+        bind.execute(
+            sa.text('INSERT OR REPLACE INTO buoy_location_rtree VALUES (:id, :lat, :lat, :lng, :lng)'),
+            {'id': row.id, 'lat': lat, 'lng': lng},
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        for rtree in TRIGGER_SYNCED_TABLES.values():
+            for event in ('insert', 'update', 'delete'):
+                op.execute(f'DROP TRIGGER IF EXISTS {rtree}_{event}')
+        for table in RTREE_TABLES:
+            op.execute(f'DROP TABLE IF EXISTS {table}')
+
+    _alter_coordinates('tide_stations', sa.Float(), sa.String(), using='text')
+    _alter_coordinates('spot_location', sa.Float(), sa.String(), using='text')
@@ -0,0 +1,30 @@
+"""create tide_prediction table
+
+Revision ID: tide_prediction_20261017
+Revises: coast_order_20261017
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'tide_prediction_20261017'
+down_revision = 'coast_order_20261017'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'tide_prediction',
+        sa.Column('id', sa.Integer, primary_key=True, nullable=False),
+        sa.Column('station_id', sa.String, nullable=False),
+        sa.Column('interval', sa.String, nullable=False),
+        sa.Column('time', sa.DateTime, nullable=False),
+        sa.Column('height', sa.Float, nullable=False),
+        sa.Column('type', sa.String(1), nullable=True),
+        sa.UniqueConstraint('station_id', 'interval', 'time', name='uq_tide_prediction_station_time'),
+    )
+
+def downgrade():
+    op.drop_table('tide_prediction')
@@ -1,6 +1,6 @@
 import pandas as pd
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Optional
 import re
 
 class BuoyData:
@@ -44,6 +44,8 @@ class BuoyLocation:
     name: str
     url: str
     description: str
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
 
     def parse_location(self) -> list[float]:
         """
@@ -68,13 +70,25 @@ class BuoyLocation:
 
         return [lon, lat]  # GeoJSON: [longitude, latitude]
 
+    def coordinates(self) -> list[float]:
+        """
+        The stored [longitude, latitude], parsing the location string only if they are unset.
+        Returns:
+            [longitude, latitude]
+        Raises:
+            ValueError: if there are no stored coordinates and the location can't be parsed.
+        """
+        if self.latitude is not None and self.longitude is not None:
+            return [self.longitude, self.latitude]
+        return self.parse_location()
+
     def get_geojson(self) -> dict:
         """
         Return a GeoJSON feature for this buoy location.
         Returns:
             dict: GeoJSON feature representation of the buoy location.
         """
-        latlng = self.parse_location()
+        latlng = self.coordinates()
         feature_object = {
             "type": "Feature",
             "geometry": {
@@ -97,7 +111,8 @@ class BuoyLocation:
         """
         Instantiate a BuoyLocation from an object with matching attributes.
         Args:
-            buoy_location (Any): An object with location, location_id, name, url, and description attributes.
+            buoy_location (Any): An object with location, location_id, name, url, and description attributes,
+                and optionally latitude and longitude.
         Returns:
             BuoyLocation: An instance of the dataclass.
         """
@@ -106,5 +121,7 @@ class BuoyLocation:
             location_id=buoy_location.location_id,
             name=buoy_location.name,
             url=buoy_location.url,
-            description=buoy_location.description
+            description=buoy_location.description,
+            latitude=getattr(buoy_location, "latitude", None),
+            longitude=getattr(buoy_location, "longitude", None)
         )
\ No newline at end of file
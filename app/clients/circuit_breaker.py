@@ -0,0 +1,244 @@
+"""
+Circuit Breaker
+
+One breaker per upstream host, wrapped around the pooled client's transport,
+so every upstream call made through the pool is measured and guarded.
+
+Each breaker keeps a rolling window of outcomes and response latencies. The
+read timeout for the next request is derived from the observed p99 latency,
+so a host that normally answers in 300 ms is not waited on for the full
+configured timeout. After repeated failures, or a high error rate over the
+window, the breaker opens and calls fail fast with CircuitOpenError instead of
+waiting on a struggling host. After a cool-down, one trial request is let
+through (half-open); its outcome closes or re-opens the breaker.
+
+Transport errors and 5xx responses count as failures; any other response
+means the host is up. The outcome and latency of a response are recorded when
+its body has been read, so a host that stalls or fails mid-body is counted.
+"""
+
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+import httpx
+import numpy as np
+
+from ..config import settings
+
+CLOSED: str = "closed"
+OPEN: str = "open"
+HALF_OPEN: str = "half_open"
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised instead of calling an upstream whose breaker is open"""
+
+
+class CircuitBreaker:
+    """Failure and latency tracking for one upstream host"""
+
+    def __init__(self, name: str, max_read_timeout: float):
+        self.name = name
+        self.max_read_timeout = max_read_timeout
+        self.state = CLOSED
+        self.opened_at: Optional[float] = None
+        self.consecutive_failures = 0
+        self.requests = 0
+        self.failures = 0
+        self.rejected = 0
+        self._outcomes: Deque[bool] = deque(maxlen=settings.circuit_window_size)
+        self._latencies: Deque[float] = deque(maxlen=settings.circuit_window_size)
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        """True if a request may go upstream now"""
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < settings.circuit_reset_seconds:
+                self.rejected += 1
+                return False
+            self.state = HALF_OPEN
+            self._trial_in_flight = False
+        if self.state == HALF_OPEN:
+            # let a single trial request probe the host
+            if self._trial_in_flight:
+                self.rejected += 1
+                return False
+            self._trial_in_flight = True
+        self.requests += 1
+        return True
+
+    def record_success(self, latency: float) -> None:
+        self._outcomes.append(True)
+        self._latencies.append(latency)
+        self.consecutive_failures = 0
+        self._trial_in_flight = False
+        if self.state == HALF_OPEN:
+            self.state = CLOSED
+            self.opened_at = None
+
+    def record_failure(self) -> None:
+        self._outcomes.append(False)
+        self.failures += 1
+        self.consecutive_failures += 1
+        self._trial_in_flight = False
+        if self.state == HALF_OPEN:
+            self._open()
+        elif self.consecutive_failures >= settings.circuit_failure_threshold:
+            self._open()
+        elif len(self._outcomes) >= settings.circuit_min_samples and self.error_rate() >= settings.circuit_error_rate_threshold:
+            self._open()
+
+    def release(self) -> None:
+        """Forget a request that ended without an outcome (e.g. it was cancelled)"""
+        self._trial_in_flight = False
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+
+    def reset(self) -> None:
+        """Close the breaker and clear its history"""
+        self.state = CLOSED
+        self.opened_at = None
+        self.consecutive_failures = 0
+        self._trial_in_flight = False
+        self._outcomes.clear()
+        self._latencies.clear()
+
+    def error_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def latency_percentile(self, q: float) -> Optional[float]:
+        if not self._latencies:
+            return None
+        return float(np.percentile(np.fromiter(self._latencies, dtype=float), q))
+
+    def read_timeout(self) -> float:
+        """Read timeout for the next request: a multiple of p99, within [min, configured]"""
+        if len(self._latencies) < settings.circuit_min_samples:
+            return self.max_read_timeout
+        p99 = self.latency_percentile(99)
+        return min(self.max_read_timeout, max(settings.circuit_min_read_timeout_seconds, p99 * settings.circuit_timeout_multiplier))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "open_for_seconds": None if self.opened_at is None else time.monotonic() - self.opened_at,
+            "requests": self.requests,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "consecutive_failures": self.consecutive_failures,
+            "error_rate": self.error_rate(),
+            "latency_p50": self.latency_percentile(50),
+            "latency_p95": self.latency_percentile(95),
+            "latency_p99": self.latency_percentile(99),
+            "read_timeout": self.read_timeout(),
+        }
+
+
+class _MeasuredStream(httpx.AsyncByteStream):
+    """Response body stream that records the request's outcome once the body is read"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, breaker: CircuitBreaker, started: float):
+        self._stream = stream
+        self._breaker: Optional[CircuitBreaker] = breaker
+        self._started = started
+        self._last_read = time.monotonic()
+
+    async def __aiter__(self):
+        try:
+            async for chunk in self._stream:
+                self._last_read = time.monotonic()
+                yield chunk
+        except Exception:
+            self._finish(ok=False)
+            raise
+        except BaseException:
+            self._finish(ok=None)
+            raise
+        self._finish(ok=True)
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            # closed before the end (a reader that stopped early): the host was answering
+            self._finish(ok=True)
+
+    def _finish(self, ok: Optional[bool]) -> None:
+        breaker, self._breaker = self._breaker, None
+        if breaker is None:
+            return
+        if ok is None:
+            breaker.release()
+        elif ok:
+            breaker.record_success(self._last_read - self._started)
+        else:
+            breaker.record_failure()
+
+
+class CircuitBreakerTransport(httpx.AsyncBaseTransport):
+    """Routes requests through a host's breaker and applies its adaptive read timeout"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, breaker: CircuitBreaker):
+        self._transport = transport
+        self.breaker = breaker
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.breaker.name} is unavailable, circuit open", request=request)
+        timeout = dict(request.extensions.get("timeout", {}))
+        timeout["read"] = min(timeout.get("read") or self.breaker.max_read_timeout, self.breaker.read_timeout())
+        request.extensions["timeout"] = timeout
+
+        started = time.monotonic()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            self.breaker.release()
+            raise
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+        elif response.is_closed:
+            # the body is already in memory
+            self.breaker.record_success(time.monotonic() - started)
+        else:
+            response.stream = _MeasuredStream(response.stream, self.breaker, started)
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class CircuitBreakerRegistry:
+    """One breaker per upstream host, kept across client rebuilds"""
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str, max_read_timeout: float) -> CircuitBreaker:
+        if name not in self._breakers:
+            self._breakers[name] = CircuitBreaker(name, max_read_timeout)
+        return self._breakers[name]
+
+    def reset(self, name: str) -> None:
+        """Close one host's breaker
+
+        Raises:
+            ValueError: If no breaker exists for that host
+        """
+        if name not in self._breakers:
+            raise ValueError(f"No circuit breaker for upstream {name}")
+        self._breakers[name].reset()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {name: breaker.snapshot() for name, breaker in self._breakers.items()}
+
+
+circuit_breakers = CircuitBreakerRegistry()
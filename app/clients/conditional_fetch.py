@@ -0,0 +1,116 @@
+"""
+Conditional Fetch
+
+Revalidating cache for NDBC's static data files (realtime2/{id}.txt,
+latest_obs/{id}.txt). For each URL it keeps the body, the parsed result and
+the ETag / Last-Modified validators. The next fetch sends If-None-Match /
+If-Modified-Since; on 304 Not Modified the stored parsed result is reused, so
+a repeat call costs one small round trip instead of a download and re-parse.
+
+Entries are kept least-recently-used first and evicted past max_entries.
+A caller that stops reading early stores its entry as partial; fetch() never
+revalidates a partial entry, since a 304 would serve the truncated body as the
+whole file.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+
+from ..config import settings
+
+
+@dataclass(frozen=True)
+class CachedFile:
+    """A fetched file, its parsed form and the validators to revalidate it"""
+    text: str
+    parsed: Any
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    # only the head of the file was read
+    partial: bool = False
+
+    def validators(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ConditionalFetcher:
+    """Per-URL cache of file bodies and parsed results, revalidated with conditional GETs"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedFile]" = OrderedDict()
+        self.revalidated = 0
+        self.downloaded = 0
+
+    async def fetch(self, client: httpx.AsyncClient, url: str, parse: Callable[[str], Any]) -> Any:
+        """
+        GET a file and return it parsed, reusing the stored parse when unchanged
+
+        Args:
+            client: Client to send the request with
+            url: File URL; also the cache key
+            parse: Turns the file body into the result to return and keep
+
+        Returns:
+            The parsed file
+
+        Raises:
+            httpx.HTTPError: On transport errors and error statuses, as client.get would
+        """
+        entry = self._entries.get(url)
+        if entry is not None and entry.partial:
+            entry = None
+        r = await client.get(url, headers=entry.validators() if entry else None)
+        if r.status_code == httpx.codes.NOT_MODIFIED and entry is not None:
+            return self.reuse(url)
+        r.raise_for_status()
+        return self.store(url, r, r.text, parse(r.text))
+
+    def entry(self, url: str) -> Optional[CachedFile]:
+        """The stored file for a URL, for callers that send their own conditional request"""
+        return self._entries.get(url)
+
+    def reuse(self, url: str) -> Any:
+        """Count a 304 for a stored URL and return its parsed result"""
+        self.revalidated += 1
+        self._entries.move_to_end(url)
+        return self._entries[url].parsed
+
+    def store(self, url: str, response: httpx.Response, text: str, parsed: Any, partial: bool = False) -> Any:
+        """Keep a downloaded body and its parse under the response's validators; returns parsed
+
+        Pass partial=True when text is only the head of the file.
+        """
+        self.downloaded += 1
+        etag, last_modified = response.headers.get("etag"), response.headers.get("last-modified")
+        # without a validator there is nothing to revalidate with
+        if etag or last_modified:
+            self._entries[url] = CachedFile(text, parsed, etag, last_modified, partial)
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.pop(url, None)
+        return parsed
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "chars": sum(len(entry.text) for entry in self._entries.values()),
+            "revalidated": self.revalidated,
+            "downloaded": self.downloaded,
+        }
+
+
+ndbc_files = ConditionalFetcher(settings.ndbc_file_cache_size)
@@ -0,0 +1,167 @@
+"""
+Host Limiter
+
+Caps how many requests are in flight to each upstream host at once, across
+every request the process is serving. Callers beyond the cap wait in a queue
+that is fair between requesters: waiting callers are grouped by owner (one
+API request, including all the fan-out it spawns) and freed slots go to the
+owners in turn. A 200-favourite batch therefore takes one slot per round
+alongside everyone else, instead of holding the host until it is done.
+
+The owner defaults to the current asyncio task; a handler that fans out
+across many tasks calls claim_upstream_owner() first so its tasks share one
+queue. A slot is held until the response body has been read or closed.
+"""
+
+import asyncio
+import contextvars
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, Hashable, Optional
+
+import httpx
+
+upstream_owner: contextvars.ContextVar = contextvars.ContextVar("upstream_owner", default=None)
+
+
+def claim_upstream_owner() -> object:
+    """Make every upstream call from this context (and tasks it spawns) queue as one owner"""
+    owner = object()
+    upstream_owner.set(owner)
+    return owner
+
+
+class FairLimiter:
+    """A concurrency limit whose waiters are served round-robin by owner"""
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+        self.in_use = 0
+        self.queued = 0
+        self.peak_queued = 0
+        self.acquired = 0
+        self.waited = 0
+        self._queues: "OrderedDict[Hashable, Deque[asyncio.Future]]" = OrderedDict()
+
+    async def acquire(self, owner: Hashable) -> None:
+        """Wait for a slot; release() must be called once it is no longer needed"""
+        if self.in_use < self.limit and not self.queued:
+            self.in_use += 1
+            self.acquired += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(owner, deque()).append(future)
+        self.queued += 1
+        self.waited += 1
+        self.peak_queued = max(self.peak_queued, self.queued)
+        try:
+            # release() hands its slot straight to us, so in_use is already counted
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            else:
+                self._discard(owner, future)
+            raise
+        self.acquired += 1
+
+    def release(self) -> None:
+        """Give a slot back, handing it to the next owner in turn if anyone is waiting"""
+        while self._queues:
+            owner, queue = next(iter(self._queues.items()))
+            future = queue.popleft()
+            self.queued -= 1
+            # the owner goes to the back of the line
+            if queue:
+                self._queues.move_to_end(owner)
+            else:
+                del self._queues[owner]
+            if not future.done() and not future.get_loop().is_closed():
+                future.set_result(None)
+                return
+        self.in_use -= 1
+
+    def _discard(self, owner: Hashable, future: asyncio.Future) -> None:
+        queue = self._queues.get(owner)
+        if queue is None or future not in queue:
+            return
+        queue.remove(future)
+        self.queued -= 1
+        if not queue:
+            del self._queues[owner]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "in_use": self.in_use,
+            "queued": self.queued,
+            "queued_owners": len(self._queues),
+            "peak_queued": self.peak_queued,
+            "saturation": (self.in_use + self.queued) / self.limit,
+            "acquired": self.acquired,
+            "waited": self.waited,
+        }
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body stream that frees the host slot when it is closed"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release: Optional[Callable[[], None]] = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            release, self._release = self._release, None
+            if release is not None:
+                release()
+
+
+class LimitedTransport(httpx.AsyncBaseTransport):
+    """Holds a host slot from sending a request until its body is closed"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, limiter: FairLimiter):
+        self._transport = transport
+        self.limiter = limiter
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        owner = upstream_owner.get() or asyncio.current_task()
+        await self.limiter.acquire(owner)
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            self.limiter.release()
+            raise
+        if response.is_closed:
+            # the body is already in memory
+            self.limiter.release()
+        else:
+            response.stream = _ReleasingStream(response.stream, self.limiter.release)
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class HostLimiterRegistry:
+    """One limiter per upstream host, shared by every client built for it"""
+
+    def __init__(self):
+        self._limiters: Dict[str, FairLimiter] = {}
+
+    def get(self, name: str, limit: int) -> FairLimiter:
+        if name not in self._limiters:
+            self._limiters[name] = FairLimiter(name, limit)
+        return self._limiters[name]
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {name: limiter.snapshot() for name, limiter in self._limiters.items()}
+
+
+host_limiters = HostLimiterRegistry()
@@ -0,0 +1,147 @@
+"""
+HTTP Pool
+
+One pooled httpx.AsyncClient per upstream host (NDBC, Open-Meteo, weather.gov
+and NOAA CO-OPS), so requests reuse kept-alive connections instead of paying
+DNS, TCP and TLS setup on every call.
+
+Each client's transport first waits for one of the host's concurrency slots
+(see host_limiter.py), then goes through the host's circuit breaker (see
+circuit_breaker.py), which adapts the read timeout and fails fast while the
+host is down.
+
+Clients are opened by the app lifespan and closed on shutdown. They are also
+created lazily on first use, so code running without the lifespan (scripts,
+tests) gets the same clients.
+"""
+
+import asyncio
+import importlib.util
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import httpx
+
+from ..config import settings
+from .circuit_breaker import CircuitBreakerTransport, circuit_breakers
+from .host_limiter import LimitedTransport, host_limiters
+
+NDBC: str = "ndbc"
+OPEN_METEO: str = "open_meteo"
+WEATHER_GOV: str = "weather_gov"
+COOPS: str = "coops"
+
+# HTTP/2 needs the optional h2 package; fall back to HTTP/1.1 without it
+HTTP2_AVAILABLE: bool = importlib.util.find_spec("h2") is not None
+USER_AGENT: str = "surfe-diem.com"
+
+
+@dataclass(frozen=True)
+class UpstreamHost:
+    """Connection settings for one upstream"""
+    base_url: str
+    connect_timeout: float
+    read_timeout: float
+    http2: bool = False
+    # requests in flight to this host at once, across the whole process
+    max_concurrency: int = 10
+
+    def timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(self.read_timeout, connect=self.connect_timeout, pool=self.connect_timeout)
+
+
+UPSTREAM_HOSTS: Dict[str, UpstreamHost] = {
+    # static files served over HTTP/1.1
+    NDBC: UpstreamHost("https://www.ndbc.noaa.gov", connect_timeout=3.0, read_timeout=5.0,
+                       max_concurrency=settings.ndbc_max_concurrency),
+    OPEN_METEO: UpstreamHost("https://marine-api.open-meteo.com", connect_timeout=3.0, read_timeout=10.0, http2=True,
+                             max_concurrency=settings.open_meteo_max_concurrency),
+    WEATHER_GOV: UpstreamHost("https://marine.weather.gov", connect_timeout=3.0, read_timeout=10.0, http2=True,
+                              max_concurrency=settings.weather_gov_max_concurrency),
+    COOPS: UpstreamHost("https://api.tidesandcurrents.noaa.gov", connect_timeout=3.0, read_timeout=10.0, http2=True,
+                        max_concurrency=settings.coops_max_concurrency),
+}
+
+
+class HTTPClientPool:
+    """Holds one AsyncClient per upstream host"""
+
+    def __init__(self, hosts: Dict[str, UpstreamHost]):
+        self._hosts = hosts
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._loops: Dict[str, Optional[asyncio.AbstractEventLoop]] = {}
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        """Return the client for an upstream, creating it if missing"""
+        loop = _running_loop()
+        client = self._clients.get(name)
+        owner = self._loops.get(name)
+        # pooled connections belong to the event loop that opened them
+        if client is None or client.is_closed or (owner is not None and loop is not None and owner is not loop):
+            client = self._build(name, self._hosts[name])
+            self._clients[name] = client
+            self._loops[name] = loop
+        elif owner is None:
+            self._loops[name] = loop
+        return client
+
+    async def start(self) -> None:
+        """Open a client for every upstream"""
+        for name in self._hosts:
+            self.get(name)
+
+    async def aclose(self) -> None:
+        """Close every client"""
+        clients, self._clients, self._loops = self._clients, {}, {}
+        for client in clients.values():
+            await client.aclose()
+
+    @staticmethod
+    def _build(name: str, host: UpstreamHost) -> httpx.AsyncClient:
+        transport = httpx.AsyncHTTPTransport(
+            http2=host.http2 and HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=settings.http_max_connections,
+                max_keepalive_connections=settings.http_max_keepalive_connections,
+                keepalive_expiry=settings.http_keepalive_expiry_seconds,
+            ),
+        )
+        return httpx.AsyncClient(
+            base_url=host.base_url,
+            timeout=host.timeout(),
+            # every call waits its turn for a host slot, then is measured and
+            # guarded by the host's circuit breaker
+            transport=LimitedTransport(
+                CircuitBreakerTransport(transport, circuit_breakers.get(name, host.read_timeout)),
+                host_limiters.get(name, host.max_concurrency),
+            ),
+            headers={"User-Agent": USER_AGENT},
+            follow_redirects=True,
+        )
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+http_clients = HTTPClientPool(UPSTREAM_HOSTS)
+
+
+# FastAPI dependencies
+async def get_ndbc_client() -> httpx.AsyncClient:
+    return http_clients.get(NDBC)
+
+
+async def get_open_meteo_client() -> httpx.AsyncClient:
+    return http_clients.get(OPEN_METEO)
+
+
+async def get_weather_gov_client() -> httpx.AsyncClient:
+    return http_clients.get(WEATHER_GOV)
+
+
+async def get_coops_client() -> httpx.AsyncClient:
+    return http_clients.get(COOPS)
@@ -3,10 +3,16 @@ NOAA Tides Client
 
 This client encapsulates all NOAA Tides and Currents API interactions.
 It handles HTTP requests, response parsing, and error handling for tide-related endpoints.
+Responses are cached per station and day (see tide_cache.py), and one
+process-wide client, tides_client, serves every request.
 """
 
 import httpx
 from typing import Dict, Any, Optional
+from .http_pool import http_clients, COOPS
+from .single_flight import single_flight, COOPS_TIDES
+from .tide_cache import TideCache
+from ..config import settings
 from ..schemas import (
     CurrentTidesRequest,
     HistoricalTidesRequest,
@@ -17,21 +23,28 @@ from ..schemas import (
 APPLICATION: str = "surfe-diem.com"
 TIDES_URL: str = "https://api.tidesandcurrents.noaa.gov/api/prod/datagetter"
 FORMAT: str = "JSON"
-CACHE_TTL_SECONDS: int = 360 # cache all results for 1 hr
+CACHE_TTL_SECONDS: int = 360 # water levels are published every 6 minutes; predictions are kept for the day
 
 
 class NOAATidesClient:
     """Client for interacting with NOAA Tides and Currents API"""
     
-    def __init__(self, base_url: str = TIDES_URL):
+    def __init__(self, base_url: str = TIDES_URL, client: Optional[httpx.AsyncClient] = None, cache: Optional[TideCache] = None):
         self.base_url = base_url
-        self.client = httpx.AsyncClient()
+        self._client = client
+        self.cache = cache if cache is not None else tide_cache
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The injected client, or the app-wide pooled CO-OPS client"""
+        return self._client or http_clients.get(COOPS)
     
     async def __aenter__(self):
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.client.aclose()
+        # the pooled client outlives this wrapper; the app lifespan closes it
+        pass
     
     async def get_current_tides(self, request: CurrentTidesRequest) -> Dict[str, Any]:
         """
@@ -44,8 +57,7 @@ class NOAATidesClient:
             NOAA API response as dict
         """
         params = self._build_current_tides_params(request)
-        response = await self.client.get(self.base_url, params=params)
-        return self._handle_response(response)
+        return await self._get(params)
     
     async def get_historical_tides(self, request: HistoricalTidesRequest) -> Dict[str, Any]:
         """
@@ -58,12 +70,20 @@ class NOAATidesClient:
             NOAA API response as dict
         """
         params = self._build_historical_tides_params(request)
-        response = await self.client.get(self.base_url, params=params)
-        return self._handle_response(response)
+        return await self._get(params)
+    
+    async def _get(self, params: Dict[str, str]) -> Dict[str, Any]:
+        """GET the data API through the cache, sharing one fetch between identical concurrent misses"""
+        key = (self.base_url, tuple(sorted(params.items())))
+
+        async def fetch():
+            response = await self.client.get(self.base_url, params=params)
+            return self._handle_response(response)
+
+        return await self.cache.get(params, lambda: single_flight.group(COOPS_TIDES).do(key, fetch))
     
     async def close(self):
-        """Close the HTTP client"""
-        await self.client.aclose()
+        """No-op: the pooled HTTP client is closed by the app lifespan"""
     
     def _build_current_tides_params(self, request: CurrentTidesRequest) -> Dict[str, str]:
         """Build query parameters for current tides request"""
@@ -114,3 +134,7 @@ class NOAATidesClient:
         except Exception as exc:
             # Other errors (JSON parsing, etc.)
             raise Exception(f"Unexpected error processing NOAA response: {str(exc)}")
+
+
+tide_cache = TideCache(settings.tides_cache_size, CACHE_TTL_SECONDS)
+tides_client = NOAATidesClient()
@@ -0,0 +1,44 @@
+"""
+Open-Meteo
+
+Multi-location queries against Open-Meteo, which takes comma-separated
+latitudes and longitudes and answers every point in one response. Used by the
+batch forecast and by the /forecast micro-batcher.
+"""
+
+from typing import Any, Dict, List, Sequence, Tuple
+
+import httpx
+
+
+async def fetch_locations(
+    client: httpx.AsyncClient, url: str, coordinates: Sequence[Tuple[float, float]], params: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    """
+    Fetch one result per location in a single Open-Meteo request
+
+    Args:
+        client: Open-Meteo client
+        url: Open-Meteo endpoint
+        coordinates: (latitude, longitude) pairs
+        params: Every other query parameter
+
+    Returns:
+        One result per location, in the order given
+
+    Raises:
+        httpx.HTTPError: If the request fails
+        ValueError: If the reply does not hold one result per location
+    """
+    r = await client.get(url, params={
+        **params,
+        "latitude": ",".join(str(lat) for lat, _ in coordinates),
+        "longitude": ",".join(str(lng) for _, lng in coordinates),
+    })
+    r.raise_for_status()
+    data = r.json()
+    # a single location comes back as an object, several as a list in request order
+    data = data if isinstance(data, list) else [data]
+    if len(data) != len(coordinates):
+        raise ValueError(f"expected {len(coordinates)} results, got {len(data)}")
+    return data
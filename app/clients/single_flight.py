@@ -0,0 +1,92 @@
+"""
+Single Flight
+
+Coalesces identical upstream fetches that are in flight at the same moment.
+The first caller for a key starts the fetch; every concurrent caller with the
+same key awaits that one shared task instead of going upstream itself. Once the
+fetch settles the key is forgotten, so the next call fetches fresh data.
+
+Each upstream fetcher gets a named group with counters for how many fetches
+actually went upstream and how many calls were coalesced onto one already in
+flight.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+NDBC_LATEST_OBSERVATION: str = "ndbc_latest_observation"
+OPEN_METEO_FORECAST: str = "open_meteo_forecast"
+COOPS_TIDES: str = "coops_tides"
+
+
+class SingleFlight:
+    """One group of coalesced fetches, keyed by a normalized request key"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.coalesced = 0
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fetch: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run fetch for this key, or join the fetch already running for it
+
+        Args:
+            key: Normalized request key; callers with equal keys share a result
+            fetch: Zero-argument coroutine function doing the upstream call
+
+        Returns:
+            The fetch result; a fetch error is raised to every waiter
+        """
+        loop = asyncio.get_running_loop()
+        task = self._in_flight.get(key)
+        # a task left behind by another event loop cannot be awaited here
+        if task is not None and not task.done() and task.get_loop() is loop:
+            self.coalesced += 1
+        else:
+            self.calls += 1
+            task = loop.create_task(fetch())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._settle(key, done))
+        # shield so one cancelled waiter does not cancel the fetch for the rest
+        return await asyncio.shield(task)
+
+    def _settle(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # mark the error retrieved even when every waiter has gone away
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": len(self._in_flight)}
+
+    def reset(self) -> None:
+        """Zero the counters"""
+        self.calls = 0
+        self.coalesced = 0
+
+
+class SingleFlightRegistry:
+    """Named single-flight groups shared across the app"""
+
+    def __init__(self):
+        self._groups: Dict[str, SingleFlight] = {}
+
+    def group(self, name: str) -> SingleFlight:
+        if name not in self._groups:
+            self._groups[name] = SingleFlight(name)
+        return self._groups[name]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: group.stats() for name, group in self._groups.items()}
+
+    def reset(self) -> None:
+        for group in self._groups.values():
+            group.reset()
+
+
+single_flight = SingleFlightRegistry()
@@ -0,0 +1,126 @@
+"""
+Tide Cache
+
+Cache for NOAA CO-OPS data API responses, keyed by station, product, datum,
+date and units (plus interval and time zone, which also change the answer).
+
+Tide predictions are computed from harmonic constants, so a station's
+predictions for a given day never change: they are kept until the next UTC
+midnight, when "today" moves on. Observed products such as water levels are
+published every six minutes and are kept for a short TTL instead. A relative
+date ("today") is resolved to the calendar day before keying, so yesterday's
+"today" is never served after midnight.
+
+Entries are evicted least-recently-used first past max_entries. Failed fetches
+are not cached, including CO-OPS errors, which come back as HTTP 200 with an
+{"error": ...} body.
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+PREDICTIONS: str = "predictions"
+GMT: str = "gmt"
+
+TideKey = Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class CachedTides:
+    """A CO-OPS response and the wall-clock time it expires"""
+    value: Dict[str, Any]
+    expires_at: float
+
+
+def _date(params: Dict[str, str], now: datetime) -> str:
+    """The day a request covers, with "today" resolved for GMT requests"""
+    if params.get("begin_date") or params.get("end_date"):
+        return f"{params.get('begin_date') or ''}-{params.get('end_date') or ''}"
+    date = params.get("date") or ""
+    if date == "today" and params.get("time_zone") == GMT:
+        return now.strftime("%Y%m%d")
+    return date
+
+
+def tide_cache_key(params: Dict[str, str], now: datetime) -> TideKey:
+    return (
+        params.get("station") or "",
+        params.get("product") or "",
+        params.get("datum") or "",
+        _date(params, now),
+        params.get("units") or "",
+        params.get("interval") or "",
+        params.get("time_zone") or "",
+    )
+
+
+def is_day_aligned(params: Dict[str, str]) -> bool:
+    """True for predictions over a fixed calendar day or range"""
+    if params.get("product") != PREDICTIONS:
+        return False
+    if params.get("begin_date") or params.get("end_date"):
+        return True
+    date = params.get("date") or ""
+    # "today" in a station's local time rolls over at an offset we do not know
+    return date.isdigit() or (date == "today" and params.get("time_zone") == GMT)
+
+
+class TideCache:
+    """CO-OPS responses with day-aligned expiry for predictions and a short TTL otherwise"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[TideKey, CachedTides]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def expires_at(self, params: Dict[str, str], now: datetime) -> float:
+        if is_day_aligned(params):
+            midnight = datetime(now.year, now.month, now.day, tzinfo=timezone.utc) + timedelta(days=1)
+            return midnight.timestamp()
+        return now.timestamp() + self.ttl_seconds
+
+    async def get(self, params: Dict[str, str], fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Return the cached response for a request, fetching it on a miss
+
+        Args:
+            params: CO-OPS query parameters
+            fetch: Zero-argument coroutine function returning the response
+
+        Returns:
+            The response
+        """
+        now = datetime.now(timezone.utc)
+        key = tide_cache_key(params, now)
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at > now.timestamp():
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry.value
+
+        self.misses += 1
+        value = await fetch()
+        if "error" in value:
+            return value
+        self._entries[key] = CachedTides(value, self.expires_at(params, now))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        now = time.time()
+        return {
+            "size": len(self._entries),
+            "expired": sum(1 for entry in self._entries.values() if entry.expires_at <= now),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
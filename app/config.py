@@ -11,6 +11,40 @@ class Settings(BaseSettings):
     algorithm: Optional[str] = "HS256"
     access_token_expire_minutes: Optional[int] = 30
     sqlite_uri: Optional[str] = "sqlite:///./test.db"
+    geo_index_max_age_seconds: Optional[int] = 3600
+    place_neighbor_count: Optional[int] = 3
+    geojson_max_age_seconds: Optional[int] = 3600
+    search_max_candidates: Optional[int] = 1000
+    http_max_connections: Optional[int] = 100
+    http_max_keepalive_connections: Optional[int] = 20
+    http_keepalive_expiry_seconds: Optional[float] = 30.0
+    observation_fanout_concurrency: Optional[int] = 4
+    observation_fanout_deadline_seconds: Optional[float] = 6.0
+    observation_cache_ttl_seconds: Optional[float] = 600.0
+    observation_cache_stale_seconds: Optional[float] = 3600.0
+    observation_poller_enabled: Optional[bool] = True
+    observation_poll_interval_seconds: Optional[float] = 600.0
+    observation_poll_concurrency: Optional[int] = 8
+    observation_poll_spread_seconds: Optional[float] = 300.0
+    open_meteo_batch_size: Optional[int] = 100
+    forecast_batch_enabled: Optional[bool] = False
+    forecast_batch_window_ms: Optional[float] = 15.0
+    forecast_batch_max_size: Optional[int] = 100
+    circuit_failure_threshold: Optional[int] = 5
+    circuit_error_rate_threshold: Optional[float] = 0.5
+    circuit_window_size: Optional[int] = 100
+    circuit_min_samples: Optional[int] = 20
+    circuit_reset_seconds: Optional[float] = 30.0
+    circuit_timeout_multiplier: Optional[float] = 1.5
+    circuit_min_read_timeout_seconds: Optional[float] = 1.0
+    ndbc_max_concurrency: Optional[int] = 6
+    open_meteo_max_concurrency: Optional[int] = 10
+    weather_gov_max_concurrency: Optional[int] = 10
+    coops_max_concurrency: Optional[int] = 10
+    ndbc_file_cache_size: Optional[int] = 256
+    tides_cache_size: Optional[int] = 1024
+    tide_precompute_days: Optional[int] = 30
+    tide_precompute_concurrency: Optional[int] = 4
 
     class Config:
         env_file = ".env"
@@ -1,14 +1,32 @@
 '''main app module'''
+from contextlib import asynccontextmanager
+
 from . import models
 from .database import engine
+from .clients.http_pool import http_clients
+from .config import settings
+from .services.observation_poller import observation_poller
+from .services.spatial_index import ensure_spatial_index
 from fastapi import FastAPI
-from .routers import location, user, auth, forecast, tides, weather, batch
+from .routers import location, user, auth, forecast, tides, weather, batch, nearest, admin
 # from .routers import user_location  # Commented out for review
 from fastapi.middleware.cors import CORSMiddleware
 
 models.Base.metadata.create_all(bind=engine)
+ensure_spatial_index(engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # one pooled client per upstream host for the life of the process
+    await http_clients.start()
+    # keep every active buoy's latest observation warm in memory
+    if settings.observation_poller_enabled:
+        observation_poller.start()
+    yield
+    await observation_poller.stop()
+    await http_clients.aclose()
 
-app = FastAPI(docs_url=None, redoc_url="/api/v1")
+app = FastAPI(docs_url=None, redoc_url="/api/v1", lifespan=lifespan)
 
 # configure this for a specific web app if we want to close down the API.
 origins = ["*"]
@@ -30,6 +48,8 @@ app.include_router(auth.router)
 # app.include_router(user_location.router)  # Commented out for review
 app.include_router(weather.router)
 app.include_router(batch.router)
+app.include_router(nearest.router)
+app.include_router(admin.router)
 
 # path operation (route) decorator
 @app.get("/")
@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Float
 from sqlalchemy.sql import func
 from sqlalchemy.sql.sqltypes import TIMESTAMP
-from sqlalchemy import DateTime, JSON, UniqueConstraint, Enum
+from sqlalchemy import DateTime, JSON, UniqueConstraint, Enum, Index
 from .database import Base
 
 class Test(Base):
@@ -18,6 +18,8 @@ class BuoyLocation(Base):
     url = Column(String)
     description = Column(String)
     location = Column(String)
+    latitude = Column(Float)
+    longitude = Column(Float)
     active = Column(Boolean, default=True, nullable=False)
     date_created = Column(TIMESTAMP(timezone=False), nullable=False, server_default=func.now())
     date_updated = Column(TIMESTAMP(timezone=False), nullable=False, server_default=func.now(), onupdate=func.now())
@@ -70,10 +72,24 @@ class TideStation(Base):
     id = Column(Integer, primary_key=True, nullable=False)
     station_id = Column(String, unique=True, nullable=False)
     station_name = Column(String)
-    latitude = Column(String)
-    longitude = Column(String)
+    latitude = Column(Float)
+    longitude = Column(Float)
 
-# deprecated, do not use
+# precomputed tide predictions, refreshed nightly - see services/tide_predictions.py
+class TidePrediction(Base):
+    __tablename__ = "tide_prediction"
+    id = Column(Integer, primary_key=True, nullable=False)
+    station_id = Column(String, nullable=False)  # tide_stations.station_id
+    interval = Column(String, nullable=False)  # hilo | h
+    time = Column(DateTime, nullable=False)  # GMT
+    height = Column(Float, nullable=False)  # feet above MLLW
+    type = Column(String(1))  # H | L for hilo, empty for hourly
+
+    __table_args__ = (
+        UniqueConstraint("station_id", "interval", "time", name="uq_tide_prediction_station_time"),
+    )
+
+# deprecated, do not use - see PlaceNeighbor
 class TideStationBuoyLocation(Base):
     __tablename__ = "tide_station_buoy_location"
     id = Column(Integer, primary_key=True, nullable=False)
@@ -85,10 +101,32 @@ class SpotLocation(Base):
     id = Column(Integer, primary_key=True, nullable=False)
     name = Column(String, unique=True, nullable=False)
     timezone = Column(String)
-    latitude = Column(String)
-    longitude = Column(String)
+    latitude = Column(Float)
+    longitude = Column(Float)
     subregion_name = Column(String)
     slug = Column(String, unique=True, nullable=False)
+    # precomputed along-coast ordering, see services/coast_order.py
+    coast_rank = Column(Integer, index=True)
+    coast_position = Column(Float)
+
+# precomputed nearest buoys & tide station for every spot and active buoy
+class PlaceNeighbor(Base):
+    __tablename__ = "place_neighbor"
+    id = Column(Integer, primary_key=True, nullable=False)
+    source_type = Column(String, nullable=False)  # spot | buoy
+    source_id = Column(String, nullable=False)  # spot_location.id or buoy_location.location_id
+    neighbor_type = Column(String, nullable=False)  # buoy | tide_station
+    neighbor_id = Column(String, nullable=False)  # buoy_location.location_id or tide_stations.station_id
+    neighbor_name = Column(String)
+    rank = Column(Integer, nullable=False)
+    distance = Column(Float, nullable=False)
+    bearing = Column(Float, nullable=False)
+    date_updated = Column(TIMESTAMP(timezone=False), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_place_neighbor_source", "source_type", "source_id", "neighbor_type", "rank"),
+        Index("ix_place_neighbor_neighbor", "neighbor_type", "neighbor_id"),
+    )
 
 class User(Base):
     __tablename__ = "users"
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from .. import oauth2, schemas
+from ..clients.circuit_breaker import circuit_breakers
+from ..clients.host_limiter import host_limiters
+from ..clients.http_pool import UPSTREAM_HOSTS
+
+router = APIRouter(
+    prefix="/api/v1",
+    tags=["Admin"]
+)
+
+def require_admin(current_user: schemas.UserResponse = Depends(oauth2.get_current_user)):
+    if not current_user.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return current_user
+
+@router.get("/admin/upstreams")
+def get_upstreams(current_user: schemas.UserResponse = Depends(require_admin)):
+    '''Circuit breaker state, latency, read timeout and concurrency queue depth for each upstream host'''
+    breakers = circuit_breakers.snapshot()
+    limiters = host_limiters.snapshot()
+    return {
+        name: {
+            "base_url": host.base_url,
+            "configured_read_timeout": host.read_timeout,
+            **breakers.get(name, {"state": None}),
+            "concurrency": limiters.get(name, {"limit": host.max_concurrency, "in_use": 0, "queued": 0}),
+        }
+        for name, host in UPSTREAM_HOSTS.items()
+    }
+
+@router.post("/admin/upstreams/{name}/reset")
+def reset_upstream(name: str, current_user: schemas.UserResponse = Depends(require_admin)):
+    '''Close an upstream's circuit breaker and clear its history'''
+    try:
+        circuit_breakers.reset(name)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    return {"message": f"Circuit for {name} reset"}
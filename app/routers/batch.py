@@ -1,14 +1,22 @@
-from typing import List, Dict, Any, Optional
-import httpx
+from typing import List, Dict, Any, Optional, Tuple
 import asyncio
 import time
 from fastapi import APIRouter, HTTPException, status, Depends
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 
+from ..config import settings
 from ..database import get_db
 from .. import models, schemas
-from ..classes import buoylatestobservation as buoy, buoylocation
+from ..classes import buoylatestobservation as buoy
+from ..clients.http_pool import http_clients, OPEN_METEO
+from ..clients.open_meteo import fetch_locations
+from ..clients.host_limiter import claim_upstream_owner
+from ..clients.conditional_fetch import ndbc_files
+from ..clients.noaa_tides_client import tide_cache
+from ..clients.single_flight import single_flight, OPEN_METEO_FORECAST
+from ..services.observation_cache import observation_cache, fetch_latest_observation
+from ..services.observation_poller import observation_poller
 
 # Simple in-memory cache with TTL
 class SimpleCache:
@@ -52,6 +60,9 @@ async def get_batch_forecast(
     
     This is more efficient than making individual API calls from the frontend.
     """
+    # all of this request's upstream calls queue as one owner, so a large batch
+    # takes turns with other requests instead of filling every host slot
+    claim_upstream_owner()
     
     buoys_data = []
     spots_data = []
@@ -59,6 +70,7 @@ async def get_batch_forecast(
     
     # Process buoy locations - batch query
     buoy_locations = {}
+    buoy_tasks = []
     if request.buoy_ids:
         # Fetch all buoy locations in one query
         buoy_locations_query = db.query(models.BuoyLocation).filter(
@@ -79,25 +91,15 @@ async def get_batch_forecast(
                 })
         
         # Prepare all buoy API calls
-        buoy_tasks = []
-        buoy_coords = {}
-        
         for buoy_id in request.buoy_ids:
             if buoy_id not in buoy_locations:
                 continue
                 
             try:
                 buoy_location = buoy_locations[buoy_id]
-                buoy_obj = buoylocation.BuoyLocation.from_obj(buoy_location)
-                coords = buoy_obj.parse_location()
-                buoy_coords[buoy_id] = coords
-                
-                # Create tasks for concurrent execution
-                buoy_tasks.append((
-                    buoy_id,
-                    get_latest_observation_async(buoy_id),
-                    get_weather_forecast_async(coords[1], coords[0])  # lat, lng
-                ))
+                if buoy_location.latitude is None or buoy_location.longitude is None:
+                    raise ValueError(f"no coordinates for location '{buoy_location.location}'")
+                buoy_tasks.append((buoy_id, (buoy_location.latitude, buoy_location.longitude)))
                 
             except Exception as e:
                 errors.append({
@@ -105,45 +107,10 @@ async def get_batch_forecast(
                     "type": "buoy",
                     "error": f"Failed to prepare buoy data: {str(e)}"
                 })
-        
-        # Execute all buoy API calls concurrently
-        if buoy_tasks:
-            buoy_results = await asyncio.gather(
-                *[asyncio.gather(obs_task, weather_task, return_exceptions=True) 
-                  for _, obs_task, weather_task in buoy_tasks],
-                return_exceptions=True
-            )
-            
-            # Process results
-            for i, (buoy_id, _, _) in enumerate(buoy_tasks):
-                if isinstance(buoy_results[i], Exception):
-                    errors.append({
-                        "id": buoy_id,
-                        "type": "buoy",
-                        "error": f"Failed to fetch data: {str(buoy_results[i])}"
-                    })
-                    continue
-                
-                latest_obs, weather_forecast = buoy_results[i]
-                
-                # Handle exceptions from individual tasks
-                if isinstance(latest_obs, Exception):
-                    latest_obs = None
-                if isinstance(weather_forecast, Exception):
-                    weather_forecast = None
-                
-                buoy_location = buoy_locations[buoy_id]
-                buoy_data = {
-                    "id": buoy_id,
-                    "name": buoy_location.name,
-                    "observation": latest_obs,
-                    "weather": extract_essential_weather(weather_forecast)
-                }
-                
-                buoys_data.append(buoy_data)
     
     # Process spots - batch query
     spots = {}
+    spot_tasks = []
     if request.spot_ids:
         # Fetch all spots in one query
         spots_query = db.query(models.SpotLocation).filter(
@@ -164,20 +131,13 @@ async def get_batch_forecast(
                 })
         
         # Prepare all spot API calls
-        spot_tasks = []
-        
         for spot_id in request.spot_ids:
             if spot_id not in spots:
                 continue
                 
             try:
                 spot = spots[spot_id]
-                
-                # Create tasks for concurrent execution
-                spot_tasks.append((
-                    spot_id,
-                    get_weather_forecast_async(float(spot.latitude), float(spot.longitude))
-                ))
+                spot_tasks.append((spot_id, (float(spot.latitude), float(spot.longitude))))
                 
             except Exception as e:
                 errors.append({
@@ -185,42 +145,56 @@ async def get_batch_forecast(
                     "type": "spot",
                     "error": f"Failed to prepare spot data: {str(e)}"
                 })
+    
+    # Execute the observation calls and the weather calls concurrently; the
+    # weather for every buoy and spot that misses the cache is fetched in
+    # multi-location requests
+    weather_coords = [coords for _, coords in buoy_tasks] + [coords for _, coords in spot_tasks]
+    observations, weather_forecasts = await asyncio.gather(
+        asyncio.gather(
+            *[get_latest_observation_async(buoy_id) for buoy_id, _ in buoy_tasks],
+            return_exceptions=True
+        ),
+        get_weather_forecasts_async(weather_coords),
+        return_exceptions=True
+    )
+    if isinstance(weather_forecasts, Exception):
+        weather_forecasts = [None] * len(weather_coords)
+    
+    # Process buoy results
+    for i, (buoy_id, _) in enumerate(buoy_tasks):
+        latest_obs = observations[i]
         
-        # Execute all spot API calls concurrently
-        if spot_tasks:
-            spot_results = await asyncio.gather(
-                *[weather_task for _, weather_task in spot_tasks],
-                return_exceptions=True
-            )
-            
-            # Process results
-            for i, (spot_id, _) in enumerate(spot_tasks):
-                if isinstance(spot_results[i], Exception):
-                    errors.append({
-                        "id": spot_id,
-                        "type": "spot",
-                        "error": f"Failed to fetch data: {str(spot_results[i])}"
-                    })
-                    continue
-                
-                weather_forecast = spot_results[i]
-                
-                # Handle exceptions from individual tasks
-                if isinstance(weather_forecast, Exception):
-                    weather_forecast = None
-                
-                # Extract only essential weather data
-                essential_weather = extract_essential_weather(weather_forecast)
-                
-                spot = spots[spot_id]
-                spot_data = {
-                    "id": spot_id,
-                    "name": spot.name,
-                    "slug": spot.slug,
-                    "weather": essential_weather
-                }
-                
-                spots_data.append(spot_data)
+        # Handle exceptions from individual tasks
+        if isinstance(latest_obs, Exception):
+            latest_obs = None
+        
+        buoy_location = buoy_locations[buoy_id]
+        buoy_data = {
+            "id": buoy_id,
+            "name": buoy_location.name,
+            "observation": latest_obs,
+            "weather": extract_essential_weather(weather_forecasts[i])
+        }
+        
+        buoys_data.append(buoy_data)
+    
+    # Process spot results
+    for i, (spot_id, _) in enumerate(spot_tasks):
+        weather_forecast = weather_forecasts[len(buoy_tasks) + i]
+        
+        # Extract only essential weather data
+        essential_weather = extract_essential_weather(weather_forecast)
+        
+        spot = spots[spot_id]
+        spot_data = {
+            "id": spot_id,
+            "name": spot.name,
+            "slug": spot.slug,
+            "weather": essential_weather
+        }
+        
+        spots_data.append(spot_data)
     
     return schemas.BatchForecastResponse(
         buoys=buoys_data,
@@ -233,13 +207,24 @@ async def get_cache_status():
     """Get cache status for debugging"""
     return {
         "cache_size": len(weather_cache._cache),
-        "cache_keys": list(weather_cache._cache.keys())
+        "cache_keys": list(weather_cache._cache.keys()),
+        "single_flight": single_flight.stats(),
+        "observation_cache": observation_cache.stats(),
+        "ndbc_files": ndbc_files.stats(),
+        "tides": tide_cache.stats(),
+        "observation_poller": {
+            "size": len(observation_poller.snapshot.observations),
+            "age_seconds": None if observation_poller.snapshot.polled_at is None else time.monotonic() - observation_poller.snapshot.polled_at
+        }
     }
 
 @router.post("/cache/clear")
 async def clear_cache():
-    """Clear the weather cache"""
+    """Clear the weather, observation, NDBC file and tide caches"""
     weather_cache.clear()
+    observation_cache.invalidate()
+    ndbc_files.clear()
+    tide_cache.clear()
     return {"message": "Cache cleared"}
 
 def extract_essential_weather(weather_forecast: Optional[Dict]) -> Dict[str, Any]:
@@ -265,46 +250,56 @@ def extract_essential_weather(weather_forecast: Optional[Dict]) -> Dict[str, Any
 
 async def get_latest_observation_async(location_id: str) -> Optional[Dict[str, Any]]:
     """Get latest observation for a buoy location"""
-    try:
-        buoy_data = buoy.BuoyLatestObservation(location_id)
-        async with httpx.AsyncClient() as client:
-            r = await client.get(buoy_data.url(), timeout=5.0)
-            r.raise_for_status()
-            if r.status_code != 200:
-                return None
-            data = buoy_data.parse_latest_reading_data(r.text)
-            return data
-    except:
-        return None
+    observation = observation_poller.lookup(location_id)
+    if observation is not None:
+        return observation
+    return await observation_cache.get(location_id, lambda: fetch_latest_observation(location_id))
 
+FORECAST_URL = "https://marine-api.open-meteo.com/v1/marine"
+FORECAST_CURRENT = "swell_wave_direction,swell_wave_height,swell_wave_period"
 
+def weather_cache_key(lat: float, lng: float) -> str:
+    """Cache key for a location's forecast, rounded to 2 decimal places for reasonable cache hits"""
+    return f"weather_forecast_{round(lat, 2)}_{round(lng, 2)}"
 
-async def get_weather_forecast_async(lat: float, lng: float) -> Optional[Dict[str, Any]]:
-    """Get weather forecast for a location"""
-    # Create cache key based on coordinates (rounded to 2 decimal places for reasonable cache hits)
-    cache_key = f"weather_forecast_{round(lat, 2)}_{round(lng, 2)}"
+async def get_weather_forecasts_async(coords: List[Tuple[float, float]]) -> List[Optional[Dict[str, Any]]]:
+    """
+    Get weather forecasts for many locations, in the order given
+
+    Cache misses are grouped into multi-location Open-Meteo requests of at
+    most open_meteo_batch_size locations; each location's forecast is then
+    cached on its own key. Locations in a failed request come back as None.
+    """
+    keys = [weather_cache_key(lat, lng) for lat, lng in coords]
+    forecasts = {key: weather_cache.get(key) for key in keys}
     
-    # Check cache first
-    cached_data = weather_cache.get(cache_key)
-    if cached_data is not None:
-        return cached_data
+    # one upstream location per rounded key
+    misses = {}
+    for key, coord in zip(keys, coords):
+        if forecasts[key] is None:
+            misses.setdefault(key, coord)
+    misses = list(misses.items())
+    size = settings.open_meteo_batch_size
+    chunks = [misses[i:i + size] for i in range(0, len(misses), size)]
     
-    try:
-        forecast_url = "https://marine-api.open-meteo.com/v1/marine"
-        params = {
-            "latitude": lat,
-            "longitude": lng,
-            "current": "swell_wave_direction,swell_wave_height,swell_wave_period",
-            "length_unit": "imperial"
-        }
-        
-        async with httpx.AsyncClient() as client:
-            r = await client.get(forecast_url, params=params, timeout=5.0)
-            r.raise_for_status()
-            data = r.json()
-            
-            # Cache the result for 15 minutes
-            weather_cache.set(cache_key, data, ttl=900)
-            return data
-    except:
-        return None
+    results = await asyncio.gather(*[fetch_weather_forecasts(chunk) for chunk in chunks], return_exceptions=True)
+    for result in results:
+        if not isinstance(result, Exception):
+            forecasts.update(result)
+    return [forecasts[key] for key in keys]
+
+async def fetch_weather_forecasts(chunk: List[Tuple[str, Tuple[float, float]]]) -> Dict[str, Dict[str, Any]]:
+    """Fetch forecasts for several locations in one Open-Meteo request and cache each one"""
+    keys = tuple(key for key, _ in chunk)
+    params = {
+        "current": FORECAST_CURRENT,
+        "length_unit": "imperial"
+    }
+
+    # identical dashboards loading at once share the request
+    data = await single_flight.group(OPEN_METEO_FORECAST).do(
+        keys, lambda: fetch_locations(http_clients.get(OPEN_METEO), FORECAST_URL, [coords for _, coords in chunk], params)
+    )
+    for key, forecast in zip(keys, data):
+        weather_cache.set(key, forecast, ttl=900)
+    return dict(zip(keys, data))
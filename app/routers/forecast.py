@@ -1,6 +1,13 @@
+import asyncio
 import httpx
-from typing import Union
-from fastapi import APIRouter, HTTPException, status
+from typing import Any, Dict, List, Set, Tuple, Union
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from ..config import settings
+from ..clients.circuit_breaker import CircuitOpenError
+from ..clients.http_pool import get_open_meteo_client
+from ..clients.open_meteo import fetch_locations
+from ..clients.single_flight import single_flight, OPEN_METEO_FORECAST
 
 router = APIRouter(
     prefix="/api/v1",
@@ -9,8 +16,73 @@ router = APIRouter(
 
 forecast_url = "https://marine-api.open-meteo.com/v1/marine"
 
+
+class ForecastBatcher:
+    """
+    Micro-batches concurrent /forecast calls into multi-location Open-Meteo queries
+
+    Calls asking for the same variables (every param except latitude and
+    longitude) within a short window are sent upstream as one request with
+    comma-separated coordinates, and each caller gets its own location's
+    result back. A batch goes out when its window closes or when it is full.
+    """
+
+    def __init__(self):
+        self._pending: Dict[Tuple, "_Batch"] = {}
+        # hold in-flight sends so they are not garbage collected mid-flight
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, client: httpx.AsyncClient, params: Dict[str, Any]) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        key = tuple(sorted((name, value) for name, value in params.items() if name not in ("latitude", "longitude")))
+        batch = self._pending.get(key)
+        if batch is None or batch.loop is not loop:
+            batch = _Batch(loop, client, dict(key))
+            self._pending[key] = batch
+            loop.call_later(settings.forecast_batch_window_ms / 1000, self._flush, key, batch)
+        future = loop.create_future()
+        batch.items.append((params["latitude"], params["longitude"], future))
+        if len(batch.items) >= settings.forecast_batch_max_size:
+            self._flush(key, batch)
+        return await future
+
+    def _flush(self, key: Tuple, batch: "_Batch") -> None:
+        if self._pending.get(key) is batch:
+            del self._pending[key]
+        if not batch.sent:
+            batch.sent = True
+            task = batch.loop.create_task(batch.send())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+
+class _Batch:
+    """Calls collected for one variable set during one window"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, client: httpx.AsyncClient, params: Dict[str, Any]):
+        self.loop = loop
+        self.client = client
+        self.params = params
+        self.items: List[Tuple[float, float, asyncio.Future]] = []
+        self.sent = False
+
+    async def send(self) -> None:
+        try:
+            data = await fetch_locations(self.client, forecast_url, [(lat, lng) for lat, lng, _ in self.items], self.params)
+        except Exception as exc:
+            for _, _, future in self.items:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, _, future), forecast in zip(self.items, data):
+            if not future.done():
+                future.set_result(forecast)
+
+
+forecast_batcher = ForecastBatcher()
+
 @router.get("/forecast")
-def get_forecast(
+async def get_forecast(
     latitude: float, 
     longitude: float, 
     current: Union[str, None] = None,
@@ -20,12 +92,16 @@ def get_forecast(
     end_date: Union[str, None] = None,
     forecast_days: Union[str, None] = None,
     # timezone: str = "auto", 
-    length_unit: str = "imperial"
+    length_unit: str = "imperial",
+    client: httpx.AsyncClient = Depends(get_open_meteo_client)
     ):
     '''Get a current forecast for a given location'''
+    # the marine grid is coarser than 0.01 degrees, so the point is rounded to
+    # that before fetching; callers a few hundred metres apart asking for the
+    # same fields then share one upstream fetch, and each gets the point fetched
     params = {
-        "latitude": latitude,
-        "longitude": longitude,
+        "latitude": round(latitude, 2),
+        "longitude": round(longitude, 2),
         "length_unit": length_unit
     }
     if current:
@@ -41,10 +117,21 @@ def get_forecast(
     if forecast_days:
         params["forecast_days"] = forecast_days
 
-    try:
-        r = httpx.get(forecast_url, params=params)
+    async def fetch():
+        # an out-of-range coordinate would fail the whole batch, so those go alone
+        if settings.forecast_batch_enabled and -90 <= latitude <= 90 and -180 <= longitude <= 180:
+            return await forecast_batcher.submit(client, params)
+        r = await client.get(forecast_url, params=params)
         r.raise_for_status()
         return r.json()
+
+    key = tuple(sorted(params.items()))
+    try:
+        return await single_flight.group(OPEN_METEO_FORECAST).do(key, fetch)
+    except httpx.TimeoutException:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="upstream timed out, please try again")
+    except CircuitOpenError:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="upstream unavailable, please try again shortly")
     except httpx.RequestError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"An error occurred while requesting {exc.request.url!r}.")
     except httpx.HTTPStatusError as exc:
@@ -1,3 +1,4 @@
+import asyncio
 from datetime import datetime, timezone
 from typing import List, Union, Optional
 import httpx
@@ -6,116 +7,150 @@ import re
 from fastapi.responses import JSONResponse
 from fastapi.encoders import jsonable_encoder
 
-from fastapi import Depends, HTTPException, Response, status, APIRouter, Request
+from fastapi import Depends, HTTPException, Query, Response, status, APIRouter, Request
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
-from geopy import distance
 from unidecode import unidecode
 from uuid import uuid4
 
+from ..config import settings
 from ..database import get_db
 from .. import models, oauth2
+from ..services.geo_index import geo_index, SPOTS, BUOYS
+from ..services import spatial_index
+from ..services.neighbors_service import NeighborsService
+from ..services.coast_order import CoastOrderService
+from ..services.geojson_cache import geojson_cache, SPOTS_GEOJSON, LOCATIONS_GEOJSON
+from ..services.tile_index import tile_index, is_valid_tile
+from ..services.search_ranking import rank_candidates
+from ..services.observation_cache import observation_cache, fetch_latest_observation
+from ..services.observation_poller import observation_poller
+from ..clients.circuit_breaker import CircuitOpenError
+from ..clients.http_pool import get_ndbc_client
+from ..clients.conditional_fetch import ndbc_files
 from ..schemas import (BuoyLocationNOAASummary, BuoyLocationPost, BuoyLocationResponse, BuoyLocationPut, BuoyLocationLatestObservation, SpotLocationResponse, SpotLocationPost, SpotAccuracyRatingCreate, SpotAccuracyRatingResponse, SpotRatingEnum)
-from ..classes import buoylatestobservation as buoy, buoylocation as buoy_location, spotlocation as spot_location
+from ..classes import buoylatestobservation as buoy, buoylocation as buoy_location
 
 router = APIRouter(
     prefix="/api/v1",
     tags=["Locations"]
 )
 
-@router.get("/search")
-def search_all(db: Session = Depends(get_db), limit: int = 100, q: Optional[str] = ""):
-    '''Search all locations & spots'''
-    buoy_statement = select(
-        models.BuoyLocation
-    ).where(
-        models.BuoyLocation.name.like(f"%{q}%")
-    ).limit(limit)
+def check_position(lat: Optional[float], lng: Optional[float]) -> None:
+    """lat and lng are optional but only make sense together."""
+    if (lat is None) != (lng is None):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="lat and lng must be given together")
 
-    spot_statement = select(
-        models.SpotLocation
-    ).where(
-        models.SpotLocation.name.like(f"%{q}%")
-    ).limit(limit)
+def ranked_page(db: Session, statement, q: Optional[str], lat: Optional[float], lng: Optional[float], limit: int, offset: int) -> list:
+    """Rank up to search_max_candidates matches in one pass, then cut out the requested page."""
+    candidates = [row[0] for row in db.execute(statement.limit(settings.search_max_candidates)).all()]
+    return rank_candidates(candidates, q, lat, lng)[offset:offset + limit]
 
-    buoy_locations = db.execute(buoy_statement).all()
-    spot_locations = db.execute(spot_statement).all()
+@router.get("/search")
+def search_all(
+    db: Session = Depends(get_db),
+    limit: int = Query(100, ge=1),
+    offset: int = Query(0, ge=0),
+    q: Optional[str] = "",
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lng: Optional[float] = Query(None, ge=-180, le=180),
+):
+    '''Search all locations & spots, best matches first (and nearest first when lat & lng are given)'''
+    check_position(lat, lng)
+
+    buoy_statement = select(models.BuoyLocation).where(models.BuoyLocation.name.like(f"%{q}%"))
+    spot_statement = select(models.SpotLocation).where(models.SpotLocation.name.like(f"%{q}%"))
+    if q or lat is not None:
+        # ranked in Python, so only a bounded candidate set is loaded
+        per_table = settings.search_max_candidates
+    else:
+        # nothing to rank by: buoys then spots, so neither table is needed past the page
+        per_table = offset + limit
+
+    buoy_locations = db.execute(buoy_statement.limit(per_table)).all()
+    spot_locations = db.execute(spot_statement.limit(per_table)).all()
 
     if not buoy_locations and not spot_locations:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="no results found")
-    
-    locations_list = []
-    for row in buoy_locations:
-        locations_list.append(row[0])
-    for row in spot_locations:
-        locations_list.append(row[0])
 
-    return locations_list
+    candidates = [row[0] for row in buoy_locations] + [row[0] for row in spot_locations]
+    return rank_candidates(candidates, q, lat, lng)[offset:offset + limit]
 
 @router.get("/spots", response_model=List[SpotLocationResponse])
-def get_spots(db: Session = Depends(get_db), limit: int = 500, search: Optional[str] = ""):
-    '''Returns a list of spots'''
+def get_spots(
+    db: Session = Depends(get_db),
+    limit: int = Query(500, ge=1),
+    offset: int = Query(0, ge=0),
+    search: Optional[str] = "",
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lng: Optional[float] = Query(None, ge=-180, le=180),
+):
+    '''Returns a list of spots, ranked by match and distance when searching or given lat & lng'''
+    check_position(lat, lng)
     select_stmt = select(
         models.SpotLocation
     )
 
     if search:
         select_stmt = select_stmt.where(models.SpotLocation.name.like(f"%{search}%"))
-    
-    select_stmt = select_stmt.limit(limit)
 
-    spots = db.execute(select_stmt).all()
+    if search or lat is not None:
+        spots_list = ranked_page(db, select_stmt, search, lat, lng, limit, offset)
+    else:
+        spots_list = [row[0] for row in db.execute(select_stmt.limit(limit).offset(offset)).all()]
 
-    if not spots:
+    if not spots_list:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="no spots found")
 
-    spots_list = []
-    for row in spots:
-        spots_list.append(row[0])
-
     return spots_list
 
 @router.get("/spots/find_closest")
-def get_closest_spot(lat: float, lng: float, dist: float = 100, db: Session = Depends(get_db)):
-    '''Get the closest surf spot to a given lat & lng'''
-    spots = db.query(models.SpotLocation).all()
-    
-    if not spots:
+def get_closest_spot(lat: float, lng: float, dist: float = 100, limit: Optional[int] = None, exact: bool = False, db: Session = Depends(get_db)):
+    '''Get the closest surf spots to a given lat & lng'''
+    index = geo_index.get(SPOTS, db)
+
+    if not len(index):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="no surf spots found")
 
-    best = []
-    for spot in spots:
-        try:
-            spot_distance = distance.distance((lat, lng), (spot.latitude, spot.longitude)).miles
-        except Exception as e:
-            print(f"Error calculating distance for spot {spot.name}:{spot.id} {str(e)}")
-            continue
-        if spot_distance < dist:
-            best.append({"id": spot.id, "name": spot.name, "subregion_name": spot.subregion_name, "distance": spot_distance, "latitude": spot.latitude, "longitude": spot.longitude, "slug": spot.slug})
-    sorted_best = sorted(best, key=lambda k: k['distance'])
-    
+    sorted_best = index.query(lat, lng, radius=dist, limit=limit, exact=exact)
+
     if not sorted_best:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="surf data not available for this location")
     
     return sorted_best
 
 @router.get("/spots/geojson")
-def get_spots_geojson(db: Session = Depends(get_db)):
+def get_spots_geojson(request: Request, db: Session = Depends(get_db)):
     '''Get a list of all locations for geojson.'''
-    locations = db.query(models.SpotLocation).all()
-    geojson_features = []
-    geojson_list = {
-        "type": "FeatureCollection",
-        "features": geojson_features
-    }
-    for row in locations:
-        feature_object = spot_location.SpotLocation.from_obj(row).get_geojson()
-        geojson_features.append(feature_object)
+    geojson = geojson_cache.get(SPOTS_GEOJSON, db)
     
-    if not geojson_list["features"]:
+    if not geojson.feature_count:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="no spots found")
 
-    return geojson_list
+    return geojson.to_response(request)
+
+@router.get("/spots/tiles/{z}/{x}/{y}")
+def get_spots_tile(z: int, x: int, y: int, db: Session = Depends(get_db)):
+    '''Get spots inside a web-mercator tile as geojson, clustered at low zoom'''
+    if not is_valid_tile(z, x, y):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"invalid tile {z}/{x}/{y}")
+
+    return tile_index.get(SPOTS_GEOJSON, db).get_tile(z, x, y)
+
+@router.get("/spots/within", response_model=List[SpotLocationResponse])
+def get_spots_within(bbox: str, limit: int = 500, db: Session = Depends(get_db)):
+    '''Get surf spots inside a "west,south,east,north" bounding box'''
+    try:
+        bounds = spatial_index.parse_bbox(bbox)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    spots = spatial_index.spots_within(db, bounds, limit)
+
+    if not spots:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="no spots found")
+
+    return spots
 
 @router.get("/spots/{spot_id}", response_model=SpotLocationResponse)
 def get_spot_instance(spot_id: str, db: Session = Depends(get_db)):
@@ -143,6 +178,24 @@ def get_spot_by_slug(slug: str, db: Session = Depends(get_db)):
     
     return spot
 
+@router.get("/spots/{spot_id}/neighbors")
+def get_spot_neighbors(spot_id: int, db: Session = Depends(get_db)):
+    '''Get the precomputed nearest buoys and tide station for a spot'''
+    try:
+        return NeighborsService(db).get_spot_neighbors(spot_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+@router.get("/spots/{spot_id}/adjacent")
+def get_adjacent_spots(spot_id: int, n: int = 1, db: Session = Depends(get_db)):
+    '''Get the n spots on either side of a spot along the coast'''
+    if not 1 <= n <= 25:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="n must be between 1 and 25")
+    try:
+        return CoastOrderService(db).get_adjacent(spot_id, n)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
 @router.post("/spots/{spot_id}/rating")
 def rate_spot_accuracy(
     spot_id: int,
@@ -216,6 +269,33 @@ def rate_spot_accuracy(
         response.set_cookie(key="surfe-diem-session-id", value=session_id, httponly=True, max_age=60*60*24)
     return response
 
+def refresh_derived(db: Session, name: str) -> None:
+    """Rebuild the spatial index of one table and drop the GeoJSON and tiles built from it."""
+    geo_index.rebuild(name, db)
+    for cache in (geojson_cache, tile_index):
+        cache.invalidate(name)
+
+def on_spots_changed(db: Session, spot_ids: List[int]) -> None:
+    """Refresh every derived copy of the spot table after a write."""
+    refresh_derived(db, SPOTS)
+    NeighborsService(db).refresh_spots(spot_ids)
+    CoastOrderService(db).refresh()
+
+def on_locations_changed(db: Session, location_ids: List[str]) -> None:
+    """Refresh every derived copy of the buoy location table after a write."""
+    refresh_derived(db, BUOYS)
+    NeighborsService(db).refresh_for_buoys(location_ids)
+
+def parse_buoy_coordinates(location: Optional[str]) -> dict:
+    """Parse a buoy's location text into latitude/longitude columns, rejecting text that can't be parsed."""
+    if not location:
+        return {"latitude": None, "longitude": None}
+    try:
+        lng, lat = buoy_location.BuoyLocation(location, "", "", "", "").parse_location()
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    return {"latitude": lat, "longitude": lng}
+
 def generate_slug(name: str) -> str:
     """Generate a URL-friendly slug from spot name."""
     slug = unidecode(name).lower()
@@ -263,61 +343,70 @@ def create_spot(spot: SpotLocationPost, db: Session = Depends(get_db), current_u
         db.rollback()
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Failed to create spot: {str(e)}")
     
+    on_spots_changed(db, [new_spot.id])
     return new_spot
 
 @router.get("/locations/find_closest")
-def get_closest_location(lat: float, lng: float, limit = 3, dist: float = 100, db: Session = Depends(get_db)):
+async def get_closest_location(lat: float, lng: float, limit: int = 3, dist: float = 100, exact: bool = False, include_observation: bool = True, db: Session = Depends(get_db), ndbc: httpx.AsyncClient = Depends(get_ndbc_client)):
     '''Get the closest buoy location to a given lat & lng'''
-    locations = db.query(models.BuoyLocation).filter(models.BuoyLocation.active == True).all()
-    
-    best = []
-    for buoy in locations:
-        coords = buoy_location.BuoyLocation.from_obj(buoy).parse_location()
-        buoy_distance = distance.distance((lat, lng), (coords[1], coords[0])).miles
-        if buoy_distance < dist:
-            # get latest observation for this buoy
-            latest_obs = get_latest_obvservation(buoy.location_id) or None
-            best.append(
-                {
-                    "location_id": buoy.location_id,
-                    "name": buoy.name,
-                    "url": buoy.url,
-                    "description": buoy.description,
-                    "location": buoy.location,
-                    "distance": buoy_distance,
-                    "latitude": coords[1], 
-                    "longitude": coords[0],
-                    "latest_observation": latest_obs,
-                }
-            )
-
-    sorted_best = sorted(best, key=lambda k: k['distance'])
-    sorted_best = sorted_best[:limit]
-    if not sorted_best:
+    # pick the top-k first so only those k observations are fetched; the index
+    # may rebuild from the database, so keep that off the event loop
+    closest = await asyncio.to_thread(
+        lambda: geo_index.get(BUOYS, db).query(lat, lng, radius=dist, limit=limit, exact=exact)
+    )
+
+    if not closest:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="surf data not available for this location")
-    
-    return sorted_best
+
+    if not include_observation:
+        return closest
+
+    observations = await get_latest_observations([buoy["location_id"] for buoy in closest], ndbc)
+    return [{**buoy, "latest_observation": observations.get(buoy["location_id"])} for buoy in closest]
 
 @router.get("/locations/geojson")
-def get_locations_geojson(db: Session = Depends(get_db)):
+def get_locations_geojson(request: Request, db: Session = Depends(get_db)):
     '''Get a list of all locations for geojson'''
-    locations = db.query(models.BuoyLocation).filter(models.BuoyLocation.active == True).all()
-    geojson_features = []
-    geojson_list = {
-        "type": "FeatureCollection",
-        "features": geojson_features
-    }
-    for row in locations:
-        feature_object = buoy_location.BuoyLocation.from_obj(row).get_geojson()
-        geojson_features.append(feature_object)
+    geojson = geojson_cache.get(LOCATIONS_GEOJSON, db)
     
-    if not geojson_list["features"]:
+    if not geojson.feature_count:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="no locations found")
+
+    return geojson.to_response(request)
+
+@router.get("/locations/tiles/{z}/{x}/{y}")
+def get_locations_tile(z: int, x: int, y: int, db: Session = Depends(get_db)):
+    '''Get buoy locations inside a web-mercator tile as geojson, clustered at low zoom'''
+    if not is_valid_tile(z, x, y):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"invalid tile {z}/{x}/{y}")
+
+    return tile_index.get(LOCATIONS_GEOJSON, db).get_tile(z, x, y)
+
+@router.get("/locations/within", response_model=List[BuoyLocationResponse])
+def get_locations_within(bbox: str, limit: int = 500, db: Session = Depends(get_db)):
+    '''Get active buoy locations inside a "west,south,east,north" bounding box'''
+    try:
+        bounds = spatial_index.parse_bbox(bbox)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    locations = spatial_index.buoys_within(db, bounds, limit)
+
+    if not locations:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="no locations found")
 
-    return geojson_list
+    return locations
 
 @router.get("/locations", response_model=List[BuoyLocationResponse])
-def get_locations(db: Session = Depends(get_db), limit: int = 500, search: Optional[str] = ""):
+def get_locations(
+    db: Session = Depends(get_db),
+    limit: int = Query(500, ge=1),
+    offset: int = Query(0, ge=0),
+    search: Optional[str] = "",
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lng: Optional[float] = Query(None, ge=-180, le=180),
+):
+    check_position(lat, lng)
     filters = [models.BuoyLocation.active == True]
     select_stmt = select(
         models.BuoyLocation
@@ -331,15 +420,15 @@ def get_locations(db: Session = Depends(get_db), limit: int = 500, search: Optio
 
     if search:
         select_stmt = select_stmt.where(models.BuoyLocation.name.like(f"%{search}%"))
-    
-    select_stmt = select_stmt.limit(limit)
-    location = db.execute(select_stmt).all()
 
-    if not location:
+    # weight order breaks ties between equally ranked matches
+    if search or lat is not None:
+        locations_list = ranked_page(db, select_stmt, search, lat, lng, limit, offset)
+    else:
+        locations_list = [row[0] for row in db.execute(select_stmt.limit(limit).offset(offset)).all()]
+
+    if not locations_list:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="no locations found")
-    locations_list = []
-    for row in location:
-        locations_list.append(row[0])
     return locations_list
 
 @router.get("/locations/{location_id}", response_model=BuoyLocationResponse)
@@ -390,57 +479,104 @@ def get_location(location_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"location {location_id} not found")
     return location_summary
 
-def get_latest_obvservation(location_id: str):
-    buoy_data = buoy.BuoyLatestObservation(location_id)
-
-    try:
-        r = httpx.get(buoy_data.url(), timeout=5.0)
-        r.raise_for_status()
-        if r.status_code != 200:
-            return None
-    except Exception as e:
-        print(f"Error fetching data for {location_id}: {str(e)}")
-        return None
-    
-    try:
-        data = buoy_data.parse_latest_reading_data(r.text)
-        return data
-    except Exception as e:
-        print(f"Error parsing data for {location_id}: {str(e)}")
-        return None
+async def get_latest_obvservation(location_id: str, client: Optional[httpx.AsyncClient] = None):
+    # the background poller covers active buoys; anything else is fetched live
+    # and cached, with stale readings refreshed in the background
+    observation = observation_poller.lookup(location_id)
+    if observation is not None:
+        return observation
+    return await observation_cache.get(location_id, lambda: fetch_latest_observation(location_id, client))
+
+async def get_latest_observations(location_ids: List[str], client: Optional[httpx.AsyncClient] = None) -> dict:
+    """
+    Fetch the latest observation for several buoys concurrently.
+
+    At most observation_fanout_concurrency fetches run at once and the whole
+    batch is cut off at observation_fanout_deadline_seconds; buoys that miss
+    the deadline map to None.
+    """
+    semaphore = asyncio.Semaphore(settings.observation_fanout_concurrency)
+
+    async def fetch(location_id: str):
+        async with semaphore:
+            return await get_latest_obvservation(location_id, client)
+
+    tasks = {location_id: asyncio.ensure_future(fetch(location_id)) for location_id in dict.fromkeys(location_ids)}
+    if not tasks:
+        return {}
+    _, pending = await asyncio.wait(tasks.values(), timeout=settings.observation_fanout_deadline_seconds)
+    for task in pending:
+        task.cancel()
+    return {
+        location_id: task.result() if task.done() and not task.cancelled() and task.exception() is None else None
+        for location_id, task in tasks.items()
+    }
 
 @router.get("/locations/{location_id}/latest-observation", response_model_exclude_none=True)
-def get_location_latest_observation(location_id: str):
+async def get_location_latest_observation(location_id: str, ndbc: httpx.AsyncClient = Depends(get_ndbc_client)):
     '''get latest observation for this location id'''
-    latest_observation_data = get_latest_obvservation(location_id)
+    latest_observation_data = await get_latest_obvservation(location_id, ndbc)
     if not latest_observation_data:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"location {location_id} not found")
     return latest_observation_data
 
+REALTIME_URL = "https://www.ndbc.noaa.gov/data/realtime2/{}.txt"
+
+def parse_realtime(location_id: str, text: str) -> Optional[buoy_location.BuoyData]:
+    if not text:
+        return None
+    data = text.splitlines()
+    del data[0:2]  # remove the first two lines which are headers
+    return buoy_location.BuoyDataBuilder().build(location_id, data)
+
+async def stream_realtime(client: httpx.AsyncClient, location_id: str, limit: int) -> Optional[buoy_location.BuoyData]:
+    '''
+    Read only the first `limit` rows of a realtime2 file
+
+    Rows are newest first, so the response body is parsed line by line as it
+    arrives and the connection is closed once `limit` rows are in; a stored
+    read of the file that already covers `limit` rows is revalidated instead.
+    A read cut short is stored as partial so full-file reads never reuse it.
+    '''
+    url = REALTIME_URL.format(location_id)
+    entry = ndbc_files.entry(url)
+    covered = entry is not None and entry.parsed is not None and (not entry.partial or len(entry.parsed.data) >= limit)
+    async with client.stream("GET", url, headers=entry.validators() if covered else None) as r:
+        if r.status_code == httpx.codes.NOT_MODIFIED and covered:
+            return ndbc_files.reuse(url)
+        r.raise_for_status()
+        lines, rows, partial = [], 0, False
+        async for line in r.aiter_lines():
+            lines.append(line)
+            if line.startswith("#") or not line.strip():
+                continue
+            rows += 1
+            if rows >= limit:
+                partial = True
+                break
+    text = "\n".join(lines)
+    return ndbc_files.store(url, r, text, parse_realtime(location_id, text), partial=partial)
+
 @router.get("/locations/{location_id}/realtime")
-def get_location(location_id: str, limit: int = 10, send_html: bool = False):
+async def get_location(location_id: str, limit: int = 10, send_html: bool = False, ndbc: httpx.AsyncClient = Depends(get_ndbc_client)):
     '''
     get realtime from ndbc.noaa.gov/data/realtime2/{station_id}.txt
     '''
-    base_url = "https://www.ndbc.noaa.gov/data/realtime2/"
-    url = base_url + location_id + ".txt"
     try:
-        r = httpx.get(url)
-        r.raise_for_status()
+        if send_html or limit < 1:
+            # the html table shows every row, so read the whole file;
+            # revalidated with If-None-Match / If-Modified-Since, an unchanged file reuses the parsed frame
+            buoy_real_time = await ndbc_files.fetch(ndbc, REALTIME_URL.format(location_id), lambda text: parse_realtime(location_id, text))
+        else:
+            buoy_real_time = await stream_realtime(ndbc, location_id, limit)
+    except CircuitOpenError:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="NDBC unavailable, please try again shortly")
     except httpx.RequestError as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"location {location_id} not found")
     except httpx.HTTPStatusError as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"location {location_id} invalid id")
 
-    if not r.text:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"location {location_id} not found")
-
-    data = r.text.splitlines()
-    del data[0:2]  # remove the first two lines which are headers
-
-    buoy_real_time = buoy_location.BuoyDataBuilder().build(location_id, data)
-
-    if buoy_real_time.data.empty:
+    if buoy_real_time is None or buoy_real_time.data.empty:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"location {location_id} not found")
     
     if send_html:
@@ -462,7 +598,7 @@ def create_location(location: BuoyLocationPost, db: Session = Depends(get_db), c
     if current_user.is_admin == False:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
     
-    new_location = models.BuoyLocation(**location.dict())
+    new_location = models.BuoyLocation(**location.dict(), **parse_buoy_coordinates(location.location))
     db.add(new_location)
     try:
         db.commit()
@@ -471,6 +607,7 @@ def create_location(location: BuoyLocationPost, db: Session = Depends(get_db), c
         db.rollback()
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="something went wrong, please try again")
     
+    on_locations_changed(db, [new_location.location_id])
     return new_location
 
 # should be an admin only route - add later
@@ -487,8 +624,10 @@ def delete_location(id: str, db: Session = Depends(get_db), current_user = Depen
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
 
     # consider sync strategy here
+    location_id = location.location_id
     location_query.delete()
     db.commit()
+    on_locations_changed(db, [location_id])
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 # should be an admin only route - add later
@@ -504,6 +643,11 @@ def update_location(id: int, updated_location: BuoyLocationPut, db: Session = De
     if current_user.is_admin == False:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
 
-    query.update(updated_location.dict(exclude_unset=True), synchronize_session=False)
+    values = updated_location.dict(exclude_unset=True)
+    if "location" in values:
+        values.update(parse_buoy_coordinates(values["location"]))
+    query.update(values, synchronize_session=False)
     db.commit()
-    return query.first()
+    updated = query.first()
+    on_locations_changed(db, [updated.location_id])
+    return updated
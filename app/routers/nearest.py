@@ -0,0 +1,58 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from ..database import get_db
+from .. import schemas
+from ..services.geo_index import geo_index, SPOTS, BUOYS, TIDE_STATIONS
+
+router = APIRouter(
+    prefix="/api/v1",
+    tags=["Nearest"]
+)
+
+@router.post("/nearest", response_model=schemas.NearestResponse, response_model_exclude_none=True)
+def get_nearest(request: schemas.NearestRequest, db: Session = Depends(get_db)):
+    """
+    Get the k nearest spots, buoys and tide stations for many points at once.
+
+    Each target set is matched against all points in one chunked, vectorized
+    haversine pass instead of one find_closest call per point.
+    """
+    latitudes = [point.lat for point in request.points]
+    longitudes = [point.lng for point in request.points]
+
+    matches = {
+        target: geo_index.get(target, db).query_many(latitudes, longitudes, request.k, radius=request.dist)
+        for target in dict.fromkeys(request.targets)
+    }
+
+    results = []
+    for i, point in enumerate(request.points):
+        results.append(schemas.NearestResult(
+            lat=point.lat,
+            lng=point.lng,
+            **{target: target_matches[i] for target, target_matches in matches.items()}
+        ))
+
+    return schemas.NearestResponse(results=results)
+
+@router.get("/nearby", response_model=schemas.NearbyResponse)
+def get_nearby(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius: float = Query(100, gt=0, description="Search radius in miles"),
+    spots: int = Query(5, ge=0, le=25, description="Maximum spots to return"),
+    buoys: int = Query(3, ge=0, le=25, description="Maximum buoys to return"),
+    tide_stations: int = Query(1, ge=0, le=25, description="Maximum tide stations to return"),
+    db: Session = Depends(get_db),
+):
+    """
+    Get the nearest spots, buoys and tide stations around one coordinate.
+
+    Answered by a single radius query over the combined place index, so the
+    three sections share one distance computation.
+    """
+    nearby = geo_index.get_combined(db).query_nearby(
+        lat, lng, {SPOTS: spots, BUOYS: buoys, TIDE_STATIONS: tide_stations}, radius=radius
+    )
+    return schemas.NearbyResponse(lat=lat, lng=lng, radius=radius, **nearby)
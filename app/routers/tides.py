@@ -1,11 +1,12 @@
 import httpx
 from typing import Union
 from .. import models
-from fastapi import Depends, HTTPException, status, APIRouter
+from fastapi import Depends, HTTPException, Query, status, APIRouter
 from geopy import distance
 from sqlalchemy.orm import Session
 from ..database import get_db
 from ..services.tides_service import TidesService
+from ..clients.circuit_breaker import CircuitOpenError
 from ..schemas import CurrentTidesRequest, HistoricalTidesRequest
 from .. import schemas, oauth2
 
@@ -19,12 +20,13 @@ def get_closest_tide_station(
     lat: float,
     lng: float,
     dist: float = 100,
+    exact: bool = False,
     db: Session = Depends(get_db)
 ):
     """Find the closest tide station within the specified distance radius."""
     try:
         tides_service = TidesService(db)
-        return tides_service.find_closest_tide_station(lat, lng, dist)
+        return tides_service.find_closest_tide_station(lat, lng, dist, exact=exact)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, 
@@ -46,6 +48,11 @@ async def get_current_tides(
             status_code=status.HTTP_404_NOT_FOUND, 
             detail=str(e)
         )
+    except CircuitOpenError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="NOAA tides unavailable, please try again shortly"
+        )
     
 @router.get("/tides")
 async def get_tides_summary(
@@ -62,7 +69,29 @@ async def get_tides_summary(
             status_code=status.HTTP_404_NOT_FOUND, 
             detail=str(e)
         )
+    except CircuitOpenError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="NOAA tides unavailable, please try again shortly"
+        )
     
+@router.get("/tides/predictions")
+def get_tide_predictions(
+    station: str,
+    interval: str = "hilo",
+    days: int = Query(1, ge=1, le=31),
+    db: Session = Depends(get_db)
+):
+    """Get precomputed hilo or hourly predictions for a tide station, starting today (GMT)."""
+    try:
+        tides_service = TidesService(db)
+        return tides_service.get_predictions(station, interval=interval, days=days)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+
 @router.get("/tides/stations")
 def get_all_tide_stations(
     limit: int = 100, 
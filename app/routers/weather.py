@@ -1,6 +1,9 @@
 import httpx
 from typing import Union
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from ..clients.circuit_breaker import CircuitOpenError
+from ..clients.http_pool import get_weather_gov_client
 
 router = APIRouter(
     prefix="/api/v1",
@@ -8,15 +11,20 @@ router = APIRouter(
 )
 
 @router.get("/weather")
-def get_current_weather(
+async def get_current_weather(
     lat: float,
     lng: float,
+    client: httpx.AsyncClient = Depends(get_weather_gov_client),
 ):
     weather_url = f"https://marine.weather.gov/MapClick.php?lat={lat}&lon={lng}&unit=0&lg=english&FcstType=json"
     try:
-        r = httpx.get(weather_url)
+        r = await client.get(weather_url)
         r.raise_for_status()
         return r.json()
+    except httpx.TimeoutException:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="upstream timed out, please try again")
+    except CircuitOpenError:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="upstream unavailable, please try again shortly")
     except httpx.RequestError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Not found")
     except httpx.HTTPStatusError as exc:
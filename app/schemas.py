@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, conint, ConfigDict, Field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal
 from datetime import datetime
 
 # Forecast
@@ -39,6 +39,8 @@ class BuoyLocationPut(BuoyLocation):
 class BuoyLocationResponse(BuoyLocationPost):
     '''Response shape'''
     id: int
+    latitude: Optional[float]
+    longitude: Optional[float]
     date_created: Optional[datetime]
     date_updated: Optional[datetime]
     
@@ -149,6 +151,42 @@ class BatchForecastResponse(BaseModel):
     spots: List[Dict[str, Any]]
     errors: List[Dict[str, Any]]
     
+# Nearest
+class NearestPoint(BaseModel):
+    """A single query coordinate"""
+    lat: float = Field(..., ge=-90, le=90, description="Latitude (-90 to 90)")
+    lng: float = Field(..., ge=-180, le=180, description="Longitude (-180 to 180)")
+
+class NearestRequest(BaseModel):
+    """Request model for batch nearest-neighbour endpoint"""
+    model_config = ConfigDict(extra='forbid')
+
+    points: List[NearestPoint] = Field(..., min_length=1, max_length=1000)
+    k: int = Field(default=1, ge=1, le=25, description="Neighbours per target type")
+    dist: Optional[float] = Field(default=None, gt=0, description="Search radius in miles")
+    targets: List[Literal["spots", "buoys", "tide_stations"]] = ["spots", "buoys", "tide_stations"]
+
+class NearestResult(BaseModel):
+    """Nearest targets for one query coordinate"""
+    lat: float
+    lng: float
+    spots: Optional[List[Dict[str, Any]]] = None
+    buoys: Optional[List[Dict[str, Any]]] = None
+    tide_stations: Optional[List[Dict[str, Any]]] = None
+
+class NearestResponse(BaseModel):
+    """Response model for batch nearest-neighbour endpoint"""
+    results: List[NearestResult]
+
+class NearbyResponse(BaseModel):
+    """Nearest spots, buoys and tide stations around one coordinate"""
+    lat: float
+    lng: float
+    radius: float
+    spots: List[Dict[str, Any]]
+    buoys: List[Dict[str, Any]]
+    tide_stations: List[Dict[str, Any]]
+
 # Tides Schemas
 class TideStationSearchRequest(BaseModel):
     """Request schema for finding closest tide station"""
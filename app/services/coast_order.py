@@ -0,0 +1,174 @@
+"""
+Coast Order
+
+Precomputes a 1-D along-coast position for every surf spot so "next spot up or
+down the coast" is a range lookup on an indexed rank column instead of a
+radius search.
+
+Spots are grouped by subregion_name. Within a subregion they are ordered along
+the principal axis of their coordinates; subregions are then chained greedily,
+each one followed by the unvisited subregion nearest to where the chain ends.
+A spot's coast_position is the cumulative great-circle distance in miles along
+that chain and coast_rank is its ordinal in it.
+"""
+
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from ..models import SpotLocation
+from .geo_index import EARTH_RADIUS_MILES, SPOTS, geo_index, haversine_miles
+
+# spot id -> (coast_rank, coast_position)
+CoastOrder = Dict[Any, Tuple[int, float]]
+
+
+def _step_miles(lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """Great-circle miles between each consecutive pair of points"""
+    lat1, lat2 = np.radians(lats[:-1]), np.radians(lats[1:])
+    dlat = lat2 - lat1
+    dlng = np.radians(lngs[1:] - lngs[:-1])
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _axis_order(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Order one subregion's spots along the principal axis of their coordinates"""
+    if len(records) < 3:
+        return sorted(records, key=lambda r: (-r["latitude"], r["longitude"]))
+    lats = np.array([r["latitude"] for r in records])
+    lngs = np.array([r["longitude"] for r in records])
+    # local equirectangular plane so a degree of longitude is not overweighted
+    xy = np.column_stack((lats - lats.mean(), (lngs - lngs.mean()) * np.cos(np.radians(lats.mean()))))
+    _, _, vt = np.linalg.svd(xy, full_matrices=False)
+    projection = xy @ vt[0]
+    return [records[i] for i in np.argsort(projection, kind="stable")]
+
+
+def compute_coast_order(records: List[Dict[str, Any]]) -> CoastOrder:
+    """
+    Compute the along-coast rank and position of every spot record
+
+    Args:
+        records: Spot records with id, subregion_name, latitude and longitude keys
+
+    Returns:
+        dict of spot id to (coast_rank, coast_position in miles)
+    """
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for record in records:
+        # spots without a subregion stand alone rather than joining one global group
+        key = record.get("subregion_name") or f"spot:{record['id']}"
+        groups.setdefault(key, []).append(record)
+    if not groups:
+        return {}
+
+    ordered = {key: _axis_order(members) for key, members in groups.items()}
+    keys = list(ordered)
+    centroids = np.array([
+        [np.mean([r["latitude"] for r in ordered[key]]), np.mean([r["longitude"] for r in ordered[key]])]
+        for key in keys
+    ])
+
+    # start at the northernmost subregion, running north to south within it
+    current = int(np.argmax(centroids[:, 0]))
+    chain = ordered[keys[current]]
+    if chain[0]["latitude"] < chain[-1]["latitude"]:
+        chain.reverse()
+    remaining = set(range(len(keys))) - {current}
+    sequence = list(chain)
+
+    while remaining:
+        tail = sequence[-1]
+        candidates = sorted(remaining)
+        gaps = haversine_miles([tail["latitude"]], [tail["longitude"]], centroids[candidates, 0], centroids[candidates, 1])[0]
+        current = candidates[int(np.argmin(gaps))]
+        remaining.discard(current)
+        chain = ordered[keys[current]]
+        # enter the subregion from whichever end is closer to where the chain stopped
+        ends = haversine_miles(
+            [tail["latitude"]], [tail["longitude"]],
+            [chain[0]["latitude"], chain[-1]["latitude"]], [chain[0]["longitude"], chain[-1]["longitude"]],
+        )[0]
+        if ends[1] < ends[0]:
+            chain = chain[::-1]
+        sequence.extend(chain)
+
+    lats = np.array([r["latitude"] for r in sequence])
+    lngs = np.array([r["longitude"] for r in sequence])
+    positions = np.concatenate(([0.0], np.cumsum(_step_miles(lats, lngs))))
+    return {record["id"]: (rank, float(position)) for rank, (record, position) in enumerate(zip(sequence, positions))}
+
+
+class CoastOrderService:
+    """Service for maintaining and querying the along-coast spot ordering"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def refresh(self) -> int:
+        """
+        Recompute coast_rank and coast_position for every spot
+
+        Returns:
+            Number of spots ordered
+        """
+        order = compute_coast_order(geo_index.get(SPOTS, self.db).records)
+        self.db.query(SpotLocation).update(
+            {SpotLocation.coast_rank: None, SpotLocation.coast_position: None}, synchronize_session=False
+        )
+        self.db.bulk_update_mappings(SpotLocation, [
+            {"id": spot_id, "coast_rank": rank, "coast_position": position}
+            for spot_id, (rank, position) in order.items()
+        ])
+        self.db.commit()
+        return len(order)
+
+    def get_adjacent(self, spot_id: int, n: int = 1) -> Dict[str, Any]:
+        """
+        Get the n spots on each side of a spot along the coast
+
+        Args:
+            spot_id: SpotLocation id
+            n: Spots to return on each side
+
+        Returns:
+            dict with the spot and its previous and next spots, nearest first
+
+        Raises:
+            ValueError: If the spot doesn't exist or hasn't been ordered yet
+        """
+        spot = self.db.query(SpotLocation).filter(SpotLocation.id == spot_id).first()
+        if spot is None:
+            raise ValueError(f"Spot {spot_id} not found")
+        if spot.coast_rank is None:
+            raise ValueError(f"Spot {spot_id} has no coast position")
+
+        # both sides are range scans on the coast_rank index
+        previous = self.db.query(SpotLocation).filter(
+            SpotLocation.coast_rank < spot.coast_rank
+        ).order_by(SpotLocation.coast_rank.desc()).limit(n).all()
+        following = self.db.query(SpotLocation).filter(
+            SpotLocation.coast_rank > spot.coast_rank
+        ).order_by(SpotLocation.coast_rank).limit(n).all()
+
+        return {
+            "spot": self._spot_dict(spot, spot),
+            "previous": [self._spot_dict(other, spot) for other in previous],
+            "next": [self._spot_dict(other, spot) for other in following],
+        }
+
+    @staticmethod
+    def _spot_dict(spot: SpotLocation, origin: SpotLocation) -> Dict[str, Any]:
+        return {
+            "id": spot.id,
+            "name": spot.name,
+            "slug": spot.slug,
+            "subregion_name": spot.subregion_name,
+            "latitude": spot.latitude,
+            "longitude": spot.longitude,
+            "coast_rank": spot.coast_rank,
+            "coast_position": spot.coast_position,
+            "coast_distance": abs(spot.coast_position - origin.coast_position),
+        }
@@ -0,0 +1,73 @@
+"""
+Derived Cache
+
+Process-wide holder for values derived from database tables: the spatial
+indexes, the encoded GeoJSON collections and the tile indexes.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Generic, Iterable, Optional, TypeVar
+
+from sqlalchemy.orm import Session
+
+T = TypeVar("T")
+
+
+class DerivedCache(Generic[T]):
+    """
+    Holds one value per name, built lazily from the database and dropped on writes
+
+    Each value is built by its builder on first read, rebuilt once older than
+    max age, and dropped by invalidate() after a write. A rebuild swaps the new
+    value in wholesale, so readers see either the old or the new one, never a
+    partial build.
+    """
+
+    def __init__(self, builders: Dict[str, Callable[[Session], T]], max_age_seconds: Optional[int] = None):
+        self._builders = builders
+        self._max_age_seconds = max_age_seconds
+        self._values: Dict[str, T] = {}
+        self._built_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str, db: Session) -> T:
+        """Return the value for name, building it if missing or older than max age"""
+        value = self._values.get(name)
+        if value is None or self._is_expired(name):
+            value = self.rebuild(name, db)
+        return value
+
+    def rebuild(self, name: str, db: Session) -> T:
+        """Build a fresh value from the database and swap it in"""
+        value = self._builders[name](db)
+        self._store(name, value)
+        return value
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Drop one (or every) value so the next read rebuilds it"""
+        with self._lock:
+            if name is None:
+                self._values.clear()
+                self._built_at.clear()
+                return
+            for dropped in (name, *self._dependents(name)):
+                self._values.pop(dropped, None)
+                self._built_at.pop(dropped, None)
+
+    def _store(self, name: str, value: T) -> None:
+        with self._lock:
+            self._values[name] = value
+            self._built_at[name] = time.monotonic()
+            for dropped in self._dependents(name):
+                self._values.pop(dropped, None)
+                self._built_at.pop(dropped, None)
+
+    def _dependents(self, name: str) -> Iterable[str]:
+        """Names built from name, dropped whenever it changes"""
+        return ()
+
+    def _is_expired(self, name: str) -> bool:
+        if not self._max_age_seconds:
+            return False
+        return time.monotonic() - self._built_at.get(name, 0.0) > self._max_age_seconds
@@ -0,0 +1,485 @@
+"""
+Geo Index
+
+Process-wide, in-memory spatial index over surf spots, active buoys and tide
+stations. Every place is stored as a unit-sphere vector in a KD-tree so radius
+and top-k lookups no longer scan the whole table with geodesic math per row.
+"""
+
+import heapq
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+from geopy import distance
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..config import settings
+from .derived_cache import DerivedCache
+
+EARTH_RADIUS_MILES: float = 3958.7613
+# WGS84 geodesic and spherical great-circle distances differ by < 0.6%
+GEODESIC_TOLERANCE: float = 1.006
+# cap on points x targets cells held in memory by one haversine chunk (~8 MB of float64)
+HAVERSINE_CHUNK_ELEMENTS: int = 1_000_000
+
+SPOTS: str = "spots"
+BUOYS: str = "buoys"
+TIDE_STATIONS: str = "tide_stations"
+# every kind in one index, records tagged with a "kind" key
+PLACES: str = "places"
+
+
+def to_unit_vectors(latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """Convert arrays of degrees to an (N, 3) array of unit-sphere vectors"""
+    lat = np.radians(np.asarray(latitudes, dtype=float))
+    lng = np.radians(np.asarray(longitudes, dtype=float))
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lng), cos_lat * np.sin(lng), np.sin(lat)))
+
+
+def haversine_miles(
+    latitudes: np.ndarray, longitudes: np.ndarray, target_latitudes: np.ndarray, target_longitudes: np.ndarray
+) -> np.ndarray:
+    """Pairwise haversine distances in miles as a (points x targets) matrix"""
+    lat1 = np.radians(np.asarray(latitudes, dtype=float))[:, None]
+    lng1 = np.radians(np.asarray(longitudes, dtype=float))[:, None]
+    lat2 = np.radians(np.asarray(target_latitudes, dtype=float))[None, :]
+    lng2 = np.radians(np.asarray(target_longitudes, dtype=float))[None, :]
+    a = np.sin((lat2 - lat1) / 2.0) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2.0) ** 2
+    return 2.0 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def nearest_k(
+    latitudes: np.ndarray,
+    longitudes: np.ndarray,
+    target_latitudes: np.ndarray,
+    target_longitudes: np.ndarray,
+    k: int,
+    chunk_elements: int = HAVERSINE_CHUNK_ELEMENTS,
+):
+    """
+    Find the k nearest targets for every point with a chunked haversine matrix
+
+    Args:
+        latitudes, longitudes: Query points
+        target_latitudes, target_longitudes: Candidate targets
+        k: Neighbours per point
+        chunk_elements: Upper bound on matrix cells computed at once, to bound memory
+
+    Returns:
+        (indices, distances) arrays of shape (points, min(k, targets)), nearest first
+    """
+    latitudes = np.asarray(latitudes, dtype=float)
+    longitudes = np.asarray(longitudes, dtype=float)
+    n_points, n_targets = len(latitudes), len(target_latitudes)
+    k = min(k, n_targets)
+    indices = np.empty((n_points, k), dtype=int)
+    distances = np.empty((n_points, k), dtype=float)
+    if k == 0:
+        return indices, distances
+
+    rows_per_chunk = max(1, chunk_elements // n_targets)
+    for start in range(0, n_points, rows_per_chunk):
+        end = min(start + rows_per_chunk, n_points)
+        matrix = haversine_miles(latitudes[start:end], longitudes[start:end], target_latitudes, target_longitudes)
+        if k < n_targets:
+            part = np.argpartition(matrix, k - 1, axis=1)[:, :k]
+        else:
+            part = np.broadcast_to(np.arange(n_targets), (end - start, n_targets))
+        part_dist = np.take_along_axis(matrix, part, axis=1)
+        order = np.argsort(part_dist, axis=1, kind="stable")
+        indices[start:end] = np.take_along_axis(part, order, axis=1)
+        distances[start:end] = np.take_along_axis(part_dist, order, axis=1)
+    return indices, distances
+
+
+def initial_bearing(lat: float, lng: float, target_lat: float, target_lng: float) -> float:
+    """Initial great-circle bearing in degrees (0-360, clockwise from north) from one point to another"""
+    lat1, lat2 = np.radians(lat), np.radians(target_lat)
+    d_lng = np.radians(target_lng - lng)
+    x = np.sin(d_lng) * np.cos(lat2)
+    y = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(d_lng)
+    return float((np.degrees(np.arctan2(x, y)) + 360.0) % 360.0)
+
+
+def miles_to_chord(miles: float) -> float:
+    """Straight-line (chord) length on the unit sphere for a surface distance in miles"""
+    angle = min(miles / EARTH_RADIUS_MILES, np.pi)
+    return 2.0 * np.sin(angle / 2.0)
+
+
+def chord_to_miles(chord: np.ndarray) -> np.ndarray:
+    """Great-circle distance in miles for unit-sphere chord lengths"""
+    return 2.0 * EARTH_RADIUS_MILES * np.arcsin(np.clip(np.asarray(chord) / 2.0, 0.0, 1.0))
+
+
+class KDTree:
+    """Static array-backed KD-tree over 3-d points"""
+
+    LEAF_SIZE: int = 16
+
+    def __init__(self, points: np.ndarray):
+        self.points = np.asarray(points, dtype=float).reshape(-1, 3)
+        self.order = np.arange(len(self.points))
+        # node: (axis, split, left, right, start, end); axis == -1 marks a leaf
+        self.nodes: List[tuple] = []
+        self.root = self._build(0, len(self.points)) if len(self.points) else -1
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _build(self, start: int, end: int) -> int:
+        node_id = len(self.nodes)
+        self.nodes.append(None)
+        if end - start <= self.LEAF_SIZE:
+            self.nodes[node_id] = (-1, 0.0, -1, -1, start, end)
+            return node_id
+
+        block = self.points[self.order[start:end]]
+        axis = int(np.argmax(block.max(axis=0) - block.min(axis=0)))
+        mid = (end - start) // 2
+        partition = np.argpartition(block[:, axis], mid)
+        self.order[start:end] = self.order[start:end][partition]
+        split = float(self.points[self.order[start + mid], axis])
+
+        left = self._build(start, start + mid)
+        right = self._build(start + mid, end)
+        self.nodes[node_id] = (axis, split, left, right, start, end)
+        return node_id
+
+    def _leaf_distances(self, start: int, end: int, point: np.ndarray):
+        idx = self.order[start:end]
+        diff = self.points[idx] - point
+        return idx, np.einsum("ij,ij->i", diff, diff)
+
+    def query_knn(self, point: np.ndarray, k: int, max_chord: float = 2.0):
+        """
+        Find the k nearest points within max_chord
+
+        Returns:
+            (indices, chord distances) sorted nearest first
+        """
+        if self.root < 0 or k <= 0:
+            return np.empty(0, dtype=int), np.empty(0)
+
+        bound = max_chord * max_chord
+        heap: List[tuple] = []  # max-heap on squared distance via negation
+        stack = [(self.root, 0.0)]
+        while stack:
+            node_id, plane_d2 = stack.pop()
+            if plane_d2 > bound:
+                continue
+            axis, split, left, right, start, end = self.nodes[node_id]
+            if axis < 0:
+                idx, d2 = self._leaf_distances(start, end, point)
+                for i, dist2 in zip(idx.tolist(), d2.tolist()):
+                    if dist2 > bound:
+                        continue
+                    if len(heap) < k:
+                        heapq.heappush(heap, (-dist2, i))
+                    elif dist2 < -heap[0][0]:
+                        heapq.heapreplace(heap, (-dist2, i))
+                    if len(heap) == k:
+                        bound = -heap[0][0]
+                continue
+            delta = point[axis] - split
+            near, far = (left, right) if delta < 0 else (right, left)
+            # push far first so the near side is explored first
+            stack.append((far, delta * delta))
+            stack.append((near, plane_d2))
+
+        heap.sort(key=lambda item: -item[0])
+        indices = np.array([i for _, i in heap], dtype=int)
+        chords = np.sqrt(np.array([-d for d, _ in heap], dtype=float))
+        return indices, chords
+
+    def query_radius(self, point: np.ndarray, max_chord: float):
+        """
+        Find every point within max_chord
+
+        Returns:
+            (indices, chord distances) sorted nearest first
+        """
+        if self.root < 0:
+            return np.empty(0, dtype=int), np.empty(0)
+
+        bound = max_chord * max_chord
+        found_idx: List[np.ndarray] = []
+        found_d2: List[np.ndarray] = []
+        stack = [(self.root, 0.0)]
+        while stack:
+            node_id, plane_d2 = stack.pop()
+            if plane_d2 > bound:
+                continue
+            axis, split, left, right, start, end = self.nodes[node_id]
+            if axis < 0:
+                idx, d2 = self._leaf_distances(start, end, point)
+                mask = d2 <= bound
+                if mask.any():
+                    found_idx.append(idx[mask])
+                    found_d2.append(d2[mask])
+                continue
+            delta = point[axis] - split
+            near, far = (left, right) if delta < 0 else (right, left)
+            stack.append((far, delta * delta))
+            stack.append((near, plane_d2))
+
+        if not found_idx:
+            return np.empty(0, dtype=int), np.empty(0)
+        indices = np.concatenate(found_idx)
+        d2 = np.concatenate(found_d2)
+        order = np.argsort(d2, kind="stable")
+        return indices[order], np.sqrt(d2[order])
+
+
+class PlaceIndex:
+    """Immutable KD-tree index over a list of place records with latitude/longitude keys"""
+
+    def __init__(self, records: List[Dict[str, Any]]):
+        self.records = records
+        self.latitudes = np.array([r["latitude"] for r in records], dtype=float)
+        self.longitudes = np.array([r["longitude"] for r in records], dtype=float)
+        self.vectors = to_unit_vectors(self.latitudes, self.longitudes)
+        self.tree = KDTree(self.vectors)
+        self.built_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def query(
+        self,
+        lat: float,
+        lng: float,
+        radius: Optional[float] = None,
+        limit: Optional[int] = None,
+        exact: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Find places near a coordinate
+
+        Args:
+            lat: Latitude
+            lng: Longitude
+            radius: Maximum distance in miles (None for unbounded)
+            limit: Maximum number of places to return (None for all within radius)
+            exact: Re-check the final candidates with geodesic distance
+
+        Returns:
+            Copies of the matching records with a "distance" key in miles, nearest first
+        """
+        if not self.records or (limit is not None and limit <= 0):
+            return []
+
+        point = to_unit_vectors([lat], [lng])[0]
+        search_radius = radius * GEODESIC_TOLERANCE if (exact and radius is not None) else radius
+        max_chord = miles_to_chord(search_radius) if search_radius is not None else 2.0
+
+        if limit is None:
+            indices, chords = self.tree.query_radius(point, max_chord)
+        else:
+            # over-fetch a little so the geodesic re-rank can reorder the boundary
+            k = limit + max(limit, 8) if exact else limit
+            indices, chords = self.tree.query_knn(point, k, max_chord)
+
+        miles = chord_to_miles(chords)
+        results = []
+        for i, dist in zip(indices.tolist(), miles.tolist()):
+            if exact:
+                dist = distance.distance((lat, lng), (self.latitudes[i], self.longitudes[i])).miles
+            if radius is not None and dist >= radius:
+                continue
+            results.append({**self.records[i], "distance": dist})
+
+        if exact:
+            results.sort(key=lambda r: r["distance"])
+        return results[:limit] if limit is not None else results
+
+    def query_nearby(
+        self,
+        lat: float,
+        lng: float,
+        limits: Dict[str, int],
+        radius: Optional[float] = None,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Find the nearest places of each kind in one pass over a combined index
+
+        Args:
+            lat: Latitude
+            lng: Longitude
+            limits: Maximum places to return per kind
+            radius: Maximum distance in miles (None for unbounded)
+
+        Returns:
+            Per kind, copies of the matching records with a "distance" key, nearest first
+        """
+        nearby: Dict[str, List[Dict[str, Any]]] = {kind: [] for kind in limits}
+        wanted = sum(limit for limit in limits.values() if limit > 0)
+        if not self.records or not wanted:
+            return nearby
+
+        point = to_unit_vectors([lat], [lng])[0]
+        max_chord = miles_to_chord(radius) if radius is not None else 2.0
+        indices, chords = self.tree.query_radius(point, max_chord)
+
+        for i, dist in zip(indices.tolist(), chord_to_miles(chords).tolist()):
+            if radius is not None and dist >= radius:
+                break
+            record = self.records[i]
+            kind = record["kind"]
+            if kind not in nearby or len(nearby[kind]) >= limits[kind]:
+                continue
+            match = {key: value for key, value in record.items() if key != "kind"}
+            match["distance"] = dist
+            nearby[kind].append(match)
+            wanted -= 1
+            if not wanted:
+                break
+        return nearby
+
+    def query_many(
+        self,
+        latitudes: List[float],
+        longitudes: List[float],
+        k: int,
+        radius: Optional[float] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Find the k nearest places for many coordinates in one vectorized pass
+
+        Args:
+            latitudes: Query latitudes
+            longitudes: Query longitudes
+            k: Places per coordinate
+            radius: Maximum distance in miles (None for unbounded)
+
+        Returns:
+            One list per coordinate of record copies with a "distance" key, nearest first
+        """
+        if not self.records:
+            return [[] for _ in latitudes]
+
+        indices, distances = nearest_k(latitudes, longitudes, self.latitudes, self.longitudes, k)
+        return [
+            [
+                {**self.records[i], "distance": dist}
+                for i, dist in zip(row_idx.tolist(), row_dist.tolist())
+                if radius is None or dist < radius
+            ]
+            for row_idx, row_dist in zip(indices, distances)
+        ]
+
+
+def _coerce_coords(latitude: Any, longitude: Any) -> Optional[tuple]:
+    try:
+        lat, lng = float(latitude), float(longitude)
+    except (TypeError, ValueError):
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return None
+    return lat, lng
+
+
+def load_spot_records(db: Session) -> List[Dict[str, Any]]:
+    """Load every surf spot as an index record"""
+    records = []
+    for spot in db.query(models.SpotLocation).all():
+        coords = _coerce_coords(spot.latitude, spot.longitude)
+        if coords is None:
+            print(f"Skipping spot {spot.name}:{spot.id} with invalid coordinates")
+            continue
+        records.append({
+            "id": spot.id,
+            "name": spot.name,
+            "subregion_name": spot.subregion_name,
+            "latitude": coords[0],
+            "longitude": coords[1],
+            "slug": spot.slug,
+        })
+    return records
+
+
+def load_buoy_records(db: Session) -> List[Dict[str, Any]]:
+    """Load every active buoy as an index record"""
+    records = []
+    for buoy in db.query(models.BuoyLocation).filter(models.BuoyLocation.active == True).all():
+        coords = _coerce_coords(buoy.latitude, buoy.longitude)
+        if coords is None:
+            print(f"Skipping buoy {buoy.location_id} without coordinates")
+            continue
+        records.append({
+            "location_id": buoy.location_id,
+            "name": buoy.name,
+            "url": buoy.url,
+            "description": buoy.description,
+            "location": buoy.location,
+            "latitude": coords[0],
+            "longitude": coords[1],
+        })
+    return records
+
+
+def load_tide_station_records(db: Session) -> List[Dict[str, Any]]:
+    """Load every tide station as an index record"""
+    records = []
+    stations = db.query(
+        models.TideStation.station_id, models.TideStation.station_name, models.TideStation.latitude, models.TideStation.longitude
+    ).all()
+    for station in stations:
+        coords = _coerce_coords(station.latitude, station.longitude)
+        if coords is None:
+            print(f"Skipping tide station {station.station_id} with invalid coordinates")
+            continue
+        records.append({
+            "station_id": station.station_id,
+            "station_name": station.station_name,
+            "latitude": coords[0],
+            "longitude": coords[1],
+        })
+    return records
+
+
+class GeoIndexRegistry(DerivedCache[PlaceIndex]):
+    """Holds one PlaceIndex per kind of place, rebuilt like any DerivedCache value"""
+
+    def __init__(self, loaders: Dict[str, Callable[[Session], List[Dict[str, Any]]]], max_age_seconds: Optional[int] = None):
+        self._loaders = loaders
+        super().__init__(
+            {kind: (lambda db, load=load: PlaceIndex(load(db))) for kind, load in loaders.items()},
+            max_age_seconds=max_age_seconds,
+        )
+
+    def get_combined(self, db: Session) -> PlaceIndex:
+        """
+        Return one index over every kind, building it from the per-kind indexes if missing
+
+        Records carry a "kind" key. It is dropped whenever any per-kind index is
+        rebuilt or invalidated.
+        """
+        index = self._values.get(PLACES)
+        if index is None or self._is_expired(PLACES):
+            index = PlaceIndex([
+                {**record, "kind": kind}
+                for kind in self._loaders
+                for record in self.get(kind, db).records
+            ])
+            self._store(PLACES, index)
+        return index
+
+    def status(self) -> Dict[str, int]:
+        return {kind: len(index) for kind, index in self._values.items()}
+
+    def _dependents(self, name: str) -> Iterable[str]:
+        return () if name == PLACES else (PLACES,)
+
+
+geo_index = GeoIndexRegistry(
+    {
+        SPOTS: load_spot_records,
+        BUOYS: load_buoy_records,
+        TIDE_STATIONS: load_tide_station_records,
+    },
+    max_age_seconds=settings.geo_index_max_age_seconds,
+)
@@ -0,0 +1,100 @@
+"""
+GeoJSON Cache
+
+Builds the spot and buoy FeatureCollections once into encoded (and gzipped)
+bytes with a content hash for ETag validation. The collections change a few
+times a month, so requests are served from memory until a write invalidates
+them.
+"""
+
+import gzip
+import hashlib
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from fastapi import Request, Response, status
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..classes import buoylocation, spotlocation
+from ..config import settings
+from .derived_cache import DerivedCache
+from .geo_index import BUOYS, SPOTS
+
+# keyed like the spatial index, so one write hook drops every copy of a table
+SPOTS_GEOJSON: str = SPOTS
+LOCATIONS_GEOJSON: str = BUOYS
+
+
+@dataclass(frozen=True)
+class EncodedGeoJSON:
+    """An encoded FeatureCollection and its validators"""
+    body: bytes
+    gzip_body: bytes
+    etag: str
+    feature_count: int
+    built_at: float = field(default_factory=time.monotonic)
+
+    @classmethod
+    def from_features(cls, features: List[Dict[str, Any]]) -> "EncodedGeoJSON":
+        body = json.dumps(
+            {"type": "FeatureCollection", "features": features},
+            separators=(",", ":"),
+        ).encode("utf-8")
+        return cls(
+            body=body,
+            gzip_body=gzip.compress(body, compresslevel=9),
+            etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+            feature_count=len(features),
+        )
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """True if an If-None-Match header value names this version"""
+        if not if_none_match:
+            return False
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in candidates or any(tag.removeprefix("W/") == self.etag for tag in candidates)
+
+    def to_response(self, request: Request) -> Response:
+        """Build a 200 (gzipped when accepted) or 304 response for this request"""
+        headers = {
+            "ETag": self.etag,
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+        }
+        if self.matches(request.headers.get("if-none-match")):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            return Response(content=self.gzip_body, media_type="application/json", headers=headers)
+        return Response(content=self.body, media_type="application/json", headers=headers)
+
+
+def build_spot_features(db: Session) -> List[Dict[str, Any]]:
+    """GeoJSON features for every surf spot with coordinates"""
+    rows = db.query(models.SpotLocation).filter(
+        models.SpotLocation.latitude != None,
+        models.SpotLocation.longitude != None,
+    ).all()
+    return [spotlocation.SpotLocation.from_obj(row).get_geojson() for row in rows]
+
+
+def build_location_features(db: Session) -> List[Dict[str, Any]]:
+    """GeoJSON features for every active buoy with coordinates"""
+    rows = db.query(models.BuoyLocation).filter(
+        models.BuoyLocation.active == True,
+        models.BuoyLocation.latitude != None,
+        models.BuoyLocation.longitude != None,
+    ).all()
+    return [buoylocation.BuoyLocation.from_obj(row).get_geojson() for row in rows]
+
+
+geojson_cache: DerivedCache[EncodedGeoJSON] = DerivedCache(
+    {
+        SPOTS_GEOJSON: lambda db: EncodedGeoJSON.from_features(build_spot_features(db)),
+        LOCATIONS_GEOJSON: lambda db: EncodedGeoJSON.from_features(build_location_features(db)),
+    },
+    max_age_seconds=settings.geojson_max_age_seconds,
+)
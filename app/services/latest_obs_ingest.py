@@ -0,0 +1,126 @@
+"""
+Latest Obs Ingest
+
+Ingests NDBC's combined latest-observations file, latest_obs.txt, which holds
+the most recent reading of every station in one whitespace-delimited table.
+One download replaces a request per station. The whole table is parsed and
+converted in a single vectorized pass. Rows for the buoys we track are then
+bulk-written to locations_noaa_summary, formatted the way the per-station
+latest_obs/{id}.txt summaries are.
+
+The combined file carries no swell/wind-wave split, so swell, period,
+direction, wind_wave, ww_period and ww_direction stay empty on rows it writes.
+"""
+
+import io
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from .. import models
+
+LATEST_OBS_URL: str = "https://www.ndbc.noaa.gov/data/latest_obs/latest_obs.txt"
+
+MISSING: str = "MM"
+COMPASS_POINTS: np.ndarray = np.array(
+    ["N", "NNE", "NE", "ENE", "E", "ESE", "SE", "SSE", "S", "SSW", "SW", "WSW", "W", "WNW", "NW", "NNW"]
+)
+FEET_PER_METER: float = 3.28084
+KNOTS_PER_MPS: float = 1.94384
+INHG_PER_HPA: float = 0.02953
+
+
+def parse_latest_obs(text: str) -> pd.DataFrame:
+    """
+    Parse latest_obs.txt into one row per station
+
+    The first header line names the columns, the second gives units; "MM"
+    marks a missing value.
+    """
+    columns = text.split("\n", 1)[0].lstrip("#").split()
+    return pd.read_csv(
+        io.StringIO(text),
+        sep=r"\s+",
+        comment="#",
+        header=None,
+        names=columns,
+        na_values=[MISSING],
+        dtype={"STN": str},
+    )
+
+
+def _format(values: pd.Series, template: str, decimals: int) -> pd.Series:
+    """Format numeric values with a unit, leaving missing values as None"""
+    formatted = values.round(decimals).map(lambda value: template.format(value))
+    return formatted.where(values.notna(), None)
+
+
+def summary_records(frame: pd.DataFrame, location_ids: Iterable[str]) -> List[Dict[str, Any]]:
+    """
+    Convert parsed latest_obs rows into locations_noaa_summary records
+
+    Args:
+        frame: Output of parse_latest_obs
+        location_ids: Buoys to keep; every other station is dropped
+
+    Returns:
+        One record per tracked station found in the file
+    """
+    frame = frame[frame["STN"].isin(set(location_ids))]
+    if frame.empty:
+        return []
+
+    # the per-station summaries report the observation hour, without minutes
+    timestamps = pd.to_datetime(
+        {"year": frame["YYYY"], "month": frame["MM"], "day": frame["DD"], "hour": frame["hh"]}
+    )
+    compass = pd.Series(
+        COMPASS_POINTS[((frame["WDIR"].fillna(0).to_numpy() / 22.5) + 0.5).astype(int) % 16], index=frame.index
+    )
+    knots = (frame["WSPD"] * KNOTS_PER_MPS).round(1)
+    wind = compass + " (" + frame["WDIR"].astype("Int64").astype(str) + "°), " + knots.astype(str) + " kt"
+
+    summaries = pd.DataFrame({
+        "location_id": frame["STN"],
+        "timestamp": timestamps.dt.strftime("%Y-%m-%d %H:%M:%S"),
+        "wind": wind.where(frame["WDIR"].notna() & frame["WSPD"].notna(), None),
+        "gust": _format(frame["GST"] * KNOTS_PER_MPS, "{} kt", 1),
+        "wvht": _format(frame["WVHT"] * FEET_PER_METER, "{} ft", 1),
+        "peak_period": _format(frame["DPD"], "{:g} sec", 0),
+        "precipitation": _format(frame["PRES"] * INHG_PER_HPA, "{} in", 2),
+        "water_temp": _format(frame["WTMP"] * 9 / 5 + 32, "{} °F", 1),
+    })
+    return summaries.astype(object).where(summaries.notna(), None).to_dict("records")
+
+
+class LatestObsIngestService:
+    """Writes summaries for every tracked buoy from one latest_obs.txt download"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def tracked_location_ids(self) -> List[str]:
+        """Location ids of every active buoy"""
+        rows = self.db.query(models.BuoyLocation.location_id).filter(models.BuoyLocation.active == True).all()
+        return [row[0] for row in rows]
+
+    def ingest(self, text: str, location_ids: Optional[Iterable[str]] = None) -> int:
+        """
+        Parse latest_obs.txt and bulk-insert a summary for each tracked buoy
+
+        Args:
+            text: Contents of latest_obs.txt
+            location_ids: Buoys to keep, every active buoy when omitted
+
+        Returns:
+            Number of summaries written
+        """
+        if location_ids is None:
+            location_ids = self.tracked_location_ids()
+        records = summary_records(parse_latest_obs(text), location_ids)
+        if records:
+            self.db.bulk_insert_mappings(models.BuoyLocationNoaaSummary, records)
+            self.db.commit()
+        return len(records)
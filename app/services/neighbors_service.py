@@ -0,0 +1,224 @@
+"""
+Neighbors Service
+
+Precomputes, for every surf spot and active buoy, its nearest buoys and
+nearest tide station (distance and bearing) into the place_neighbor table,
+and keeps that table current as spots, buoys and tide stations change.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models import PlaceNeighbor
+from .geo_index import BUOYS, SPOTS, TIDE_STATIONS, geo_index, haversine_miles, initial_bearing
+
+SPOT: str = "spot"
+BUOY: str = "buoy"
+TIDE_STATION: str = "tide_station"
+
+# (source_type, source_id)
+SourceKey = Tuple[str, str]
+
+
+class NeighborsService:
+    """Service for computing and serving precomputed place neighbors"""
+
+    def __init__(self, db: Session, k: Optional[int] = None):
+        self.db = db
+        self.k = k or settings.place_neighbor_count
+
+    def get_spot_neighbors(self, spot_id: int) -> Dict[str, Any]:
+        """
+        Get the precomputed neighbors for a spot
+
+        Args:
+            spot_id: SpotLocation id
+
+        Returns:
+            dict with the spot's nearest buoys and nearest tide station
+
+        Raises:
+            ValueError: If nothing has been computed for this spot
+        """
+        rows = self.db.query(PlaceNeighbor).filter(
+            PlaceNeighbor.source_type == SPOT,
+            PlaceNeighbor.source_id == str(spot_id),
+        ).order_by(PlaceNeighbor.neighbor_type, PlaceNeighbor.rank).all()
+
+        if not rows:
+            raise ValueError(f"No neighbors found for spot {spot_id}")
+
+        buoys = [self._neighbor_dict(row) for row in rows if row.neighbor_type == BUOY]
+        tide_stations = [self._neighbor_dict(row) for row in rows if row.neighbor_type == TIDE_STATION]
+        return {
+            "spot_id": spot_id,
+            "buoys": buoys,
+            "tide_station": tide_stations[0] if tide_stations else None,
+        }
+
+    def refresh_all(self) -> int:
+        """
+        Recompute neighbors for every spot and active buoy
+
+        Returns:
+            Number of rows written
+        """
+        sources = self._all_sources()
+        rows = self._compute(sources.items())
+        self.db.query(PlaceNeighbor).delete(synchronize_session=False)
+        self.db.bulk_insert_mappings(PlaceNeighbor, rows)
+        self.db.commit()
+        return len(rows)
+
+    def refresh_spots(self, spot_ids: Iterable[Any]) -> int:
+        """Recompute neighbors for the given spots (e.g. after they are created)"""
+        return self._refresh_sources({(SPOT, str(spot_id)) for spot_id in spot_ids})
+
+    def refresh_for_buoys(self, location_ids: Iterable[str]) -> int:
+        """
+        Update the table after buoys were added, moved, deactivated or removed
+
+        Recomputes the changed buoys themselves, every source that listed one
+        of them as a neighbor, and every source that one of them now beats.
+        """
+        location_ids = {str(location_id) for location_id in location_ids}
+        affected: Set[SourceKey] = {(BUOY, location_id) for location_id in location_ids}
+        affected |= self._sources_referencing(BUOY, location_ids)
+
+        buoy_records = [r for r in geo_index.get(BUOYS, self.db).records if r["location_id"] in location_ids]
+        if buoy_records:
+            affected |= self._sources_closer_to(buoy_records)
+        return self._refresh_sources(affected)
+
+    def refresh_for_tide_stations(self, station_ids: Iterable[str]) -> int:
+        """Update the table after tide stations were added, moved or removed"""
+        station_ids = {str(station_id) for station_id in station_ids}
+        affected = self._sources_referencing(TIDE_STATION, station_ids)
+
+        station_records = [r for r in geo_index.get(TIDE_STATIONS, self.db).records if r["station_id"] in station_ids]
+        if station_records:
+            # a new station can only matter to sources whose current station is farther away
+            sources = self._all_sources()
+            current = dict(
+                ((source_type, source_id), dist)
+                for source_type, source_id, dist in self.db.query(
+                    PlaceNeighbor.source_type, PlaceNeighbor.source_id, PlaceNeighbor.distance
+                ).filter(PlaceNeighbor.neighbor_type == TIDE_STATION).all()
+            )
+            keys = list(sources)
+            coords = np.array([sources[key] for key in keys])
+            distances = haversine_miles(
+                coords[:, 0], coords[:, 1],
+                [r["latitude"] for r in station_records], [r["longitude"] for r in station_records],
+            ).min(axis=1)
+            affected |= {key for key, dist in zip(keys, distances.tolist()) if dist < current.get(key, np.inf)}
+        return self._refresh_sources(affected)
+
+    def _refresh_sources(self, keys: Set[SourceKey]) -> int:
+        if not keys:
+            return 0
+        sources = self._all_sources()
+        present = [(key, sources[key]) for key in keys if key in sources]
+        rows = self._compute(present)
+
+        self.db.query(PlaceNeighbor).filter(
+            tuple_(PlaceNeighbor.source_type, PlaceNeighbor.source_id).in_(list(keys))
+        ).delete(synchronize_session=False)
+        self.db.bulk_insert_mappings(PlaceNeighbor, rows)
+        self.db.commit()
+        return len(rows)
+
+    def _all_sources(self) -> Dict[SourceKey, Tuple[float, float]]:
+        sources = {
+            (SPOT, str(r["id"])): (r["latitude"], r["longitude"])
+            for r in geo_index.get(SPOTS, self.db).records
+        }
+        sources.update({
+            (BUOY, r["location_id"]): (r["latitude"], r["longitude"])
+            for r in geo_index.get(BUOYS, self.db).records
+        })
+        return sources
+
+    def _compute(self, sources: Iterable[Tuple[SourceKey, Tuple[float, float]]]) -> List[Dict[str, Any]]:
+        sources = list(sources)
+        if not sources:
+            return []
+        lats = [coords[0] for _, coords in sources]
+        lngs = [coords[1] for _, coords in sources]
+        # one extra buoy so a buoy source can drop itself
+        buoy_matches = geo_index.get(BUOYS, self.db).query_many(lats, lngs, self.k + 1)
+        tide_matches = geo_index.get(TIDE_STATIONS, self.db).query_many(lats, lngs, 1)
+
+        rows = []
+        for ((source_type, source_id), (lat, lng)), buoys, tides in zip(sources, buoy_matches, tide_matches):
+            buoys = [b for b in buoys if not (source_type == BUOY and b["location_id"] == source_id)][:self.k]
+            for rank, neighbor in enumerate(buoys, start=1):
+                rows.append(self._row(source_type, source_id, lat, lng, BUOY, neighbor["location_id"], neighbor.get("name"), rank, neighbor))
+            for neighbor in tides:
+                rows.append(self._row(source_type, source_id, lat, lng, TIDE_STATION, neighbor["station_id"], neighbor.get("station_name"), 1, neighbor))
+        return rows
+
+    def _sources_referencing(self, neighbor_type: str, neighbor_ids: Set[str]) -> Set[SourceKey]:
+        if not neighbor_ids:
+            return set()
+        return set(
+            self.db.query(PlaceNeighbor.source_type, PlaceNeighbor.source_id).filter(
+                PlaceNeighbor.neighbor_type == neighbor_type,
+                PlaceNeighbor.neighbor_id.in_(neighbor_ids),
+            ).distinct().all()
+        )
+
+    def _sources_closer_to(self, buoy_records: List[Dict[str, Any]]) -> Set[SourceKey]:
+        """Sources for which one of buoy_records is nearer than their current k-th buoy"""
+        sources = self._all_sources()
+        kth = {
+            (source_type, source_id): (farthest, count)
+            for source_type, source_id, farthest, count in self.db.query(
+                PlaceNeighbor.source_type,
+                PlaceNeighbor.source_id,
+                func.max(PlaceNeighbor.distance),
+                func.count(PlaceNeighbor.id),
+            ).filter(PlaceNeighbor.neighbor_type == BUOY).group_by(
+                PlaceNeighbor.source_type, PlaceNeighbor.source_id
+            ).all()
+        }
+        keys = list(sources)
+        coords = np.array([sources[key] for key in keys])
+        distances = haversine_miles(
+            coords[:, 0], coords[:, 1],
+            [r["latitude"] for r in buoy_records], [r["longitude"] for r in buoy_records],
+        ).min(axis=1)
+
+        affected = set()
+        for key, dist in zip(keys, distances.tolist()):
+            farthest, count = kth.get(key, (np.inf, 0))
+            if count < self.k or dist < farthest:
+                affected.add(key)
+        return affected
+
+    @staticmethod
+    def _row(source_type, source_id, lat, lng, neighbor_type, neighbor_id, neighbor_name, rank, neighbor) -> Dict[str, Any]:
+        return {
+            "source_type": source_type,
+            "source_id": source_id,
+            "neighbor_type": neighbor_type,
+            "neighbor_id": neighbor_id,
+            "neighbor_name": neighbor_name,
+            "rank": rank,
+            "distance": neighbor["distance"],
+            "bearing": initial_bearing(lat, lng, neighbor["latitude"], neighbor["longitude"]),
+        }
+
+    @staticmethod
+    def _neighbor_dict(row: PlaceNeighbor) -> Dict[str, Any]:
+        return {
+            "id": row.neighbor_id,
+            "name": row.neighbor_name,
+            "rank": row.rank,
+            "distance": row.distance,
+            "bearing": row.bearing,
+        }
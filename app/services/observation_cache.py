@@ -0,0 +1,135 @@
+"""
+Observation Cache
+
+Stale-while-revalidate cache for parsed NDBC latest observations. NDBC
+publishes new readings every 30-60 minutes, so a parsed observation is served
+from memory while fresh. Once it passes the freshness TTL but is still inside
+the stale window it is served immediately and refreshed by a background task;
+only misses and observations older than the stale window wait on NDBC.
+
+fetch_latest_observation is the one live fetch behind the cache, the poller
+and the request handlers.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+import httpx
+
+from ..classes import buoylatestobservation as buoy
+from ..clients.conditional_fetch import ndbc_files
+from ..clients.http_pool import http_clients, NDBC
+from ..clients.single_flight import single_flight, NDBC_LATEST_OBSERVATION
+from ..config import settings
+
+Observation = Dict[str, Any]
+
+
+async def fetch_latest_observation(location_id: str, client: Optional[httpx.AsyncClient] = None) -> Optional[Observation]:
+    """Download and parse one buoy's latest observation, None on any failure"""
+    buoy_data = buoy.BuoyLatestObservation(location_id)
+    client = client or http_clients.get(NDBC)
+    try:
+        # concurrent reads of the same buoy share one conditional GET; an
+        # unchanged file costs a 304 and reuses the last parse
+        return await single_flight.group(NDBC_LATEST_OBSERVATION).do(
+            location_id, lambda: ndbc_files.fetch(client, buoy_data.url(), buoy_data.parse_latest_reading_data)
+        )
+    except Exception as e:
+        print(f"Error fetching observation for {location_id}: {str(e)}")
+        return None
+
+
+@dataclass(frozen=True)
+class CachedObservation:
+    """A parsed observation and when it was fetched"""
+    value: Observation
+    fetched_at: float = field(default_factory=time.monotonic)
+
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+
+class ObservationCache:
+    """Parsed latest observations keyed by buoy location id"""
+
+    def __init__(self, ttl_seconds: float, stale_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self._entries: Dict[str, CachedObservation] = {}
+        self._refreshing: Set[str] = set()
+        # hold background refreshes so they are not garbage collected mid-flight
+        self._tasks: Set[asyncio.Task] = set()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    async def get(self, location_id: str, fetch: Callable[[], Awaitable[Optional[Observation]]]) -> Optional[Observation]:
+        """
+        Return the cached observation for a buoy, fetching or refreshing it as needed
+
+        Args:
+            location_id: Buoy location id
+            fetch: Zero-argument coroutine function returning the parsed observation, or None
+
+        Returns:
+            The observation, or None when there is nothing usable cached and the fetch fails
+        """
+        entry = self._entries.get(location_id)
+        if entry is not None:
+            age = entry.age()
+            if age < self.ttl_seconds:
+                self.hits += 1
+                return entry.value
+            if age < self.stale_seconds:
+                self.stale_hits += 1
+                self._refresh_in_background(location_id, fetch)
+                return entry.value
+            del self._entries[location_id]
+        self.misses += 1
+        return await self._fetch(location_id, fetch)
+
+    async def _fetch(self, location_id: str, fetch: Callable[[], Awaitable[Optional[Observation]]]) -> Optional[Observation]:
+        value = await fetch()
+        # failures are not cached, so a stale value survives an NDBC outage
+        if value:
+            self._entries[location_id] = CachedObservation(value)
+        return value
+
+    def _refresh_in_background(self, location_id: str, fetch: Callable[[], Awaitable[Optional[Observation]]]) -> None:
+        if location_id in self._refreshing:
+            return
+        self._refreshing.add(location_id)
+        task = asyncio.get_running_loop().create_task(self._fetch(location_id, fetch))
+        self._tasks.add(task)
+        task.add_done_callback(lambda done: self._refreshed(location_id, done))
+
+    def _refreshed(self, location_id: str, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        self._refreshing.discard(location_id)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Error refreshing observation for {location_id}: {task.exception()}")
+
+    def invalidate(self, location_id: Optional[str] = None) -> None:
+        """Drop one buoy's observation, or all of them"""
+        if location_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(location_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshing": len(self._refreshing),
+        }
+
+
+observation_cache = ObservationCache(
+    ttl_seconds=settings.observation_cache_ttl_seconds,
+    stale_seconds=settings.observation_cache_stale_seconds,
+)
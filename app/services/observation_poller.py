@@ -0,0 +1,146 @@
+"""
+Observation Poller
+
+Background task, started by the app lifespan, that keeps the latest NDBC
+observation of every active buoy in memory. Each cycle polls
+latest_obs/{id}.txt for all active buoys with bounded concurrency, spreading
+the requests across the publishing cycle instead of bursting them, then
+swaps in the new snapshot (see DerivedCache).
+
+Request handlers read the snapshot first and only fetch live for buoys the
+poller does not cover (inactive, new since the last cycle, or failing).
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..config import settings
+from ..database import SessionLocal
+from .observation_cache import CachedObservation, Observation, fetch_latest_observation
+
+
+@dataclass(frozen=True)
+class ObservationSnapshot:
+    """The observations gathered by one poll cycle"""
+    observations: Dict[str, CachedObservation] = field(default_factory=dict)
+    polled_at: Optional[float] = None
+
+
+def load_active_buoy_ids(db: Session) -> List[str]:
+    """Location ids of every active buoy"""
+    rows = db.query(models.BuoyLocation.location_id).filter(models.BuoyLocation.active == True).all()
+    return [row[0] for row in rows]
+
+
+class ObservationPoller:
+    """Polls every active buoy and serves the results from an in-memory snapshot"""
+
+    def __init__(
+        self,
+        interval_seconds: float,
+        concurrency: int,
+        spread_seconds: float,
+        max_age_seconds: float,
+        session_factory: Callable[[], Session] = SessionLocal,
+        fetch: Callable[[str], Any] = fetch_latest_observation,
+    ):
+        self.interval_seconds = interval_seconds
+        self.concurrency = concurrency
+        self.spread_seconds = spread_seconds
+        self.max_age_seconds = max_age_seconds
+        self._session_factory = session_factory
+        self._fetch = fetch
+        self._snapshot = ObservationSnapshot()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def snapshot(self) -> ObservationSnapshot:
+        return self._snapshot
+
+    def lookup(self, location_id: str) -> Optional[Observation]:
+        """The polled observation for a buoy, or None if the poller has nothing recent for it"""
+        entry = self._snapshot.observations.get(location_id)
+        if entry is None or entry.age() >= self.max_age_seconds:
+            return None
+        return entry.value
+
+    async def poll_once(self, location_ids: Optional[List[str]] = None, spread_seconds: float = 0.0) -> ObservationSnapshot:
+        """
+        Poll the given buoys (default: every active buoy) and swap in the new snapshot
+
+        Args:
+            location_ids: Buoys to poll, loaded from the database when omitted
+            spread_seconds: Window over which request start times are staggered
+
+        Returns:
+            The new snapshot
+        """
+        if location_ids is None:
+            location_ids = await asyncio.to_thread(self._load_location_ids)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        step = spread_seconds / len(location_ids) if location_ids else 0.0
+
+        async def poll(index: int, location_id: str) -> Optional[Observation]:
+            await asyncio.sleep(index * step)
+            async with semaphore:
+                return await self._fetch(location_id)
+
+        results = await asyncio.gather(*[poll(i, location_id) for i, location_id in enumerate(location_ids)])
+        previous = self._snapshot.observations
+        observations = {}
+        for location_id, value in zip(location_ids, results):
+            if value:
+                observations[location_id] = CachedObservation(value)
+            elif location_id in previous:
+                # keep the last good reading; lookup drops it once too old
+                observations[location_id] = previous[location_id]
+        self._snapshot = ObservationSnapshot(observations=observations, polled_at=time.monotonic())
+        return self._snapshot
+
+    def _load_location_ids(self) -> List[str]:
+        db = self._session_factory()
+        try:
+            return load_active_buoy_ids(db)
+        finally:
+            db.close()
+
+    async def _run(self) -> None:
+        # warm the snapshot as fast as the concurrency bound allows, then stagger
+        spread = 0.0
+        while True:
+            started = time.monotonic()
+            try:
+                await self.poll_once(spread_seconds=spread)
+            except Exception as e:
+                print(f"Error polling buoy observations: {str(e)}")
+            spread = self.spread_seconds
+            await asyncio.sleep(max(0.0, self.interval_seconds - (time.monotonic() - started)))
+
+    def start(self) -> None:
+        """Start polling on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop polling; the last snapshot stays readable"""
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+observation_poller = ObservationPoller(
+    interval_seconds=settings.observation_poll_interval_seconds,
+    concurrency=settings.observation_poll_concurrency,
+    spread_seconds=settings.observation_poll_spread_seconds,
+    max_age_seconds=settings.observation_cache_stale_seconds,
+)
@@ -0,0 +1,75 @@
+"""
+Search Ranking
+
+Orders name-search candidates by how well the name matches the query and,
+when the caller supplies a position, how close the place is. Distances for the
+whole candidate set come from one vectorized haversine pass.
+"""
+
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+
+from .geo_index import haversine_miles
+
+# share of the score given to text relevance when a position is supplied
+TEXT_WEIGHT: float = 0.5
+# distance at which proximity falls to half
+DISTANCE_HALF_MILES: float = 50.0
+
+
+def text_score(name: Optional[str], q: Optional[str]) -> float:
+    """
+    Score how well a name matches a query, from 0 to 1
+
+    Exact matches beat prefixes, which beat matches at the start of a later
+    word, which beat matches anywhere else.
+    """
+    if not q:
+        return 1.0
+    name = (name or "").strip().lower()
+    q = q.strip().lower()
+    if name == q:
+        return 1.0
+    if name.startswith(q):
+        return 0.8
+    if f" {q}" in f" {name}":
+        return 0.6
+    if q in name:
+        return 0.4
+    return 0.0
+
+
+def proximity_scores(latitudes: Sequence[Any], longitudes: Sequence[Any], lat: float, lng: float) -> np.ndarray:
+    """Proximity in [0, 1] for every candidate, 0 for candidates without coordinates"""
+    lats = np.array([np.nan if value is None else float(value) for value in latitudes], dtype=float)
+    lngs = np.array([np.nan if value is None else float(value) for value in longitudes], dtype=float)
+    if not len(lats):
+        return np.empty(0)
+    miles = haversine_miles([lat], [lng], lats, lngs)[0]
+    return np.nan_to_num(1.0 / (1.0 + miles / DISTANCE_HALF_MILES), nan=0.0)
+
+
+def rank_candidates(candidates: List[Any], q: Optional[str], lat: Optional[float] = None, lng: Optional[float] = None) -> List[Any]:
+    """
+    Sort candidates best first by text relevance, blended with proximity when lat/lng are given
+
+    Args:
+        candidates: Objects with name, latitude and longitude attributes
+        q: The search text
+        lat: Caller latitude, optional
+        lng: Caller longitude, optional
+
+    Returns:
+        The candidates reordered; ties keep their incoming order
+    """
+    if not candidates:
+        return []
+    scores = np.array([text_score(candidate.name, q) for candidate in candidates])
+    if lat is not None and lng is not None:
+        proximity = proximity_scores(
+            [candidate.latitude for candidate in candidates], [candidate.longitude for candidate in candidates], lat, lng
+        )
+        scores = TEXT_WEIGHT * scores + (1.0 - TEXT_WEIGHT) * proximity
+    order = np.argsort(-scores, kind="stable")
+    return [candidates[i] for i in order]
@@ -0,0 +1,176 @@
+"""
+Spatial Index
+
+SQLite R*Tree virtual tables mirroring the coordinates of spot_location,
+buoy_location and tide_stations. They let bounding-box (map viewport) queries
+prefilter in the database instead of scanning and parsing every row.
+
+Each R*Tree is kept in sync by triggers on its source table's float
+latitude/longitude columns.
+"""
+
+from typing import Any, List, Tuple
+
+from sqlalchemy import Column, Float, Integer, MetaData, Table, and_, or_, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from .. import models
+
+# (west, south, east, north) in degrees, GeoJSON bbox order
+BBox = Tuple[float, float, float, float]
+
+# kept apart from Base.metadata: create_all can't build virtual tables
+rtree_metadata = MetaData()
+
+
+def _rtree_table(name: str) -> Table:
+    return Table(
+        name,
+        rtree_metadata,
+        Column("id", Integer, primary_key=True),
+        Column("min_lat", Float),
+        Column("max_lat", Float),
+        Column("min_lng", Float),
+        Column("max_lng", Float),
+    )
+
+
+spot_location_rtree = _rtree_table("spot_location_rtree")
+buoy_location_rtree = _rtree_table("buoy_location_rtree")
+tide_stations_rtree = _rtree_table("tide_stations_rtree")
+
+# source tables whose float latitude/longitude columns are mirrored by triggers
+TRIGGER_SYNCED_TABLES = {
+    "spot_location": "spot_location_rtree",
+    "buoy_location": "buoy_location_rtree",
+    "tide_stations": "tide_stations_rtree",
+}
+
+
+def rtree_ddl() -> List[str]:
+    """CREATE statements for every R*Tree table and its sync triggers"""
+    statements = [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {table.name} USING rtree(id, min_lat, max_lat, min_lng, max_lng)"
+        for table in (spot_location_rtree, buoy_location_rtree, tide_stations_rtree)
+    ]
+    for source, rtree in TRIGGER_SYNCED_TABLES.items():
+        statements += [
+            f"""CREATE TRIGGER IF NOT EXISTS {rtree}_insert AFTER INSERT ON {source}
+            WHEN new.latitude IS NOT NULL AND new.longitude IS NOT NULL
+            BEGIN
+                INSERT OR REPLACE INTO {rtree} VALUES (new.id, new.latitude, new.latitude, new.longitude, new.longitude);
+            END""",
+            f"""CREATE TRIGGER IF NOT EXISTS {rtree}_update AFTER UPDATE OF latitude, longitude ON {source}
+            BEGIN
+                DELETE FROM {rtree} WHERE id = old.id;
+                INSERT INTO {rtree} SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude
+                WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL;
+            END""",
+            f"""CREATE TRIGGER IF NOT EXISTS {rtree}_delete AFTER DELETE ON {source}
+            BEGIN
+                DELETE FROM {rtree} WHERE id = old.id;
+            END""",
+        ]
+    return statements
+
+
+def is_sqlite(bind: Any) -> bool:
+    return bind.dialect.name == "sqlite"
+
+
+def rtree_objects() -> List[str]:
+    """Names of every R*Tree table and sync trigger rtree_ddl() creates"""
+    names = list(TRIGGER_SYNCED_TABLES.values())
+    for rtree in TRIGGER_SYNCED_TABLES.values():
+        names += [f"{rtree}_insert", f"{rtree}_update", f"{rtree}_delete"]
+    return names
+
+
+def ensure_spatial_index(engine: Engine) -> None:
+    """
+    Create the R*Tree tables and triggers if missing, and resync an R*Tree
+    only when its row count has drifted from its source table.
+
+    Migrations create them on deployed databases, so startup normally just
+    compares counts; the DDL covers databases built by create_all (local
+    runs, tests). A no-op for databases other than SQLite.
+    """
+    if not is_sqlite(engine):
+        return
+    with engine.connect() as conn:
+        existing = {row[0] for row in conn.execute(text("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')"))}
+        stale = []
+        for source, rtree in TRIGGER_SYNCED_TABLES.items():
+            if rtree not in existing:
+                stale.append((source, rtree))
+                continue
+            expected = conn.execute(text(
+                f"SELECT count(*) FROM {source} WHERE latitude IS NOT NULL AND longitude IS NOT NULL"
+            )).scalar()
+            if conn.execute(text(f"SELECT count(*) FROM {rtree}")).scalar() != expected:
+                stale.append((source, rtree))
+    if not stale and existing.issuperset(rtree_objects()):
+        return
+    with engine.begin() as conn:
+        for statement in rtree_ddl():
+            conn.execute(text(statement))
+        for source, rtree in stale:
+            conn.execute(text(f"DELETE FROM {rtree}"))
+            conn.execute(text(
+                f"INSERT INTO {rtree} SELECT id, latitude, latitude, longitude, longitude FROM {source} "
+                "WHERE latitude IS NOT NULL AND longitude IS NOT NULL"
+            ))
+
+
+def parse_bbox(bbox: str) -> BBox:
+    """
+    Parse a "west,south,east,north" bounding box string
+
+    Raises:
+        ValueError: If the string is malformed or out of range
+    """
+    try:
+        west, south, east, north = (float(part) for part in bbox.split(","))
+    except ValueError:
+        raise ValueError("bbox must be 'west,south,east,north'")
+    if not (-180 <= west <= 180 and -180 <= east <= 180 and -90 <= south <= north <= 90):
+        raise ValueError("bbox out of range")
+    return west, south, east, north
+
+
+def spots_within(db: Session, bbox: BBox, limit: int = 500) -> List[models.SpotLocation]:
+    """Surf spots inside bbox"""
+    return _within(db, models.SpotLocation, spot_location_rtree, bbox, limit)
+
+
+def buoys_within(db: Session, bbox: BBox, limit: int = 500) -> List[models.BuoyLocation]:
+    """Active buoy locations inside bbox"""
+    return _within(db, models.BuoyLocation, buoy_location_rtree, bbox, limit, models.BuoyLocation.active == True)
+
+
+def tide_stations_within(db: Session, bbox: BBox, limit: int = 500) -> List[models.TideStation]:
+    """Tide stations inside bbox"""
+    return _within(db, models.TideStation, tide_stations_rtree, bbox, limit)
+
+
+def _within(db: Session, model: Any, rtree: Table, bbox: BBox, limit: int, *filters: Any) -> List[Any]:
+    query = db.query(model)
+    if is_sqlite(db.get_bind()):
+        query = query.join(rtree, rtree.c.id == model.id).filter(
+            _overlaps(bbox, rtree.c.min_lat, rtree.c.max_lat, rtree.c.min_lng, rtree.c.max_lng)
+        )
+    else:
+        query = query.filter(_overlaps(bbox, model.latitude, model.latitude, model.longitude, model.longitude))
+    return query.filter(*filters).limit(limit).all()
+
+
+def _overlaps(bbox: BBox, min_lat: Any, max_lat: Any, min_lng: Any, max_lng: Any) -> Any:
+    west, south, east, north = bbox
+    lat_clause = and_(max_lat >= south, min_lat <= north)
+    if west <= east:
+        lng_clause = and_(max_lng >= west, min_lng <= east)
+    else:
+        # viewport crosses the antimeridian
+        lng_clause = or_(max_lng >= west, min_lng <= east)
+    return and_(lat_clause, lng_clause)
@@ -0,0 +1,184 @@
+"""
+Tide Predictions
+
+Precomputes tide predictions for every tide station into the tide_prediction
+table. Predictions are published months ahead and never change, so a nightly
+job fetches the next N days of hilo and hourly predictions for all stations
+(with bounded concurrency) and the request path reads them locally instead of
+calling NOAA CO-OPS.
+
+Rows are stored one per prediction (time, height, H/L type) in MLLW feet, GMT,
+which is what /tides serves; requests for any other datum, units or time zone
+still go upstream.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from ..clients.noaa_tides_client import NOAATidesClient, tides_client
+from ..config import settings
+from ..models import TidePrediction, TideStation
+from ..schemas import HistoricalTidesRequest
+
+HILO: str = "hilo"
+HOURLY: str = "h"
+INTERVALS = (HILO, HOURLY)
+
+# the only variant stored; others are fetched live
+DATUM: str = "MLLW"
+UNITS: str = "english"
+TIME_ZONE: str = "gmt"
+
+TIME_FORMAT: str = "%Y-%m-%d %H:%M"
+
+
+def utc_day(day: datetime) -> datetime:
+    return datetime(day.year, day.month, day.day)
+
+
+def is_precomputed(request: HistoricalTidesRequest) -> bool:
+    """True if a request asks for the datum, units and time zone the table holds"""
+    return (request.product == "predictions" and request.datum == DATUM and request.units == UNITS
+            and request.time_zone == TIME_ZONE and request.interval in INTERVALS)
+
+
+def prediction_rows(station_id: str, interval: str, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Convert a CO-OPS predictions response into tide_prediction records
+
+    Args:
+        station_id: NOAA station ID
+        interval: hilo or h
+        payload: CO-OPS JSON response, {"predictions": [{"t", "v", "type"}]}
+
+    Returns:
+        One record per prediction
+
+    Raises:
+        ValueError: If the response carries no predictions (CO-OPS reports errors in the body)
+    """
+    if "predictions" not in payload:
+        message = payload.get("error", {}).get("message", "no predictions")
+        raise ValueError(f"Tide station {station_id}: {message}")
+    return [
+        {
+            "station_id": station_id,
+            "interval": interval,
+            "time": datetime.strptime(p["t"], TIME_FORMAT),
+            "height": float(p["v"]),
+            "type": p.get("type") or None,
+        }
+        for p in payload["predictions"]
+    ]
+
+
+class TidePredictionService:
+    """Service for precomputing and serving tide predictions"""
+
+    def __init__(self, db: Session, noaa_client: Optional[NOAATidesClient] = None):
+        self.db = db
+        self.noaa_client = noaa_client or tides_client
+
+    def get_predictions(self, station_id: str, interval: str, begin: datetime, end: datetime) -> List[Dict[str, Any]]:
+        """
+        Stored predictions for a station in [begin, end), formatted as CO-OPS returns them
+
+        Args:
+            station_id: NOAA station ID
+            interval: hilo or h
+            begin: Start time, GMT
+            end: End time, GMT
+
+        Returns:
+            Predictions in time order, empty if none are stored
+        """
+        rows = self.db.query(TidePrediction.time, TidePrediction.height, TidePrediction.type).filter(
+            TidePrediction.station_id == station_id,
+            TidePrediction.interval == interval,
+            TidePrediction.time >= begin,
+            TidePrediction.time < end,
+        ).order_by(TidePrediction.time).all()
+        predictions = []
+        for time, height, type_ in rows:
+            prediction = {"t": time.strftime(TIME_FORMAT), "v": f"{height:.3f}"}
+            if type_:
+                prediction["type"] = type_
+            predictions.append(prediction)
+        return predictions
+
+    def get_day(self, station_id: str, interval: str, day: datetime) -> List[Dict[str, Any]]:
+        """Stored predictions for one GMT calendar day"""
+        begin = utc_day(day)
+        return self.get_predictions(station_id, interval, begin, begin + timedelta(days=1))
+
+    async def fetch_station(self, station_id: str, interval: str, begin: datetime, days: int) -> List[Dict[str, Any]]:
+        """Fetch `days` days of predictions for one station from CO-OPS"""
+        request = HistoricalTidesRequest(
+            station=station_id,
+            product="predictions",
+            datum=DATUM,
+            time_zone=TIME_ZONE,
+            interval=interval,
+            units=UNITS,
+            begin_date=begin.strftime("%Y%m%d"),
+            end_date=(begin + timedelta(days=days - 1)).strftime("%Y%m%d"),
+        )
+        return prediction_rows(station_id, interval, await self.noaa_client.get_historical_tides(request))
+
+    async def precompute(self, station_ids: Optional[Iterable[str]] = None, days: Optional[int] = None,
+                         concurrency: Optional[int] = None, today: Optional[datetime] = None) -> int:
+        """
+        Fetch hilo and hourly predictions for every station and replace the stored rows
+
+        Args:
+            station_ids: Stations to refresh, every tide station when omitted
+            days: Days of predictions to fetch, starting today
+            concurrency: Requests in flight to CO-OPS at once
+            today: First day to fetch (GMT), now when omitted
+
+        Returns:
+            Number of predictions written
+        """
+        if station_ids is None:
+            station_ids = [row[0] for row in self.db.query(TideStation.station_id).all()]
+        days = days or settings.tide_precompute_days
+        begin = utc_day(today or datetime.utcnow())
+        semaphore = asyncio.Semaphore(concurrency or settings.tide_precompute_concurrency)
+
+        async def fetch(station_id: str, interval: str) -> Optional[List[Dict[str, Any]]]:
+            async with semaphore:
+                try:
+                    return await self.fetch_station(station_id, interval, begin, days)
+                except Exception as e:
+                    logging.warning(f"Skipping {interval} predictions for tide station {station_id}: {str(e)}")
+                    return None
+
+        jobs = [(station_id, interval) for station_id in station_ids for interval in INTERVALS]
+        results = await asyncio.gather(*[fetch(station_id, interval) for station_id, interval in jobs])
+        return self.replace(
+            {job: rows for job, rows in zip(jobs, results) if rows is not None},
+            keep_after=begin - timedelta(days=1),
+        )
+
+    def replace(self, fetched: Dict[Any, List[Dict[str, Any]]], keep_after: datetime) -> int:
+        """
+        Swap in freshly fetched predictions in one transaction
+
+        Each (station, interval) that was fetched has its rows replaced; one
+        that failed keeps what it had. Rows older than keep_after are pruned.
+        """
+        for station_id, interval in fetched:
+            self.db.query(TidePrediction).filter(
+                TidePrediction.station_id == station_id,
+                TidePrediction.interval == interval,
+            ).delete(synchronize_session=False)
+        self.db.query(TidePrediction).filter(TidePrediction.time < keep_after).delete(synchronize_session=False)
+        records = [row for rows in fetched.values() for row in rows]
+        if records:
+            self.db.bulk_insert_mappings(TidePrediction, records)
+        self.db.commit()
+        return len(records)
@@ -5,11 +5,14 @@ This service handles all tide-related business logic, database operations,
 and orchestrates calls to the NOAA Tides Client.
 """
 
+from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List
 from sqlalchemy.orm import Session
-from geopy import distance
 from ..models import TideStation
-from ..clients.noaa_tides_client import NOAATidesClient
+from ..clients.noaa_tides_client import NOAATidesClient, tides_client
+from .geo_index import geo_index, TIDE_STATIONS
+from .neighbors_service import NeighborsService
+from .tide_predictions import HILO, INTERVALS, TidePredictionService, is_precomputed, utc_day
 from ..schemas import (
     CurrentTidesRequest,
     HistoricalTidesRequest,
@@ -22,9 +25,10 @@ from ..schemas import (
 class TidesService:
     """Service for handling tide-related business logic and database operations"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, noaa_client: Optional[NOAATidesClient] = None):
         self.db = db
-        self.noaa_client = NOAATidesClient()
+        # the process-wide client shares its pooled connections and response cache
+        self.noaa_client = noaa_client or tides_client
     
     async def get_current_tides(self, request: CurrentTidesRequest) -> Dict[str, Any]:
         """
@@ -36,8 +40,7 @@ class TidesService:
         Returns:
             NOAA API response as dict
         """
-        async with self.noaa_client as client:
-            return await client.get_current_tides(request)
+        return await self.noaa_client.get_current_tides(request)
     
     async def get_tides_summary(self, request: HistoricalTidesRequest) -> Dict[str, Any]:
         """
@@ -60,11 +63,39 @@ class TidesService:
             application=request.application,
             format=request.format
         )
-        
-        async with self.noaa_client as client:
-            return await client.get_historical_tides(hilo_request)
+
+        # served from the nightly precompute; stations it has not covered yet go upstream
+        if is_precomputed(hilo_request) and hilo_request.date == "today":
+            predictions = TidePredictionService(self.db).get_day(request.station, hilo_request.interval, datetime.utcnow())
+            if predictions:
+                return {"predictions": predictions}
+
+        return await self.noaa_client.get_historical_tides(hilo_request)
     
-    def find_closest_tide_station(self, lat: float, lng: float, max_distance: float = 100) -> TideStationDistance:
+    def get_predictions(self, station_id: str, interval: str = HILO, days: int = 1) -> Dict[str, Any]:
+        """
+        Get precomputed predictions for a station, starting today (GMT)
+
+        Args:
+            station_id: NOAA station ID
+            interval: hilo for highs and lows, h for hourly heights
+            days: Number of days to return
+
+        Returns:
+            Predictions in the CO-OPS response shape
+
+        Raises:
+            ValueError: If the interval is unknown or nothing is stored for the station
+        """
+        if interval not in INTERVALS:
+            raise ValueError(f"Unknown interval {interval}, expected one of {', '.join(INTERVALS)}")
+        begin = utc_day(datetime.utcnow())
+        predictions = TidePredictionService(self.db).get_predictions(station_id, interval, begin, begin + timedelta(days=days))
+        if not predictions:
+            raise ValueError(f"No predictions stored for tide station {station_id}")
+        return {"predictions": predictions}
+
+    def find_closest_tide_station(self, lat: float, lng: float, max_distance: float = 100, exact: bool = False) -> TideStationDistance:
         """
         Find the closest tide station to given coordinates
         
@@ -72,6 +103,7 @@ class TidesService:
             lat: Latitude
             lng: Longitude  
             max_distance: Maximum search radius in miles
+            exact: Re-check the nearest candidates with geodesic distance
             
         Returns:
             TideStationDistance with closest station info
@@ -79,28 +111,17 @@ class TidesService:
         Raises:
             ValueError: If no stations found within range
         """
-        stations = self.db.query(TideStation.station_id, TideStation.latitude, TideStation.longitude).all()
+        index = geo_index.get(TIDE_STATIONS, self.db)
         
-        if not stations:
+        if not len(index):
             raise ValueError("No tide stations found in database")
         
-        best_stations = []
-        for station in stations:
-            station_distance = distance.distance((lat, lng), (station.latitude, station.longitude)).miles
-            if station_distance < max_distance:
-                best_stations.append({
-                    "station_id": station.station_id,
-                    "distance": station_distance,
-                    "latitude": station.latitude,
-                    "longitude": station.longitude
-                })
-        
-        if not best_stations:
+        closest = index.query(lat, lng, radius=max_distance, limit=1, exact=exact)
+        
+        if not closest:
             raise ValueError(f"No tide stations found within {max_distance} miles of coordinates ({lat}, {lng})")
         
-        # Return closest station
-        closest = min(best_stations, key=lambda x: x['distance'])
-        return TideStationDistance(**closest)
+        return TideStationDistance(**closest[0])
     
     def get_tide_stations(self, limit: int = 100, offset: int = 0) -> TideStationsListResponse:
         """
@@ -183,3 +204,5 @@ class TidesService:
         
         self.db.delete(station)
         self.db.commit()
+        geo_index.rebuild(TIDE_STATIONS, self.db)
+        NeighborsService(self.db).refresh_for_tide_stations([station_id])
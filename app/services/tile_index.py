@@ -0,0 +1,119 @@
+"""
+Tile Index
+
+Precomputed web-mercator tiles of spot and buoy features with server-side
+clustering. Points are grouped into fixed pixel cells at every zoom level up
+to CLUSTER_MAX_ZOOM, so a tile request is a dictionary lookup instead of a
+clustering pass on the client.
+"""
+
+import math
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+
+from ..config import settings
+from .derived_cache import DerivedCache
+from .geojson_cache import LOCATIONS_GEOJSON, SPOTS_GEOJSON, build_location_features, build_spot_features
+
+TILE_SIZE: int = 256
+# cluster cell edge in pixels; must divide TILE_SIZE so cells never straddle tiles
+CLUSTER_CELL_PX: int = 64
+CLUSTER_MAX_ZOOM: int = 12
+MAX_ZOOM: int = 16
+MAX_REQUEST_ZOOM: int = 22
+MAX_LATITUDE: float = 85.05112878
+
+TileKey = Tuple[int, int]
+
+
+def lnglat_to_world(lng: float, lat: float) -> Tuple[float, float]:
+    """Project to web-mercator world coordinates in [0, 1)"""
+    lat = max(-MAX_LATITUDE, min(MAX_LATITUDE, lat))
+    x = (lng + 180.0) / 360.0
+    sin_lat = math.sin(math.radians(lat))
+    y = 0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+    return min(max(x, 0.0), 1.0 - 1e-12), min(max(y, 0.0), 1.0 - 1e-12)
+
+
+def world_to_tile(wx: float, wy: float, z: int) -> TileKey:
+    """The (x, y) tile containing a world coordinate at zoom z"""
+    n = 2 ** z
+    return int(wx * n), int(wy * n)
+
+
+def is_valid_tile(z: int, x: int, y: int) -> bool:
+    return 0 <= z <= MAX_REQUEST_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+
+def _cluster_feature(z: int, cell: TileKey, members: List[Dict[str, Any]]) -> Dict[str, Any]:
+    lngs = [f["geometry"]["coordinates"][0] for f in members]
+    lats = [f["geometry"]["coordinates"][1] for f in members]
+    return {
+        "type": "Feature",
+        "geometry": {
+            "type": "Point",
+            "coordinates": [sum(lngs) / len(lngs), sum(lats) / len(lats)],
+        },
+        "properties": {
+            "cluster": True,
+            "cluster_id": f"{z}/{cell[0]}/{cell[1]}",
+            "point_count": len(members),
+            "bbox": [min(lngs), min(lats), max(lngs), max(lats)],
+        },
+    }
+
+
+class TileIndex:
+    """Features bucketed by tile for every zoom level, clustered at low zoom"""
+
+    def __init__(self, features: List[Dict[str, Any]]):
+        self.features = features
+        self.world = [lnglat_to_world(*f["geometry"]["coordinates"][:2]) for f in features]
+        self.tiles: List[Dict[TileKey, List[Dict[str, Any]]]] = [self._build_zoom(z) for z in range(MAX_ZOOM + 1)]
+        self.built_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.features)
+
+    def _build_zoom(self, z: int) -> Dict[TileKey, List[Dict[str, Any]]]:
+        world_px = TILE_SIZE * 2 ** z
+        cells_per_tile = TILE_SIZE // CLUSTER_CELL_PX
+        tiles: Dict[TileKey, List[Dict[str, Any]]] = defaultdict(list)
+
+        if z > CLUSTER_MAX_ZOOM:
+            for feature, (wx, wy) in zip(self.features, self.world):
+                tiles[world_to_tile(wx, wy, z)].append(feature)
+            return dict(tiles)
+
+        cells: Dict[TileKey, List[Dict[str, Any]]] = defaultdict(list)
+        for feature, (wx, wy) in zip(self.features, self.world):
+            cells[(int(wx * world_px) // CLUSTER_CELL_PX, int(wy * world_px) // CLUSTER_CELL_PX)].append(feature)
+
+        for cell, members in cells.items():
+            tile = (cell[0] // cells_per_tile, cell[1] // cells_per_tile)
+            tiles[tile].append(members[0] if len(members) == 1 else _cluster_feature(z, cell, members))
+        return dict(tiles)
+
+    def get_tile(self, z: int, x: int, y: int) -> Dict[str, Any]:
+        """
+        Get the FeatureCollection for one tile
+
+        Zoom levels past MAX_ZOOM are served by filtering the enclosing MAX_ZOOM tile.
+        """
+        if z <= MAX_ZOOM:
+            features = self.tiles[z].get((x, y), [])
+        else:
+            shift = z - MAX_ZOOM
+            parent = self.tiles[MAX_ZOOM].get((x >> shift, y >> shift), [])
+            features = [f for f in parent if world_to_tile(*lnglat_to_world(*f["geometry"]["coordinates"][:2]), z) == (x, y)]
+        return {"type": "FeatureCollection", "features": features}
+
+
+tile_index: DerivedCache[TileIndex] = DerivedCache(
+    {
+        SPOTS_GEOJSON: lambda db: TileIndex(build_spot_features(db)),
+        LOCATIONS_GEOJSON: lambda db: TileIndex(build_location_features(db)),
+    },
+    max_age_seconds=settings.geojson_max_age_seconds,
+)
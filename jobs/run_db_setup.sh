@@ -4,10 +4,14 @@ clear
 
 echo "Running db setup job...(db_setup.py)"
 
-python3 tools/import_station_data.py data/stations_json_*.json
+python3 -m tools.import_station_data data/stations_json_*.json
 
 python3 tools/import_tide_stations.py data/tide_stations.json
 
 python3 tools/import_spot_json.py data/spots_list.json
 
+python3 -m tools.refresh_place_neighbors
+
+python3 -m tools.refresh_coast_order
+
 echo "Done!"
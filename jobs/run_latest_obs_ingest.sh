@@ -0,0 +1,9 @@
+#!/bin/bash
+
+clear
+
+echo "Running latest obs ingest job...(ingest_latest_obs.py)"
+
+python3 -m tools.ingest_latest_obs
+
+echo "Done!"
@@ -0,0 +1,9 @@
+#!/bin/bash
+
+clear
+
+echo "Running place neighbors job...(refresh_place_neighbors.py)"
+
+python3 -m tools.refresh_place_neighbors
+
+echo "Done!"
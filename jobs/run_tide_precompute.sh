@@ -0,0 +1,9 @@
+#!/bin/bash
+
+clear
+
+echo "Running tide prediction precompute job...(precompute_tide_predictions.py)"
+
+python3 -m tools.precompute_tide_predictions
+
+echo "Done!"
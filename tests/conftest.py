@@ -1,4 +1,12 @@
 import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import models
+from app.main import app
+from app.database import get_db
+from app.services.spatial_index import ensure_spatial_index
 
 @pytest.fixture
 def sample_spot_data():
@@ -10,4 +18,18 @@ def sample_spot_data():
         "latitude": 36.95,
         "longitude": -121.97,
         "subregion_name": "Central California"
-    } 
\ No newline at end of file
+    }
+
+@pytest.fixture
+def memory_db():
+    """An empty in-memory database, with the R*Tree index, serving the app's requests."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    models.Base.metadata.create_all(bind=engine)
+    ensure_spatial_index(engine)
+    session = sessionmaker(bind=engine)()
+    app.dependency_overrides[get_db] = lambda: session
+    try:
+        yield session
+    finally:
+        app.dependency_overrides.clear()
+        session.close()
@@ -1,3 +1,6 @@
+import asyncio
+
+import httpx
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 from fastapi.testclient import TestClient
@@ -5,6 +8,8 @@ from sqlalchemy.orm import Session
 
 from app.main import app
 from app import models, schemas
+from app.config import settings
+from app.routers.batch import get_weather_forecasts_async, weather_cache, weather_cache_key
 
 client = TestClient(app)
 
@@ -27,6 +32,8 @@ def sample_buoy_locations():
             url="https://example.com/46276",
             description="Santa Barbara Channel",
             location="34.5 N 120.5 W",
+            latitude=34.5,
+            longitude=-120.5,
             active=True,
             weight=1
         ),
@@ -37,6 +44,8 @@ def sample_buoy_locations():
             url="https://example.com/46268", 
             description="San Pedro Channel",
             location="33.5 N 118.5 W",
+            latitude=33.5,
+            longitude=-118.5,
             active=True,
             weight=1
         )
@@ -97,10 +106,10 @@ class TestBatchForecastEndpoint:
         
         # Mock external API calls
         with patch('app.routers.batch.get_latest_observation_async', new_callable=AsyncMock) as mock_obs, \
-             patch('app.routers.batch.get_weather_forecast_async', new_callable=AsyncMock) as mock_weather:
+             patch('app.routers.batch.get_weather_forecasts_async', new_callable=AsyncMock) as mock_weather:
             
             mock_obs.return_value = mock_buoy_observation_data
-            mock_weather.return_value = mock_weather_data
+            mock_weather.side_effect = lambda coords: [mock_weather_data] * len(coords)
             
             # Make request
             response = client.post(
@@ -140,9 +149,9 @@ class TestBatchForecastEndpoint:
         mock_db_session.query.return_value.filter.return_value.all.return_value = sample_spot_locations
         
         # Mock external API calls (spots only fetch weather forecast now)
-        with patch('app.routers.batch.get_weather_forecast_async', new_callable=AsyncMock) as mock_weather:
+        with patch('app.routers.batch.get_weather_forecasts_async', new_callable=AsyncMock) as mock_weather:
             
-            mock_weather.return_value = mock_weather_data
+            mock_weather.side_effect = lambda coords: [mock_weather_data] * len(coords)
             
             # Make request
             response = client.post(
@@ -189,10 +198,10 @@ class TestBatchForecastEndpoint:
         
         # Mock external API calls (spots only fetch weather forecast now)
         with patch('app.routers.batch.get_latest_observation_async', new_callable=AsyncMock) as mock_obs, \
-             patch('app.routers.batch.get_weather_forecast_async', new_callable=AsyncMock) as mock_weather:
+             patch('app.routers.batch.get_weather_forecasts_async', new_callable=AsyncMock) as mock_weather:
             
             mock_obs.return_value = mock_buoy_observation_data
-            mock_weather.return_value = mock_weather_data
+            mock_weather.side_effect = lambda coords: [mock_weather_data] * len(coords)
             
             # Make request
             response = client.post(
@@ -215,10 +224,10 @@ class TestBatchForecastEndpoint:
         
         # Mock external API calls
         with patch('app.routers.batch.get_latest_observation_async', new_callable=AsyncMock) as mock_obs, \
-             patch('app.routers.batch.get_weather_forecast_async', new_callable=AsyncMock) as mock_weather:
+             patch('app.routers.batch.get_weather_forecasts_async', new_callable=AsyncMock) as mock_weather:
             
             mock_obs.return_value = []
-            mock_weather.return_value = {}
+            mock_weather.side_effect = lambda coords: [{}] * len(coords)
             
             # Make request with one valid and one invalid buoy ID
             response = client.post(
@@ -242,7 +251,7 @@ class TestBatchForecastEndpoint:
         
         # Mock external API calls to fail
         with patch('app.routers.batch.get_latest_observation_async', new_callable=AsyncMock) as mock_obs, \
-             patch('app.routers.batch.get_weather_forecast_async', new_callable=AsyncMock) as mock_weather:
+             patch('app.routers.batch.get_weather_forecasts_async', new_callable=AsyncMock) as mock_weather:
             
             mock_obs.side_effect = Exception("API Error")
             mock_weather.side_effect = Exception("API Error")
@@ -358,4 +367,47 @@ class TestWeatherDataExtraction:
         # Should have swell data but no wind or current data
         assert result["swell"] is not None
         assert result["wind"] is None
-        assert result["current"] is None 
\ No newline at end of file
+        assert result["current"] is None 
+class TestMultiLocationForecast:
+    """Test suite for grouping forecast cache misses into multi-location requests."""
+    
+    def test_misses_grouped_and_cached_per_location(self):
+        """Cache misses share chunked requests; each forecast is cached on its own key."""
+        
+        requests = []
+        
+        def handler(request):
+            lats = request.url.params["latitude"].split(",")
+            requests.append(lats)
+            forecasts = [{"latitude": float(lat), "current": {"swell_wave_height": float(lat)}} for lat in lats]
+            return httpx.Response(200, json=forecasts if len(forecasts) > 1 else forecasts[0])
+        
+        class FakePool:
+            def get(self, name):
+                return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        
+        weather_cache.clear()
+        weather_cache.set(weather_cache_key(10.0, -120.0), {"cached": True})
+        coords = [(34.38, -119.48), (10.0, -120.0), (34.04, -118.68), (34.381, -119.481), (33.5, -118.5)]
+        
+        with patch('app.routers.batch.http_clients', FakePool()), \
+             patch.object(settings, 'open_meteo_batch_size', 2):
+            forecasts = asyncio.run(get_weather_forecasts_async(coords))
+        
+        # one cached, one duplicate after rounding: three misses in two requests
+        assert sorted(len(lats) for lats in requests) == [1, 2]
+        assert forecasts[1] == {"cached": True}
+        assert forecasts[0] is forecasts[3]
+        assert [f["latitude"] for f in (forecasts[0], forecasts[2], forecasts[4])] == [34.38, 34.04, 33.5]
+        assert weather_cache.get(weather_cache_key(33.5, -118.5))["latitude"] == 33.5
+        weather_cache.clear()
+    
+    def test_failed_request_returns_none(self):
+        
+        class FakePool:
+            def get(self, name):
+                return httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(503)))
+        
+        weather_cache.clear()
+        with patch('app.routers.batch.http_clients', FakePool()):
+            assert asyncio.run(get_weather_forecasts_async([(1.0, 2.0), (3.0, 4.0)])) == [None, None]
@@ -0,0 +1,166 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app import oauth2
+from app.main import app
+from app.config import settings
+from app.clients.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitBreakerTransport, CircuitOpenError, circuit_breakers
+
+client = TestClient(app)
+
+def breaker_client(handler, breaker):
+    return httpx.AsyncClient(transport=CircuitBreakerTransport(httpx.MockTransport(handler), breaker), timeout=10.0)
+
+def test_opens_after_repeated_failures_and_fails_fast():
+    breaker = CircuitBreaker("test", max_read_timeout=10.0)
+    calls = []
+
+    def handler(request):
+        calls.append(1)
+        return httpx.Response(503)
+
+    async def run():
+        async with breaker_client(handler, breaker) as upstream:
+            for _ in range(settings.circuit_failure_threshold):
+                await upstream.get("https://upstream.test/")
+            with pytest.raises(CircuitOpenError):
+                await upstream.get("https://upstream.test/")
+
+    asyncio.run(run())
+    assert breaker.state == OPEN
+    assert len(calls) == settings.circuit_failure_threshold
+    assert breaker.rejected == 1
+
+def test_half_open_trial_closes_on_success():
+    breaker = CircuitBreaker("test", max_read_timeout=10.0)
+    for _ in range(settings.circuit_failure_threshold):
+        breaker.record_failure()
+    assert breaker.state == OPEN
+
+    breaker.opened_at -= settings.circuit_reset_seconds
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    # only one trial at a time
+    assert not breaker.allow()
+    breaker.record_success(0.2)
+    assert breaker.state == CLOSED
+
+def test_half_open_trial_reopens_on_failure():
+    breaker = CircuitBreaker("test", max_read_timeout=10.0)
+    breaker._open()
+    breaker.opened_at -= settings.circuit_reset_seconds
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+def test_client_errors_do_not_count_as_failures():
+    breaker = CircuitBreaker("test", max_read_timeout=10.0)
+
+    async def run():
+        async with breaker_client(lambda request: httpx.Response(404), breaker) as upstream:
+            for _ in range(settings.circuit_failure_threshold + 1):
+                await upstream.get("https://upstream.test/")
+
+    asyncio.run(run())
+    assert breaker.state == CLOSED
+    assert breaker.error_rate() == 0.0
+
+def test_read_timeout_follows_p99():
+    """With enough samples the read timeout shrinks toward a multiple of p99."""
+    breaker = CircuitBreaker("test", max_read_timeout=10.0)
+    assert breaker.read_timeout() == 10.0
+    for _ in range(settings.circuit_min_samples):
+        breaker.record_success(2.0)
+    assert breaker.read_timeout() == pytest.approx(2.0 * settings.circuit_timeout_multiplier)
+    for _ in range(settings.circuit_window_size):
+        breaker.record_success(0.05)
+    assert breaker.read_timeout() == settings.circuit_min_read_timeout_seconds
+
+def test_transport_applies_adaptive_timeout():
+    breaker = CircuitBreaker("test", max_read_timeout=10.0)
+    for _ in range(settings.circuit_min_samples):
+        breaker.record_success(1.0)
+    seen = {}
+
+    def handler(request):
+        seen.update(request.extensions["timeout"])
+        return httpx.Response(200)
+
+    async def run():
+        async with breaker_client(handler, breaker) as upstream:
+            await upstream.get("https://upstream.test/")
+
+    asyncio.run(run())
+    assert seen["read"] == pytest.approx(1.0 * settings.circuit_timeout_multiplier)
+    assert seen["connect"] == 10.0
+
+class StallingBody(httpx.AsyncByteStream):
+    """A body that sends its first chunk and then times out."""
+
+    def __init__(self, request):
+        self.request = request
+
+    async def __aiter__(self):
+        yield b"#YY  MM DD hh mm"
+        raise httpx.ReadTimeout("timed out", request=self.request)
+
+def test_body_read_failures_are_counted():
+    """A host that stalls mid-body is a failure, and only a full body is a success."""
+    breaker = CircuitBreaker("test", max_read_timeout=10.0)
+
+    def handler(request):
+        if request.url.path == "/stall":
+            return httpx.Response(200, stream=StallingBody(request))
+        return httpx.Response(200, content=b"ok")
+
+    async def run():
+        async with breaker_client(handler, breaker) as upstream:
+            with pytest.raises(httpx.ReadTimeout):
+                await upstream.get("https://upstream.test/stall")
+            assert breaker.snapshot()["failures"] == 1
+            assert breaker.snapshot()["latency_p50"] is None
+            await upstream.get("https://upstream.test/ok")
+
+    asyncio.run(run())
+    assert breaker.snapshot()["failures"] == 1
+    assert breaker.consecutive_failures == 0
+    assert breaker.latency_percentile(50) is not None
+
+def test_error_rate_opens_breaker():
+    breaker = CircuitBreaker("test", max_read_timeout=10.0)
+    with patch.object(settings, "circuit_failure_threshold", 1000):
+        for i in range(settings.circuit_min_samples):
+            breaker.record_failure() if i % 4 else breaker.record_success(0.1)
+    assert breaker.state == OPEN
+
+@pytest.fixture
+def admin_user():
+    app.dependency_overrides[oauth2.get_current_user] = lambda: SimpleNamespace(is_admin=True)
+    yield
+    app.dependency_overrides.clear()
+
+def test_admin_upstreams(admin_user):
+    breaker = circuit_breakers.get("ndbc", 5.0)
+    breaker.record_failure()
+    response = client.get("/api/v1/admin/upstreams")
+    assert response.status_code == 200
+    body = response.json()
+    assert set(body) == {"ndbc", "open_meteo", "weather_gov", "coops"}
+    assert body["ndbc"]["consecutive_failures"] >= 1
+    assert {"limit", "in_use", "queued"} <= set(body["ndbc"]["concurrency"])
+
+    assert client.post("/api/v1/admin/upstreams/ndbc/reset").status_code == 200
+    assert client.get("/api/v1/admin/upstreams").json()["ndbc"]["consecutive_failures"] == 0
+    assert client.post("/api/v1/admin/upstreams/nope/reset").status_code == 404
+
+def test_admin_upstreams_requires_admin():
+    app.dependency_overrides[oauth2.get_current_user] = lambda: SimpleNamespace(is_admin=False)
+    try:
+        assert client.get("/api/v1/admin/upstreams").status_code == 403
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,73 @@
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+
+from app import models
+from app.main import app
+from app.services import geo_index as geo_index_module
+from app.services.geo_index import GeoIndexRegistry, SPOTS
+from app.services.coast_order import CoastOrderService, compute_coast_order
+
+client = TestClient(app)
+
+# listed out of order on purpose; down the coast they run 1..6
+SPOTS_BY_SUBREGION = [
+    (4, "Pleasure Point", "Santa Cruz", 36.9560, -121.9700),
+    (2, "Mavericks", "San Mateo", 37.4950, -122.4970),
+    (6, "Malibu", "Los Angeles", 34.0359, -118.6775),
+    (3, "Steamer Lane", "Santa Cruz", 36.9519, -122.0308),
+    (1, "Pacifica", "San Mateo", 37.6100, -122.5000),
+    (5, "Rincon", "Ventura", 34.3731, -119.4778),
+]
+
+def _records():
+    return [
+        {"id": spot_id, "name": name, "subregion_name": subregion, "latitude": lat, "longitude": lng}
+        for spot_id, name, subregion, lat, lng in SPOTS_BY_SUBREGION
+    ]
+
+@pytest.fixture
+def coast_db(memory_db):
+    """An in-memory database with spots along the California coast and a private geo index."""
+    memory_db.add_all([
+        models.SpotLocation(id=spot_id, name=name, timezone="America/Los_Angeles", latitude=lat, longitude=lng, subregion_name=subregion, slug=name.lower().replace(" ", "-"))
+        for spot_id, name, subregion, lat, lng in SPOTS_BY_SUBREGION
+    ])
+    memory_db.commit()
+
+    registry = GeoIndexRegistry({SPOTS: geo_index_module.load_spot_records})
+    with patch("app.services.coast_order.geo_index", registry):
+        CoastOrderService(memory_db).refresh()
+        yield memory_db
+
+def test_compute_coast_order_chains_subregions():
+    """Spots are ordered within subregions and subregions chained down the coast."""
+    order = compute_coast_order(_records())
+    # Santa Cruz is entered from Steamer Lane, the end nearest Mavericks
+    assert sorted(order, key=lambda spot_id: order[spot_id][0]) == [1, 2, 3, 4, 5, 6]
+    positions = [position for _, position in sorted(order.values())]
+    assert positions[0] == 0.0
+    assert positions == sorted(positions)
+
+def test_compute_coast_order_empty():
+    assert compute_coast_order([]) == {}
+
+def test_adjacent_returns_n_each_side(coast_db):
+    """GET /spots/{id}/adjacent returns neighbours on each side, nearest first."""
+    response = client.get("/api/v1/spots/4/adjacent?n=2")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["spot"]["id"] == 4
+    assert [s["id"] for s in body["previous"]] == [3, 2]
+    assert [s["id"] for s in body["next"]] == [5, 6]
+    assert body["next"][0]["coast_distance"] < body["next"][1]["coast_distance"]
+
+def test_adjacent_at_end_of_coast(coast_db):
+    """The last spot has nothing after it."""
+    body = client.get("/api/v1/spots/6/adjacent").json()
+    assert [s["id"] for s in body["previous"]] == [5]
+    assert body["next"] == []
+
+def test_adjacent_errors(coast_db):
+    assert client.get("/api/v1/spots/999/adjacent").status_code == 404
+    assert client.get("/api/v1/spots/4/adjacent?n=0").status_code == 400
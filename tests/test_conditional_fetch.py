@@ -0,0 +1,142 @@
+import asyncio
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.clients.conditional_fetch import ConditionalFetcher
+from app.clients.http_pool import get_ndbc_client
+
+client = TestClient(app)
+
+REALTIME = """#YY  MM DD hh mm WDIR WSPD GST  WVHT   DPD   APD MWD   PRES  ATMP  WTMP  DEWP  VIS PTDY  TIDE
+#yr  mo dy hr mn degT m/s  m/s     m   sec   sec degT   hPa  degC  degC  degC  nmi  hPa    ft
+2026 10 17 12 10 300  7.0  9.0   2.1    12   7.5 295 1015.2  13.8  14.2  11.0   MM -0.6    MM
+2026 10 17 12 00 300  6.0  8.0   2.0    12   7.4 295 1015.4  13.8  14.2  11.0   MM   MM    MM
+"""
+
+def revalidating_server(body, etag=None, last_modified=None):
+    """Serves body with validators, answering 304 when the client's validator matches."""
+    seen = []
+
+    def handler(request):
+        seen.append(dict(request.headers))
+        if etag and request.headers.get("if-none-match") == etag:
+            return httpx.Response(304)
+        if last_modified and request.headers.get("if-modified-since") == last_modified:
+            return httpx.Response(304)
+        headers = {}
+        if etag:
+            headers["ETag"] = etag
+        if last_modified:
+            headers["Last-Modified"] = last_modified
+        return httpx.Response(200, text=body(), headers=headers)
+
+    return handler, seen
+
+def fetch_twice(fetcher, handler, parse):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as upstream:
+            first = await fetcher.fetch(upstream, "https://www.ndbc.noaa.gov/data/realtime2/46042.txt", parse)
+            second = await fetcher.fetch(upstream, "https://www.ndbc.noaa.gov/data/realtime2/46042.txt", parse)
+            return first, second
+    return asyncio.run(run())
+
+def test_unchanged_file_reuses_parse():
+    """A 304 returns the stored parse without re-downloading or re-parsing."""
+    fetcher = ConditionalFetcher(8)
+    handler, seen = revalidating_server(lambda: "file", etag='"v1"')
+    parses = []
+
+    first, second = fetch_twice(fetcher, handler, lambda text: parses.append(text) or {"text": text})
+
+    assert first is second
+    assert parses == ["file"]
+    assert seen[1]["if-none-match"] == '"v1"'
+    assert fetcher.stats()["revalidated"] == 1
+
+def test_last_modified_revalidation():
+    fetcher = ConditionalFetcher(8)
+    handler, seen = revalidating_server(lambda: "file", last_modified="Sat, 17 Oct 2026 12:10:00 GMT")
+
+    fetch_twice(fetcher, handler, str.upper)
+
+    assert seen[1]["if-modified-since"] == "Sat, 17 Oct 2026 12:10:00 GMT"
+    assert fetcher.revalidated == 1
+
+def test_changed_file_is_parsed_again():
+    fetcher = ConditionalFetcher(8)
+    versions = iter(["v1", "v2"])
+
+    def handler(request):
+        version = next(versions)
+        return httpx.Response(200, text=version, headers={"ETag": f'"{version}"'})
+
+    assert fetch_twice(fetcher, handler, str.upper) == ("V1", "V2")
+    assert fetcher.downloaded == 2
+
+def test_files_without_validators_are_not_kept():
+    fetcher = ConditionalFetcher(8)
+    handler, seen = revalidating_server(lambda: "file")
+
+    fetch_twice(fetcher, handler, str.upper)
+
+    assert "if-none-match" not in seen[1]
+    assert fetcher.stats()["size"] == 0
+
+def test_least_recently_used_evicted():
+    fetcher = ConditionalFetcher(2)
+    handler, _ = revalidating_server(lambda: "file", etag='"v1"')
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as upstream:
+            for station in ["46042", "46026", "46042", "46011"]:
+                await fetcher.fetch(upstream, f"https://www.ndbc.noaa.gov/data/realtime2/{station}.txt", str.upper)
+
+    asyncio.run(run())
+    assert list(fetcher._entries) == [
+        "https://www.ndbc.noaa.gov/data/realtime2/46042.txt",
+        "https://www.ndbc.noaa.gov/data/realtime2/46011.txt",
+    ]
+
+@pytest.fixture
+def realtime_server():
+    handler, seen = revalidating_server(lambda: REALTIME, etag='"46042-1210"')
+
+    async def mock_client():
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    app.dependency_overrides[get_ndbc_client] = mock_client
+    with patch("app.routers.location.ndbc_files", ConditionalFetcher(8)):
+        yield seen
+    app.dependency_overrides.clear()
+
+def test_realtime_revalidates(realtime_server):
+    """The realtime route sends the stored ETag and serves the cached frame on 304."""
+    first = client.get("/api/v1/locations/46042/realtime?limit=2")
+    second = client.get("/api/v1/locations/46042/realtime?limit=1")
+
+    assert first.status_code == second.status_code == 200
+    assert realtime_server[1]["if-none-match"] == '"46042-1210"'
+    assert len(first.json()["data"]["wave_height"]) == 2
+    assert len(second.json()["data"]["wave_height"]) == 1
+
+def test_realtime_skips_validator_when_stored_rows_fall_short(realtime_server):
+    """A stored read with fewer rows than the new limit is not revalidated."""
+    client.get("/api/v1/locations/46042/realtime?limit=1")
+    second = client.get("/api/v1/locations/46042/realtime?limit=2")
+
+    assert second.status_code == 200
+    assert "if-none-match" not in realtime_server[1]
+    assert len(second.json()["data"]["wave_height"]) == 2
+
+def test_partial_read_not_reused_for_whole_file(realtime_server):
+    """A read cut short at limit is never revalidated by the full-file path."""
+    client.get("/api/v1/locations/46042/realtime?limit=1")
+    full = client.get("/api/v1/locations/46042/realtime?limit=1&send_html=true")
+
+    assert full.status_code == 200
+    assert "if-none-match" not in realtime_server[1]
+    assert full.json()["html"].count("<tr>") == 2
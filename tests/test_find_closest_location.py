@@ -0,0 +1,85 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.config import settings
+from app.services.geo_index import GeoIndexRegistry
+
+client = TestClient(app)
+
+BUOYS = [
+    {"location_id": f"4600{i}", "name": f"Buoy {i}", "url": None, "description": None, "location": None, "latitude": 36.9 + i * 0.01, "longitude": -122.0}
+    for i in range(6)
+]
+
+@pytest.fixture
+def fake_buoys():
+    registry = GeoIndexRegistry({"buoys": lambda db: BUOYS})
+    with patch("app.routers.location.geo_index", registry):
+        yield
+
+def test_only_top_k_fetched_concurrently(fake_buoys):
+    """Only the k nearest buoys are fetched, no more than the fan-out limit at once."""
+    calls = []
+    running = {"now": 0, "max": 0}
+
+    async def fake_observation(location_id, client=None):
+        calls.append(location_id)
+        running["now"] += 1
+        running["max"] = max(running["max"], running["now"])
+        await asyncio.sleep(0.01)
+        running["now"] -= 1
+        return {"wave_height": location_id}
+
+    with patch("app.routers.location.get_latest_obvservation", fake_observation), \
+            patch.object(settings, "observation_fanout_concurrency", 2):
+        response = client.get("/api/v1/locations/find_closest?lat=36.9&lng=-122.0&limit=3")
+
+    assert response.status_code == 200
+    assert sorted(calls) == ["46000", "46001", "46002"]
+    assert running["max"] == 2
+    assert [b["latest_observation"]["wave_height"] for b in response.json()] == ["46000", "46001", "46002"]
+
+def test_deadline_drops_slow_observations(fake_buoys):
+    """Observations that miss the overall deadline come back empty."""
+    async def fake_observation(location_id, client=None):
+        await asyncio.sleep(5 if location_id == "46001" else 0)
+        return {"wave_height": "4 ft"}
+
+    with patch("app.routers.location.get_latest_obvservation", fake_observation), \
+            patch.object(settings, "observation_fanout_deadline_seconds", 0.2):
+        response = client.get("/api/v1/locations/find_closest?lat=36.9&lng=-122.0&limit=2")
+
+    assert response.status_code == 200
+    assert [b["latest_observation"] for b in response.json()] == [{"wave_height": "4 ft"}, None]
+
+def test_geometry_only_skips_upstream(fake_buoys):
+    async def fake_observation(location_id, client=None):
+        raise AssertionError("should not fetch")
+
+    with patch("app.routers.location.get_latest_obvservation", fake_observation):
+        response = client.get("/api/v1/locations/find_closest?lat=36.9&lng=-122.0&include_observation=false")
+
+    assert response.status_code == 200
+    assert len(response.json()) == 3
+    assert "latest_observation" not in response.json()[0]
+
+def test_index_built_off_the_event_loop():
+    """The index load (and any rebuild) runs in a worker thread, not on the event loop."""
+    loop_running = []
+
+    def load(db):
+        try:
+            asyncio.get_running_loop()
+            loop_running.append(True)
+        except RuntimeError:
+            loop_running.append(False)
+        return BUOYS
+
+    with patch("app.routers.location.geo_index", GeoIndexRegistry({"buoys": load})):
+        response = client.get("/api/v1/locations/find_closest?lat=36.9&lng=-122.0&limit=1&include_observation=false")
+
+    assert response.status_code == 200
+    assert loop_running == [False]
@@ -0,0 +1,162 @@
+import asyncio
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.config import settings
+from app.clients.circuit_breaker import CircuitOpenError
+from app.routers.forecast import get_forecast, forecast_batcher
+from app.clients.http_pool import get_open_meteo_client, get_weather_gov_client
+
+client = TestClient(app)
+
+def _override(dependency, handler):
+    async def mock_client():
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    app.dependency_overrides[dependency] = mock_client
+
+@pytest.fixture(autouse=True)
+def clear_overrides():
+    yield
+    app.dependency_overrides.clear()
+
+def test_forecast_proxies_open_meteo():
+    """/forecast passes its query through to Open-Meteo on the pooled client."""
+    seen = {}
+
+    def handler(request):
+        seen["params"] = dict(request.url.params)
+        return httpx.Response(200, json={"current": {"swell_wave_height": 3.1}})
+
+    _override(get_open_meteo_client, handler)
+    response = client.get("/api/v1/forecast?latitude=36.9&longitude=-122.0&current=swell_wave_height")
+
+    assert response.status_code == 200
+    assert response.json()["current"]["swell_wave_height"] == 3.1
+    assert seen["params"] == {"latitude": "36.9", "longitude": "-122.0", "length_unit": "imperial", "current": "swell_wave_height"}
+
+def test_forecast_fetches_the_rounded_point():
+    """Coalesced callers share one key, so the point sent upstream is the rounded one."""
+    seen = {}
+
+    def handler(request):
+        seen["params"] = dict(request.url.params)
+        return httpx.Response(200, json={"latitude": 36.95, "longitude": -122.03})
+
+    _override(get_open_meteo_client, handler)
+    response = client.get("/api/v1/forecast?latitude=36.9512&longitude=-122.0304")
+
+    assert response.status_code == 200
+    assert (seen["params"]["latitude"], seen["params"]["longitude"]) == ("36.95", "-122.03")
+
+def test_forecast_upstream_error():
+    _override(get_open_meteo_client, lambda request: httpx.Response(503))
+    assert client.get("/api/v1/forecast?latitude=36.9&longitude=-122.0").status_code == 503
+
+def test_weather_proxies_weather_gov():
+    def handler(request):
+        assert request.url.host == "marine.weather.gov"
+        return httpx.Response(200, json={"currentobservation": {"Temp": "58"}})
+
+    _override(get_weather_gov_client, handler)
+    response = client.get("/api/v1/weather?lat=36.9&lng=-122.0")
+
+    assert response.status_code == 200
+    assert response.json()["currentobservation"]["Temp"] == "58"
+
+def test_weather_timeout_is_gateway_timeout():
+    """A slow upstream fails with 504 instead of holding the request open."""
+    def handler(request):
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    _override(get_weather_gov_client, handler)
+    assert client.get("/api/v1/weather?lat=36.9&lng=-122.0").status_code == 504
+
+def _forecast(client, latitude, longitude, current="swell_wave_height"):
+    return get_forecast(latitude=latitude, longitude=longitude, current=current, hourly=None, daily=None,
+                        start_date=None, end_date=None, forecast_days=None, client=client)
+
+def _multi_location_handler(requests):
+    def handler(request):
+        lats = request.url.params["latitude"].split(",")
+        requests.append(dict(request.url.params))
+        forecasts = [{"latitude": float(lat), "current": {"swell_wave_height": float(lat)}} for lat in lats]
+        return httpx.Response(200, json=forecasts if len(forecasts) > 1 else forecasts[0])
+    return handler
+
+def test_micro_batcher_merges_concurrent_calls():
+    """Concurrent calls for the same variables go upstream as one multi-location query."""
+    requests = []
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(_multi_location_handler(requests))) as upstream:
+            return await asyncio.gather(
+                _forecast(upstream, 36.9, -122.0),
+                _forecast(upstream, 34.4, -119.5),
+                _forecast(upstream, 33.6, -117.9),
+                _forecast(upstream, 21.6, -158.1, current="wave_height"),
+            )
+
+    with patch.object(settings, "forecast_batch_enabled", True):
+        results = asyncio.run(run())
+
+    assert [r["latitude"] for r in results] == [36.9, 34.4, 33.6, 21.6]
+    assert sorted(r["latitude"] for r in requests) == ["21.6", "36.9,34.4,33.6"]
+    assert all(r["longitude"].count(",") == r["latitude"].count(",") for r in requests)
+
+def test_micro_batcher_flushes_when_full():
+    requests = []
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(_multi_location_handler(requests))) as upstream:
+            return await asyncio.gather(*[_forecast(upstream, 30 + i, -120.0) for i in range(5)])
+
+    with patch.object(settings, "forecast_batch_enabled", True), \
+            patch.object(settings, "forecast_batch_max_size", 2):
+        results = asyncio.run(run())
+
+    assert [r["latitude"] for r in results] == [30, 31, 32, 33, 34]
+    assert sorted(len(r["latitude"].split(",")) for r in requests) == [1, 2, 2]
+
+def test_micro_batcher_shares_upstream_errors():
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(429))) as upstream:
+            return await asyncio.gather(_forecast(upstream, 36.9, -122.0), _forecast(upstream, 34.4, -119.5), return_exceptions=True)
+
+    with patch.object(settings, "forecast_batch_enabled", True):
+        results = asyncio.run(run())
+
+    assert [r.status_code for r in results] == [429, 429]
+
+def test_micro_batcher_holds_in_flight_sends():
+    """A flushed batch is referenced until its send finishes, so gc can't drop it mid-flight."""
+    requests = []
+    handler = _multi_location_handler(requests)
+    held = []
+
+    async def slow(request):
+        held.append(len(forecast_batcher._tasks))
+        await asyncio.sleep(0.01)
+        return handler(request)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(slow)) as upstream:
+            return await asyncio.gather(_forecast(upstream, 36.9, -122.0), _forecast(upstream, 34.4, -119.5))
+
+    with patch.object(settings, "forecast_batch_enabled", True):
+        results = asyncio.run(run())
+
+    assert [r["latitude"] for r in results] == [36.9, 34.4]
+    assert held == [1]
+    assert not forecast_batcher._tasks
+
+def test_open_circuit_is_service_unavailable():
+    """While the upstream's breaker is open the proxy answers 503 at once."""
+    def handler(request):
+        raise CircuitOpenError("weather_gov is unavailable, circuit open", request=request)
+
+    _override(get_weather_gov_client, handler)
+    assert client.get("/api/v1/weather?lat=36.9&lng=-122.0").status_code == 503
@@ -0,0 +1,189 @@
+import numpy as np
+import pytest
+from geopy import distance
+
+from app.services.geo_index import (
+    GeoIndexRegistry,
+    KDTree,
+    PlaceIndex,
+    chord_to_miles,
+    haversine_miles,
+    miles_to_chord,
+    nearest_k,
+    to_unit_vectors,
+)
+
+
+@pytest.fixture
+def random_places():
+    """A few hundred places scattered along the US west coast."""
+    rng = np.random.default_rng(42)
+    lats = rng.uniform(32.0, 48.0, 400)
+    lngs = rng.uniform(-125.0, -117.0, 400)
+    return [
+        {"id": i, "name": f"Place {i}", "latitude": float(lat), "longitude": float(lng)}
+        for i, (lat, lng) in enumerate(zip(lats, lngs))
+    ]
+
+
+def brute_force(places, lat, lng):
+    return sorted(
+        ({**p, "distance": distance.distance((lat, lng), (p["latitude"], p["longitude"])).miles} for p in places),
+        key=lambda p: p["distance"],
+    )
+
+
+def test_chord_round_trip():
+    """Converting miles to chord length and back is lossless."""
+    for miles in [0.0, 1.0, 50.0, 1000.0, 5000.0]:
+        assert chord_to_miles(miles_to_chord(miles)) == pytest.approx(miles, abs=1e-6)
+
+
+def test_kdtree_knn_matches_brute_force():
+    """KD-tree top-k returns the same neighbours as a full scan."""
+    rng = np.random.default_rng(0)
+    points = to_unit_vectors(rng.uniform(-80, 80, 1000), rng.uniform(-180, 180, 1000))
+    tree = KDTree(points)
+    query = to_unit_vectors([10.0], [20.0])[0]
+
+    indices, chords = tree.query_knn(query, 5)
+    expected = np.argsort(np.linalg.norm(points - query, axis=1))[:5]
+
+    assert indices.tolist() == expected.tolist()
+    assert np.all(np.diff(chords) >= 0)
+
+
+def test_kdtree_radius_matches_brute_force():
+    """KD-tree radius search returns every point within the radius."""
+    rng = np.random.default_rng(1)
+    points = to_unit_vectors(rng.uniform(-80, 80, 1000), rng.uniform(-180, 180, 1000))
+    tree = KDTree(points)
+    query = to_unit_vectors([-5.0], [100.0])[0]
+
+    indices, _ = tree.query_radius(query, 0.3)
+    expected = np.flatnonzero(np.linalg.norm(points - query, axis=1) <= 0.3)
+
+    assert sorted(indices.tolist()) == sorted(expected.tolist())
+
+
+def test_kdtree_empty():
+    """An empty tree answers queries with no results."""
+    tree = KDTree(np.empty((0, 3)))
+    indices, chords = tree.query_knn(np.array([1.0, 0.0, 0.0]), 3)
+    assert len(indices) == 0 and len(chords) == 0
+
+
+def test_place_index_radius_query(random_places):
+    """Radius queries agree with geodesic distances from geopy."""
+    index = PlaceIndex(random_places)
+    results = index.query(36.95, -121.97, radius=60, exact=True)
+    expected = [p for p in brute_force(random_places, 36.95, -121.97) if p["distance"] < 60]
+
+    assert [r["id"] for r in results] == [p["id"] for p in expected]
+    for result, place in zip(results, expected):
+        assert result["distance"] == pytest.approx(place["distance"])
+
+
+def test_place_index_limit_query(random_places):
+    """Top-k queries return the k nearest places, nearest first."""
+    index = PlaceIndex(random_places)
+    results = index.query(40.0, -124.0, radius=500, limit=3, exact=True)
+    expected = brute_force(random_places, 40.0, -124.0)[:3]
+
+    assert [r["id"] for r in results] == [p["id"] for p in expected]
+
+
+def test_place_index_spherical_distance_is_close(random_places):
+    """Without exact, distances are great-circle and within a fraction of a percent of geodesic."""
+    index = PlaceIndex(random_places)
+    result = index.query(36.95, -121.97, limit=1)[0]
+    geodesic = distance.distance((36.95, -121.97), (result["latitude"], result["longitude"])).miles
+    assert result["distance"] == pytest.approx(geodesic, rel=0.006)
+
+
+def test_place_index_does_not_mutate_records(random_places):
+    """Results are copies; the indexed records stay untouched."""
+    index = PlaceIndex(random_places)
+    index.query(36.95, -121.97, limit=1)
+    assert "distance" not in random_places[0]
+
+
+def test_registry_builds_lazily_and_rebuilds():
+    """The registry builds on first read and swaps in a new index on rebuild."""
+    rows = [{"id": 1, "latitude": 36.95, "longitude": -121.97}]
+    calls = []
+
+    def loader(db):
+        calls.append(db)
+        return list(rows)
+
+    registry = GeoIndexRegistry({"spots": loader})
+    first = registry.get("spots", db="session")
+    assert len(first) == 1
+    assert registry.get("spots", db="session") is first
+    assert len(calls) == 1
+
+    rows.append({"id": 2, "latitude": 34.0, "longitude": -118.5})
+    rebuilt = registry.rebuild("spots", db="session")
+    assert rebuilt is not first
+    assert registry.get("spots", db="session") is rebuilt
+    assert len(rebuilt) == 2
+    assert registry.status() == {"spots": 2}
+
+
+def test_registry_invalidate():
+    """Invalidating drops the index so the next read rebuilds it."""
+    registry = GeoIndexRegistry({"spots": lambda db: []})
+    first = registry.get("spots", db=None)
+    registry.invalidate("spots")
+    assert registry.get("spots", db=None) is not first
+
+
+def test_haversine_matrix_matches_geopy():
+    """The vectorized haversine matrix agrees with great-circle distances."""
+    matrix = haversine_miles([36.95, 21.3], [-121.97, -157.8], [34.0, 40.0, 21.0], [-118.5, -124.0, -158.0])
+    assert matrix.shape == (2, 3)
+    for i, (lat, lng) in enumerate([(36.95, -121.97), (21.3, -157.8)]):
+        for j, target in enumerate([(34.0, -118.5), (40.0, -124.0), (21.0, -158.0)]):
+            assert matrix[i, j] == pytest.approx(distance.great_circle((lat, lng), target).miles, rel=1e-4)
+
+
+def test_nearest_k_chunked_matches_unchunked():
+    """Chunking the points does not change the result."""
+    rng = np.random.default_rng(7)
+    lats, lngs = rng.uniform(-60, 60, 250), rng.uniform(-180, 180, 250)
+    t_lats, t_lngs = rng.uniform(-60, 60, 300), rng.uniform(-180, 180, 300)
+
+    full_idx, full_dist = nearest_k(lats, lngs, t_lats, t_lngs, 4)
+    chunk_idx, chunk_dist = nearest_k(lats, lngs, t_lats, t_lngs, 4, chunk_elements=1000)
+
+    assert np.array_equal(full_idx, chunk_idx)
+    assert np.allclose(full_dist, chunk_dist)
+    expected = np.argsort(haversine_miles(lats, lngs, t_lats, t_lngs), axis=1)[:, :4]
+    assert np.array_equal(full_idx, expected)
+
+
+def test_nearest_k_more_neighbours_than_targets():
+    """Asking for more neighbours than targets returns every target, sorted."""
+    idx, dist = nearest_k([0.0], [0.0], [0.0, 1.0], [2.0, 0.0], 5)
+    assert idx.tolist() == [[1, 0]]
+    assert dist[0, 0] < dist[0, 1]
+
+
+def test_place_index_query_many(random_places):
+    """Batch queries agree with single-point top-k queries."""
+    index = PlaceIndex(random_places)
+    points = [(36.95, -121.97), (34.0, -118.5), (45.0, -124.0)]
+    batch = index.query_many([p[0] for p in points], [p[1] for p in points], 3)
+
+    for (lat, lng), matches in zip(points, batch):
+        single = index.query(lat, lng, limit=3)
+        assert [m["id"] for m in matches] == [s["id"] for s in single]
+        assert [m["distance"] for m in matches] == pytest.approx([s["distance"] for s in single], rel=1e-6)
+
+
+def test_place_index_query_many_radius(random_places):
+    """A radius drops neighbours that are too far away."""
+    index = PlaceIndex(random_places)
+    batch = index.query_many([0.0], [0.0], 3, radius=100)
+    assert batch == [[]]
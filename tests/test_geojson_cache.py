@@ -0,0 +1,115 @@
+import gzip
+import json
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers.location import refresh_derived
+from app.services.derived_cache import DerivedCache
+from app.services.geo_index import GeoIndexRegistry, SPOTS
+from app.services.geojson_cache import EncodedGeoJSON, SPOTS_GEOJSON, LOCATIONS_GEOJSON
+
+client = TestClient(app)
+
+SPOT_FEATURE = {
+    "type": "Feature",
+    "geometry": {"type": "Point", "coordinates": [-122.0308, 36.9519]},
+    "properties": {"id": 1, "name": "Steamer Lane", "type": "spot_location", "slug": "steamer-lane"},
+}
+
+@pytest.fixture
+def fake_geojson_cache():
+    """A cache whose builders count calls instead of hitting the database."""
+    calls = {SPOTS_GEOJSON: 0, LOCATIONS_GEOJSON: 0}
+
+    def spots(db):
+        calls[SPOTS_GEOJSON] += 1
+        return [SPOT_FEATURE]
+
+    def locations(db):
+        calls[LOCATIONS_GEOJSON] += 1
+        return []
+
+    cache = DerivedCache({
+        SPOTS_GEOJSON: lambda db: EncodedGeoJSON.from_features(spots(db)),
+        LOCATIONS_GEOJSON: lambda db: EncodedGeoJSON.from_features(locations(db)),
+    })
+    with patch("app.routers.location.geojson_cache", cache):
+        yield cache, calls
+
+def test_encoded_geojson():
+    """The encoded body is a FeatureCollection with a stable, quoted ETag."""
+    encoded = EncodedGeoJSON.from_features([SPOT_FEATURE])
+    assert json.loads(encoded.body) == {"type": "FeatureCollection", "features": [SPOT_FEATURE]}
+    assert gzip.decompress(encoded.gzip_body) == encoded.body
+    assert encoded.etag.startswith('"') and encoded.etag.endswith('"')
+    assert encoded.etag == EncodedGeoJSON.from_features([SPOT_FEATURE]).etag
+    assert encoded.etag != EncodedGeoJSON.from_features([]).etag
+
+def test_etag_matching():
+    """If-None-Match handles lists, weak validators and wildcards."""
+    encoded = EncodedGeoJSON.from_features([SPOT_FEATURE])
+    assert encoded.matches(encoded.etag)
+    assert encoded.matches(f'"other", W/{encoded.etag}')
+    assert encoded.matches("*")
+    assert not encoded.matches('"other"')
+    assert not encoded.matches(None)
+
+def test_spots_geojson_served_from_cache(fake_geojson_cache):
+    """The collection is built once and then served from memory."""
+    cache, calls = fake_geojson_cache
+    first = client.get("/api/v1/spots/geojson")
+    second = client.get("/api/v1/spots/geojson")
+
+    assert first.status_code == 200
+    assert first.json()["features"] == [SPOT_FEATURE]
+    assert first.headers["content-type"] == "application/json"
+    assert first.headers["etag"] == second.headers["etag"]
+    assert calls[SPOTS_GEOJSON] == 1
+
+def test_spots_geojson_not_modified(fake_geojson_cache):
+    """A matching If-None-Match gets an empty 304."""
+    etag = client.get("/api/v1/spots/geojson").headers["etag"]
+    response = client.get("/api/v1/spots/geojson", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+def test_spots_geojson_gzip(fake_geojson_cache):
+    """Clients that accept gzip get the pre-compressed body."""
+    response = client.get("/api/v1/spots/geojson", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    # httpx transparently decodes the body
+    assert response.json()["features"] == [SPOT_FEATURE]
+
+def test_spots_geojson_rebuilt_after_invalidate(fake_geojson_cache):
+    """Invalidating the collection rebuilds it on the next read."""
+    cache, calls = fake_geojson_cache
+    client.get("/api/v1/spots/geojson")
+    cache.invalidate(SPOTS_GEOJSON)
+    client.get("/api/v1/spots/geojson")
+    assert calls[SPOTS_GEOJSON] == 2
+
+def test_write_hook_drops_every_derived_copy(fake_geojson_cache):
+    """A spot write rebuilds the spatial index and drops the spot GeoJSON and tiles."""
+    cache, calls = fake_geojson_cache
+    tiles = DerivedCache({SPOTS_GEOJSON: lambda db: object()})
+    index = GeoIndexRegistry({SPOTS: lambda db: []})
+    client.get("/api/v1/spots/geojson")
+    first_tiles = tiles.get(SPOTS_GEOJSON, None)
+
+    with patch("app.routers.location.tile_index", tiles), patch("app.routers.location.geo_index", index):
+        refresh_derived(None, SPOTS)
+
+    client.get("/api/v1/spots/geojson")
+    assert calls[SPOTS_GEOJSON] == 2
+    assert tiles.get(SPOTS_GEOJSON, None) is not first_tiles
+    assert index.status() == {SPOTS: 0}
+
+def test_locations_geojson_empty(fake_geojson_cache):
+    """An empty collection is still a 404."""
+    response = client.get("/api/v1/locations/geojson")
+    assert response.status_code == 404
@@ -0,0 +1,103 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.clients.host_limiter import FairLimiter, LimitedTransport, claim_upstream_owner
+
+def test_limit_holds_across_requests():
+    """No more than the limit are in flight, however many callers there are."""
+    limiter = FairLimiter("test", 3)
+    running = {"now": 0, "max": 0}
+
+    async def handler(request):
+        running["now"] += 1
+        running["max"] = max(running["max"], running["now"])
+        await asyncio.sleep(0.01)
+        running["now"] -= 1
+        return httpx.Response(200, text="ok")
+
+    async def run():
+        transport = LimitedTransport(httpx.MockTransport(handler), limiter)
+        async with httpx.AsyncClient(transport=transport) as upstream:
+            await asyncio.gather(*[upstream.get("https://upstream.test/") for _ in range(12)])
+
+    asyncio.run(run())
+    assert running["max"] == 3
+    assert limiter.snapshot()["in_use"] == 0
+    assert limiter.peak_queued == 9
+
+def test_waiters_served_round_robin_by_owner():
+    """A late small request is not stuck behind the whole of an earlier large one."""
+    limiter = FairLimiter("test", 1)
+    order = []
+
+    async def run():
+        await limiter.acquire("holder")
+
+        async def call(owner, label):
+            await limiter.acquire(owner)
+            order.append(label)
+            await asyncio.sleep(0)
+            limiter.release()
+
+        big = [asyncio.ensure_future(call("big", f"big{i}")) for i in range(4)]
+        await asyncio.sleep(0)
+        small = [asyncio.ensure_future(call("small", f"small{i}")) for i in range(2)]
+        await asyncio.sleep(0)
+        limiter.release()
+        await asyncio.gather(*big, *small)
+
+    asyncio.run(run())
+    assert order == ["big0", "small0", "big1", "small1", "big2", "big3"]
+
+def test_cancelled_waiter_leaves_queue():
+    limiter = FairLimiter("test", 1)
+
+    async def run():
+        await limiter.acquire("a")
+        waiter = asyncio.ensure_future(limiter.acquire("b"))
+        await asyncio.sleep(0)
+        assert limiter.queued == 1
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        limiter.release()
+
+    asyncio.run(run())
+    assert limiter.snapshot()["queued"] == 0
+    assert limiter.in_use == 0
+
+def test_slot_held_until_body_closed():
+    limiter = FairLimiter("test", 1)
+
+    async def body():
+        yield b"ok"
+
+    async def run():
+        transport = LimitedTransport(httpx.MockTransport(lambda request: httpx.Response(200, content=body())), limiter)
+        async with httpx.AsyncClient(transport=transport) as upstream:
+            async with upstream.stream("GET", "https://upstream.test/") as response:
+                assert limiter.in_use == 1
+                await response.aread()
+        return limiter.in_use
+
+    assert asyncio.run(run()) == 0
+
+def test_claimed_owner_shared_by_fan_out():
+    """Tasks spawned after claim_upstream_owner queue as one owner."""
+    limiter = FairLimiter("test", 1)
+
+    async def run():
+        await limiter.acquire("holder")
+        claim_upstream_owner()
+        transport = LimitedTransport(httpx.MockTransport(lambda request: httpx.Response(200)), limiter)
+        async with httpx.AsyncClient(transport=transport) as upstream:
+            calls = [asyncio.ensure_future(upstream.get("https://upstream.test/")) for _ in range(3)]
+            await asyncio.sleep(0.01)
+            owners = limiter.snapshot()["queued_owners"]
+            limiter.release()
+            await asyncio.gather(*calls)
+        return owners
+
+    assert asyncio.run(run()) == 1
@@ -0,0 +1,60 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.clients.http_pool import COOPS, NDBC, OPEN_METEO, UPSTREAM_HOSTS, HTTPClientPool, http_clients
+from app.clients.noaa_tides_client import NOAATidesClient
+
+def test_one_client_per_host():
+    """Each upstream gets its own client, reused on every call."""
+    pool = HTTPClientPool(UPSTREAM_HOSTS)
+
+    async def check():
+        ndbc = pool.get(NDBC)
+        assert pool.get(NDBC) is ndbc
+        assert pool.get(OPEN_METEO) is not ndbc
+        assert str(ndbc.base_url).startswith("https://www.ndbc.noaa.gov")
+        assert ndbc.timeout.read == UPSTREAM_HOSTS[NDBC].read_timeout
+        await pool.aclose()
+        assert ndbc.is_closed
+
+    asyncio.run(check())
+
+def test_clients_are_replaced_per_event_loop():
+    """A client opened on one event loop is not reused from another."""
+    pool = HTTPClientPool(UPSTREAM_HOSTS)
+
+    async def grab():
+        return pool.get(NDBC)
+
+    first = asyncio.run(grab())
+    second = asyncio.run(grab())
+    assert first is not second
+
+def test_start_opens_every_host():
+    pool = HTTPClientPool(UPSTREAM_HOSTS)
+
+    async def check():
+        await pool.start()
+        clients = [pool.get(name) for name in UPSTREAM_HOSTS]
+        assert len(set(map(id, clients))) == len(UPSTREAM_HOSTS)
+        await pool.aclose()
+
+    asyncio.run(check())
+
+def test_tides_client_shares_pooled_client():
+    """NOAATidesClient uses the pooled CO-OPS client and leaves it open."""
+    async def check():
+        async with NOAATidesClient() as tides:
+            pooled = tides.client
+            assert pooled is http_clients.get(COOPS)
+        assert not pooled.is_closed
+
+    asyncio.run(check())
+
+def test_lifespan_opens_and_closes_pool():
+    with TestClient(app):
+        clients = dict(http_clients._clients)
+        assert set(clients) == set(UPSTREAM_HOSTS)
+    assert all(client.is_closed for client in clients.values())
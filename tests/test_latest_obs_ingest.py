@@ -0,0 +1,57 @@
+from pathlib import Path
+
+import pytest
+
+from app import models
+from app.services.latest_obs_ingest import LatestObsIngestService, parse_latest_obs, summary_records
+
+FIXTURE = Path(__file__).parent / "fixtures" / "latest_obs.txt"
+
+@pytest.fixture
+def latest_obs_text():
+    return FIXTURE.read_text(encoding="utf-8")
+
+@pytest.fixture
+def ingest_db(memory_db):
+    memory_db.add_all([
+        models.BuoyLocation(location_id="46042", name="Monterey", active=True),
+        models.BuoyLocation(location_id="41112", name="Offshore Fernandina Beach", active=True),
+        models.BuoyLocation(location_id="46026", name="San Francisco", active=False),
+        models.BuoyLocation(location_id="46999", name="Not in the file", active=True),
+    ])
+    memory_db.commit()
+    return memory_db
+
+def test_parse_every_station(latest_obs_text):
+    """Both header lines are skipped and MM becomes missing."""
+    frame = parse_latest_obs(latest_obs_text)
+    assert list(frame["STN"]) == ["13001", "41112", "46026", "46042", "46232", "LJPC1"]
+    assert frame["WVHT"].isna().sum() == 2
+
+def test_summary_records_match_station_format(latest_obs_text):
+    records = summary_records(parse_latest_obs(latest_obs_text), ["46042", "41112"])
+    by_id = {record["location_id"]: record for record in records}
+
+    assert by_id["46042"] == {
+        "location_id": "46042",
+        "timestamp": "2026-10-17 12:00:00",
+        "wind": "WNW (300°), 13.6 kt",
+        "gust": "17.5 kt",
+        "wvht": "6.9 ft",
+        "peak_period": "12 sec",
+        "precipitation": "29.98 in",
+        "water_temp": "57.6 °F",
+    }
+    # wave-only buoys have no wind or pressure
+    assert by_id["41112"]["wind"] is None
+    assert by_id["41112"]["precipitation"] is None
+    assert by_id["41112"]["wvht"] == "4.3 ft"
+
+def test_ingest_writes_tracked_buoys_only(ingest_db, latest_obs_text):
+    """Only active buoys present in the file get a summary."""
+    assert LatestObsIngestService(ingest_db).ingest(latest_obs_text) == 2
+
+    rows = ingest_db.query(models.BuoyLocationNoaaSummary).order_by(models.BuoyLocationNoaaSummary.location_id).all()
+    assert [row.location_id for row in rows] == ["41112", "46042"]
+    assert rows[1].wvht == "6.9 ft"
+    assert rows[1].swell is None
@@ -0,0 +1,108 @@
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.geo_index import GeoIndexRegistry
+
+client = TestClient(app)
+
+@pytest.fixture
+def fake_geo_index():
+    """A geo index registry backed by fixed records instead of the database."""
+    registry = GeoIndexRegistry({
+        "spots": lambda db: [
+            {"id": 1, "name": "Steamer Lane", "subregion_name": "Santa Cruz", "latitude": 36.9519, "longitude": -122.0308, "slug": "steamer-lane"},
+            {"id": 2, "name": "Malibu", "subregion_name": "Los Angeles", "latitude": 34.0359, "longitude": -118.6775, "slug": "malibu"},
+        ],
+        "buoys": lambda db: [
+            {"location_id": "46042", "name": "Monterey", "url": None, "description": None, "location": "36.785 N 122.396 W", "latitude": 36.785, "longitude": -122.396},
+        ],
+        "tide_stations": lambda db: [
+            {"station_id": "9413745", "latitude": 36.9583, "longitude": -122.0173},
+            {"station_id": "9410840", "latitude": 34.0083, "longitude": -118.5}
+        ],
+    })
+    with patch("app.routers.nearest.geo_index", registry):
+        yield registry
+
+def test_nearest_returns_k_per_target(fake_geo_index):
+    """Each point gets the nearest spot, buoy and tide station."""
+    response = client.post("/api/v1/nearest", json={
+        "points": [{"lat": 36.96, "lng": -122.02}, {"lat": 34.03, "lng": -118.68}],
+        "k": 1
+    })
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert len(results) == 2
+    assert results[0]["spots"][0]["slug"] == "steamer-lane"
+    assert results[0]["buoys"][0]["location_id"] == "46042"
+    assert results[0]["tide_stations"][0]["station_id"] == "9413745"
+    assert results[1]["spots"][0]["slug"] == "malibu"
+    assert results[1]["tide_stations"][0]["station_id"] == "9410840"
+    assert isinstance(results[0]["spots"][0]["distance"], float)
+
+def test_nearest_sorted_and_limited_to_targets(fake_geo_index):
+    """Only requested target types are returned, nearest first."""
+    response = client.post("/api/v1/nearest", json={
+        "points": [{"lat": 36.96, "lng": -122.02}],
+        "k": 5,
+        "targets": ["spots"]
+    })
+
+    assert response.status_code == 200
+    result = response.json()["results"][0]
+    assert "buoys" not in result
+    assert "tide_stations" not in result
+    assert [s["id"] for s in result["spots"]] == [1, 2]
+    assert result["spots"][0]["distance"] < result["spots"][1]["distance"]
+
+def test_nearest_with_radius(fake_geo_index):
+    """Targets beyond dist are dropped."""
+    response = client.post("/api/v1/nearest", json={
+        "points": [{"lat": 36.96, "lng": -122.02}],
+        "k": 5,
+        "dist": 50,
+        "targets": ["spots"]
+    })
+
+    assert response.status_code == 200
+    assert [s["id"] for s in response.json()["results"][0]["spots"]] == [1]
+
+def test_nearest_invalid_request():
+    """Out of range coordinates and empty point lists are rejected."""
+    assert client.post("/api/v1/nearest", json={"points": []}).status_code == 422
+    assert client.post("/api/v1/nearest", json={"points": [{"lat": 91, "lng": 0}]}).status_code == 422
+    assert client.post("/api/v1/nearest", json={"points": [{"lat": 0, "lng": 0}], "targets": ["cities"]}).status_code == 422
+
+def test_nearby_returns_each_section(fake_geo_index):
+    """One call returns spots, buoys and tide stations with their own limits."""
+    response = client.get("/api/v1/nearby?lat=36.96&lng=-122.02&radius=500&spots=2&buoys=1&tide_stations=1")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [s["slug"] for s in body["spots"]] == ["steamer-lane", "malibu"]
+    assert [b["location_id"] for b in body["buoys"]] == ["46042"]
+    assert [t["station_id"] for t in body["tide_stations"]] == ["9413745"]
+    assert "kind" not in body["spots"][0]
+    assert body["spots"][0]["distance"] < body["spots"][1]["distance"]
+
+def test_nearby_radius_and_zero_limits(fake_geo_index):
+    """Places beyond radius are dropped and a zero limit empties that section."""
+    response = client.get("/api/v1/nearby?lat=36.96&lng=-122.02&radius=50&buoys=0")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [s["slug"] for s in body["spots"]] == ["steamer-lane"]
+    assert body["buoys"] == []
+    assert client.get("/api/v1/nearby?lat=95&lng=0").status_code == 422
+
+def test_combined_index_follows_rebuilds(fake_geo_index):
+    """Rebuilding one kind drops the combined index so it picks up the change."""
+    combined = fake_geo_index.get_combined(None)
+    assert len(combined) == 5
+    assert fake_geo_index.get_combined(None) is combined
+
+    fake_geo_index.rebuild("spots", None)
+    assert fake_geo_index.get_combined(None) is not combined
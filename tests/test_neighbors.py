@@ -0,0 +1,139 @@
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+
+from app import models
+from app.main import app
+from app.services import geo_index as geo_index_module
+from app.services.geo_index import GeoIndexRegistry, SPOTS, BUOYS, TIDE_STATIONS
+from app.services.neighbors_service import NeighborsService
+
+client = TestClient(app)
+
+@pytest.fixture
+def neighbors_db(memory_db):
+    """An in-memory database with spots, buoys and tide stations, and a private geo index."""
+    memory_db.add_all([
+        models.SpotLocation(id=1, name="Steamer Lane", timezone="America/Los_Angeles", latitude=36.9519, longitude=-122.0308, subregion_name="Santa Cruz", slug="steamer-lane"),
+        models.SpotLocation(id=2, name="Malibu", timezone="America/Los_Angeles", latitude=34.0359, longitude=-118.6775, subregion_name="Los Angeles", slug="malibu"),
+        models.BuoyLocation(id=1, location_id="46042", name="Monterey", location="36.785 N 122.396 W", latitude=36.785, longitude=-122.396, active=True),
+        models.BuoyLocation(id=2, location_id="46236", name="Monterey Canyon", location="36.761 N 121.947 W", latitude=36.761, longitude=-121.947, active=True),
+        models.BuoyLocation(id=3, location_id="46221", name="Santa Monica Bay", location="33.855 N 118.633 W", latitude=33.855, longitude=-118.633, active=True),
+        models.TideStation(id=1, station_id="9413745", station_name="Santa Cruz", latitude=36.9583, longitude=-122.0173),
+        models.TideStation(id=2, station_id="9410840", station_name="Santa Monica", latitude=34.0083, longitude=-118.5),
+    ])
+    memory_db.commit()
+
+    registry = GeoIndexRegistry({
+        SPOTS: geo_index_module.load_spot_records,
+        BUOYS: geo_index_module.load_buoy_records,
+        TIDE_STATIONS: geo_index_module.load_tide_station_records,
+    })
+    with patch("app.services.neighbors_service.geo_index", registry):
+        yield memory_db, registry
+
+def neighbor_ids(session, source_type, source_id, neighbor_type):
+    rows = session.query(models.PlaceNeighbor).filter(
+        models.PlaceNeighbor.source_type == source_type,
+        models.PlaceNeighbor.source_id == source_id,
+        models.PlaceNeighbor.neighbor_type == neighbor_type,
+    ).order_by(models.PlaceNeighbor.rank).all()
+    return [row.neighbor_id for row in rows]
+
+def test_refresh_all(neighbors_db):
+    """Every spot and buoy gets its k nearest buoys and nearest tide station."""
+    session, _ = neighbors_db
+    written = NeighborsService(session, k=2).refresh_all()
+
+    # 2 spots + 3 buoys, each with 2 buoys and 1 tide station
+    assert written == 15
+    assert neighbor_ids(session, "spot", "1", "buoy") == ["46236", "46042"]
+    assert neighbor_ids(session, "spot", "1", "tide_station") == ["9413745"]
+    assert neighbor_ids(session, "spot", "2", "tide_station") == ["9410840"]
+    # a buoy is never its own neighbor
+    assert "46042" not in neighbor_ids(session, "buoy", "46042", "buoy")
+
+def test_spot_neighbors_bearing_and_distance(neighbors_db):
+    """Bearings point from the spot toward the neighbor."""
+    session, _ = neighbors_db
+    service = NeighborsService(session, k=2)
+    service.refresh_all()
+
+    neighbors = service.get_spot_neighbors(1)
+    monterey_canyon = neighbors["buoys"][0]
+    assert monterey_canyon["id"] == "46236"
+    assert monterey_canyon["name"] == "Monterey Canyon"
+    # Monterey Canyon buoy is south-southeast of Steamer Lane
+    assert 150 < monterey_canyon["bearing"] < 190
+    assert 10 < monterey_canyon["distance"] < 15
+    assert neighbors["tide_station"]["id"] == "9413745"
+
+def test_get_spot_neighbors_missing(neighbors_db):
+    """Spots without computed neighbors raise ValueError."""
+    session, _ = neighbors_db
+    with pytest.raises(ValueError):
+        NeighborsService(session).get_spot_neighbors(999)
+
+def test_refresh_for_added_buoy(neighbors_db):
+    """Adding a buoy only recomputes the sources it is now close to."""
+    session, registry = neighbors_db
+    service = NeighborsService(session, k=1)
+    service.refresh_all()
+    malibu_before = session.query(models.PlaceNeighbor).filter(
+        models.PlaceNeighbor.source_id == "2", models.PlaceNeighbor.neighbor_type == "buoy"
+    ).one()
+
+    session.add(models.BuoyLocation(id=4, location_id="46269", name="Point Santa Cruz", location="36.94 N 122.03 W", latitude=36.94, longitude=-122.03, active=True))
+    session.commit()
+    registry.rebuild(BUOYS, session)
+    service.refresh_for_buoys(["46269"])
+
+    assert neighbor_ids(session, "spot", "1", "buoy") == ["46269"]
+    assert neighbor_ids(session, "buoy", "46269", "buoy") == ["46236"]
+    # Malibu is untouched
+    malibu_after = session.query(models.PlaceNeighbor).filter(
+        models.PlaceNeighbor.source_id == "2", models.PlaceNeighbor.neighbor_type == "buoy"
+    ).one()
+    assert malibu_after.id == malibu_before.id
+
+def test_refresh_for_removed_buoy(neighbors_db):
+    """Removing a buoy recomputes every source that referenced it."""
+    session, registry = neighbors_db
+    service = NeighborsService(session, k=1)
+    service.refresh_all()
+
+    session.query(models.BuoyLocation).filter(models.BuoyLocation.location_id == "46236").delete()
+    session.commit()
+    registry.rebuild(BUOYS, session)
+    service.refresh_for_buoys(["46236"])
+
+    assert neighbor_ids(session, "spot", "1", "buoy") == ["46042"]
+    assert neighbor_ids(session, "buoy", "46236", "buoy") == []
+    assert session.query(models.PlaceNeighbor).filter(models.PlaceNeighbor.neighbor_id == "46236").count() == 0
+
+def test_refresh_for_removed_tide_station(neighbors_db):
+    """Removing a tide station moves its sources to the next nearest one."""
+    session, registry = neighbors_db
+    service = NeighborsService(session, k=1)
+    service.refresh_all()
+
+    session.query(models.TideStation).filter(models.TideStation.station_id == "9413745").delete()
+    session.commit()
+    registry.rebuild(TIDE_STATIONS, session)
+    service.refresh_for_tide_stations(["9413745"])
+
+    assert neighbor_ids(session, "spot", "1", "tide_station") == ["9410840"]
+
+def test_spot_neighbors_endpoint(neighbors_db):
+    """GET /spots/{id}/neighbors serves the precomputed rows."""
+    session, _ = neighbors_db
+    NeighborsService(session, k=2).refresh_all()
+
+    response = client.get("/api/v1/spots/1/neighbors")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["spot_id"] == 1
+    assert [b["id"] for b in data["buoys"]] == ["46236", "46042"]
+    assert data["tide_station"]["id"] == "9413745"
+
+    assert client.get("/api/v1/spots/999/neighbors").status_code == 404
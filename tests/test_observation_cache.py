@@ -0,0 +1,85 @@
+import asyncio
+
+import httpx
+
+from app.services.observation_cache import ObservationCache, fetch_latest_observation
+
+def counting_fetch(values):
+    """A fetch that returns the next value on each call and counts the calls."""
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0)
+        return values[min(len(calls), len(values)) - 1]
+
+    return fetch, calls
+
+def test_fresh_values_served_from_memory():
+    cache = ObservationCache(ttl_seconds=60, stale_seconds=600)
+    fetch, calls = counting_fetch([{"wave_height": "3 ft"}, {"wave_height": "4 ft"}])
+
+    async def run():
+        return [await cache.get("46042", fetch) for _ in range(3)]
+
+    assert asyncio.run(run()) == [{"wave_height": "3 ft"}] * 3
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 2
+
+def test_stale_value_served_then_refreshed():
+    """Past the TTL the cached reading comes back at once and is refreshed behind it."""
+    cache = ObservationCache(ttl_seconds=0, stale_seconds=600)
+    fetch, calls = counting_fetch([{"wave_height": "3 ft"}, {"wave_height": "4 ft"}])
+
+    async def run():
+        first = await cache.get("46042", fetch)
+        # both callers see the stale reading and only one refresh starts
+        stale = await asyncio.gather(cache.get("46042", fetch), cache.get("46042", fetch))
+        await asyncio.sleep(0.01)
+        return first, stale, await cache.get("46042", fetch)
+
+    first, stale, refreshed = asyncio.run(run())
+    assert first == {"wave_height": "3 ft"}
+    assert stale == [{"wave_height": "3 ft"}] * 2
+    assert refreshed == {"wave_height": "4 ft"}
+    assert len(calls) == 3
+
+def test_expired_value_waits_for_fetch():
+    cache = ObservationCache(ttl_seconds=0, stale_seconds=0)
+    fetch, calls = counting_fetch([{"wave_height": "3 ft"}, {"wave_height": "4 ft"}])
+
+    async def run():
+        await cache.get("46042", fetch)
+        return await cache.get("46042", fetch)
+
+    assert asyncio.run(run()) == {"wave_height": "4 ft"}
+    assert cache.stats()["misses"] == 2
+
+def test_failed_refresh_keeps_stale_value():
+    cache = ObservationCache(ttl_seconds=0, stale_seconds=600)
+    fetch, _ = counting_fetch([{"wave_height": "3 ft"}, None])
+
+    async def run():
+        await cache.get("46042", fetch)
+        await cache.get("46042", fetch)
+        await asyncio.sleep(0.01)
+        return await cache.get("46042", fetch)
+
+    assert asyncio.run(run()) == {"wave_height": "3 ft"}
+
+def test_failures_are_not_cached():
+    cache = ObservationCache(ttl_seconds=60, stale_seconds=600)
+    fetch, calls = counting_fetch([None, {"wave_height": "3 ft"}])
+
+    async def run():
+        return [await cache.get("46042", fetch) for _ in range(2)]
+
+    assert asyncio.run(run()) == [None, {"wave_height": "3 ft"}]
+
+def test_fetch_latest_observation_swallows_failures():
+    """The shared live fetch turns upstream errors into None."""
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(404))) as upstream:
+            return await fetch_latest_observation("00000", upstream)
+
+    assert asyncio.run(run()) is None
@@ -0,0 +1,114 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import models
+from app.main import app
+from app.services.observation_cache import CachedObservation
+from app.services.observation_poller import ObservationPoller, ObservationSnapshot
+
+client = TestClient(app)
+
+def make_poller(fetch, **kwargs):
+    options = {"interval_seconds": 600, "concurrency": 2, "spread_seconds": 0, "max_age_seconds": 3600}
+    options.update(kwargs)
+    return ObservationPoller(fetch=fetch, **options)
+
+def test_poll_swaps_in_new_snapshot():
+    """A cycle replaces the snapshot; failed buoys keep their last good reading."""
+    readings = {"46042": {"wave_height": "3 ft"}, "46026": None}
+
+    async def fetch(location_id):
+        return readings[location_id]
+
+    poller = make_poller(fetch)
+    poller._snapshot = ObservationSnapshot(observations={"46026": CachedObservation({"wave_height": "5 ft"}), "46011": CachedObservation({"wave_height": "2 ft"})})
+    before = poller.snapshot
+
+    asyncio.run(poller.poll_once(["46042", "46026"]))
+
+    assert poller.snapshot is not before
+    assert poller.lookup("46042") == {"wave_height": "3 ft"}
+    assert poller.lookup("46026") == {"wave_height": "5 ft"}
+    # buoys no longer active drop out
+    assert poller.lookup("46011") is None
+
+def test_poll_is_bounded_and_staggered():
+    running = {"now": 0, "max": 0}
+    started = []
+
+    async def fetch(location_id):
+        started.append(time.monotonic())
+        running["now"] += 1
+        running["max"] = max(running["max"], running["now"])
+        await asyncio.sleep(0.01)
+        running["now"] -= 1
+        return {"id": location_id}
+
+    poller = make_poller(fetch, concurrency=2)
+    asyncio.run(poller.poll_once([str(i) for i in range(6)], spread_seconds=0.12))
+
+    assert running["max"] <= 2
+    assert started[-1] - started[0] >= 0.09
+    assert len(poller.snapshot.observations) == 6
+
+def test_old_readings_are_ignored():
+    poller = make_poller(None, max_age_seconds=60)
+    poller._snapshot = ObservationSnapshot(observations={"46042": CachedObservation({"wave_height": "3 ft"}, fetched_at=time.monotonic() - 120)})
+    assert poller.lookup("46042") is None
+
+def test_polls_only_active_buoys():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    models.Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    with session_factory() as db:
+        db.add_all([
+            models.BuoyLocation(location_id="46042", name="Monterey", active=True),
+            models.BuoyLocation(location_id="46026", name="San Francisco", active=False),
+        ])
+        db.commit()
+    polled = []
+
+    async def fetch(location_id):
+        polled.append(location_id)
+        return {"wave_height": "3 ft"}
+
+    poller = ObservationPoller(600, 2, 0, 3600, session_factory=session_factory, fetch=fetch)
+    asyncio.run(poller.poll_once())
+    assert polled == ["46042"]
+
+def test_start_and_stop():
+    async def fetch(location_id):
+        return {"id": location_id}
+
+    async def run():
+        poller = make_poller(fetch)
+        poller._load_location_ids = lambda: ["46042"]
+        poller.start()
+        await asyncio.sleep(0.05)
+        await poller.stop()
+        return poller
+
+    assert asyncio.run(run()).lookup("46042") == {"id": "46042"}
+
+def test_latest_observation_reads_snapshot():
+    """Covered buoys are answered from the snapshot without a live fetch."""
+    async def fetch(location_id):
+        raise AssertionError("poller should not run")
+
+    async def live(location_id, client=None):
+        raise AssertionError("should not fetch live")
+
+    poller = make_poller(fetch)
+    poller._snapshot = ObservationSnapshot(observations={"46042": CachedObservation({"wave_height": "3 ft"})})
+    with patch("app.routers.location.observation_poller", poller), \
+            patch("app.routers.location.fetch_latest_observation", live):
+        response = client.get("/api/v1/locations/46042/latest-observation")
+
+    assert response.status_code == 200
+    assert response.json() == {"wave_height": "3 ft"}
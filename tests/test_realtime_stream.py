@@ -0,0 +1,66 @@
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.clients.conditional_fetch import ConditionalFetcher
+from app.clients.http_pool import get_ndbc_client
+
+client = TestClient(app)
+
+HEADER = """#YY  MM DD hh mm WDIR WSPD GST  WVHT   DPD   APD MWD   PRES  ATMP  WTMP  DEWP  VIS PTDY  TIDE
+#yr  mo dy hr mn degT m/s  m/s     m   sec   sec degT   hPa  degC  degC  degC  nmi  hPa    ft
+"""
+ROW = "2026 10 17 12 {:02d} 300  7.0  9.0   2.1    12   7.5 295 1015.2  13.8  14.2  11.0   MM -0.6    MM\n"
+
+@pytest.fixture
+def streaming_server():
+    """Serves a long realtime2 file one line per chunk, recording how far it was read."""
+    state = {"sent": 0, "closed": False}
+
+    async def body():
+        try:
+            yield HEADER.encode()
+            for i in range(500):
+                state["sent"] += 1
+                yield ROW.format(i % 60).encode()
+        finally:
+            state["closed"] = True
+
+    def handler(request):
+        return httpx.Response(200, content=body())
+
+    async def mock_client():
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    app.dependency_overrides[get_ndbc_client] = mock_client
+    with patch("app.routers.location.ndbc_files", ConditionalFetcher(8)):
+        yield state
+    app.dependency_overrides.clear()
+
+def test_realtime_stops_reading_at_limit(streaming_server):
+    """Only the first limit rows are read before the body is closed."""
+    response = client.get("/api/v1/locations/46042/realtime?limit=3")
+
+    assert response.status_code == 200
+    assert len(response.json()["data"]["wave_height"]) == 3
+    assert streaming_server["sent"] == 3
+    assert streaming_server["closed"]
+
+def test_realtime_html_reads_whole_file(streaming_server):
+    """The html table needs every row, so send_html still reads to the end."""
+    response = client.get("/api/v1/locations/46042/realtime?limit=3&send_html=true")
+
+    assert response.status_code == 200
+    assert len(response.json()["data"]["wave_height"]) == 3
+    assert streaming_server["sent"] == 500
+    assert response.json()["html"].count("<tr>") == 500
+
+def test_realtime_short_file(streaming_server):
+    """A limit past the end of the file returns every row."""
+    response = client.get("/api/v1/locations/46042/realtime?limit=1000")
+
+    assert response.status_code == 200
+    assert len(response.json()["data"]["wave_height"]) == 500
@@ -0,0 +1,78 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+
+from app import models
+from app.main import app
+from app.config import settings
+from app.services.search_ranking import rank_candidates, text_score
+
+client = TestClient(app)
+
+@pytest.fixture
+def search_db(memory_db):
+    """An in-memory database with beaches on both coasts and a buoy."""
+    memory_db.add_all([
+        models.SpotLocation(id=1, name="Jacksonville Beach", timezone="America/New_York", latitude=30.2947, longitude=-81.3931, subregion_name="North Florida", slug="jacksonville-beach"),
+        models.SpotLocation(id=2, name="Manresa State Beach", timezone="America/Los_Angeles", latitude=36.9270, longitude=-121.8620, subregion_name="Santa Cruz", slug="manresa-state-beach"),
+        models.SpotLocation(id=3, name="Beach Street", timezone="America/Los_Angeles", latitude=36.9600, longitude=-122.0200, subregion_name="Santa Cruz", slug="beach-street"),
+        models.SpotLocation(id=4, name="Steamer Lane", timezone="America/Los_Angeles", latitude=36.9519, longitude=-122.0308, subregion_name="Santa Cruz", slug="steamer-lane"),
+        models.BuoyLocation(id=1, location_id="41112", name="Offshore Fernandina Beach", location="30.709 N 81.292 W", latitude=30.709, longitude=-81.292, active=True),
+    ])
+    memory_db.commit()
+    return memory_db
+
+def test_text_score_prefers_closer_matches():
+    """Exact beats prefix beats word start beats substring."""
+    assert text_score("Malibu", "malibu") == 1.0
+    assert text_score("Malibu Point", "malibu") > text_score("North Malibu", "malibu")
+    assert text_score("North Malibu", "malibu") > text_score("Surfrider-malibu", "malibu") > 0
+    assert text_score("Rincon", "malibu") == 0.0
+
+def test_rank_candidates_uses_distance():
+    """With a position, a nearby partial match outranks a distant one."""
+    far = SimpleNamespace(name="Jacksonville Beach", latitude=30.29, longitude=-81.39)
+    near = SimpleNamespace(name="Manresa State Beach", latitude=36.93, longitude=-121.86)
+    assert rank_candidates([far, near], "beach") == [far, near]
+    assert rank_candidates([far, near], "beach", 36.95, -122.02) == [near, far]
+
+def test_spots_ranked_and_paginated(search_db):
+    """/spots ranks by match and distance and pages with limit & offset."""
+    response = client.get("/api/v1/spots?search=beach&lat=36.95&lng=-122.02&limit=2")
+    assert response.status_code == 200
+    assert [s["slug"] for s in response.json()] == ["beach-street", "manresa-state-beach"]
+
+    response = client.get("/api/v1/spots?search=beach&lat=36.95&lng=-122.02&limit=2&offset=2")
+    assert [s["slug"] for s in response.json()] == ["jacksonville-beach"]
+
+def test_spots_without_search_still_pages(search_db):
+    response = client.get("/api/v1/spots?limit=2&offset=1")
+    assert [s["id"] for s in response.json()] == [2, 3]
+
+def test_search_all_mixes_buoys_and_spots(search_db):
+    """/search ranks buoys and spots together."""
+    response = client.get("/api/v1/search?q=beach&lat=30.3&lng=-81.4&limit=2")
+    assert response.status_code == 200
+    assert [r["name"] for r in response.json()] == ["Jacksonville Beach", "Offshore Fernandina Beach"]
+
+def test_search_all_pages_in_sql_without_ranking(search_db):
+    """With nothing to rank by, buoys then spots are paged without loading either table whole."""
+    response = client.get("/api/v1/search?limit=2&offset=1")
+    assert [r["name"] for r in response.json()] == ["Jacksonville Beach", "Manresa State Beach"]
+
+def test_ranking_candidates_are_capped(search_db):
+    """Only search_max_candidates matches per table are ranked."""
+    with patch.object(settings, "search_max_candidates", 1):
+        response = client.get("/api/v1/search?q=beach&lat=36.95&lng=-122.02")
+    # the nearby Santa Cruz beaches were never loaded
+    assert sorted(r["name"] for r in response.json()) == ["Jacksonville Beach", "Offshore Fernandina Beach"]
+
+def test_locations_ranked(search_db):
+    response = client.get("/api/v1/locations?search=fernandina&lat=30.5&lng=-81.3")
+    assert [b["location_id"] for b in response.json()] == ["41112"]
+
+def test_position_must_be_complete(search_db):
+    assert client.get("/api/v1/spots?lat=36.95").status_code == 400
+    assert client.get("/api/v1/search?q=beach&lng=-122").status_code == 400
+    assert client.get("/api/v1/spots?offset=-1").status_code == 422
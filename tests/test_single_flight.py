@@ -0,0 +1,98 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.clients.single_flight import SingleFlight, single_flight, NDBC_LATEST_OBSERVATION
+from app.routers.location import get_latest_obvservation
+
+client = TestClient(app)
+
+def test_concurrent_calls_share_one_fetch():
+    """Callers with the same key await one fetch; other keys fetch on their own."""
+    flight = SingleFlight("test")
+    fetched = []
+
+    def fetcher(key):
+        async def fetch():
+            fetched.append(key)
+            await asyncio.sleep(0.01)
+            return key.upper()
+        return fetch
+
+    async def run():
+        return await asyncio.gather(*[flight.do(key, fetcher(key)) for key in ["a", "a", "a", "b"]])
+
+    assert asyncio.run(run()) == ["A", "A", "A", "B"]
+    assert sorted(fetched) == ["a", "b"]
+    assert flight.stats() == {"calls": 2, "coalesced": 2, "in_flight": 0}
+
+def test_settled_keys_fetch_again():
+    flight = SingleFlight("test")
+
+    async def fetch():
+        return 1
+
+    async def run():
+        await flight.do("a", fetch)
+        await flight.do("a", fetch)
+
+    asyncio.run(run())
+    assert flight.calls == 2 and flight.coalesced == 0
+
+def test_errors_reach_every_waiter():
+    flight = SingleFlight("test")
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream down")
+
+    async def run():
+        return await asyncio.gather(flight.do("a", fetch), flight.do("a", fetch), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flight.calls == 1
+
+def test_cancelled_waiter_leaves_fetch_running():
+    """One caller giving up does not cancel the fetch the others are waiting on."""
+    flight = SingleFlight("test")
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def run():
+        impatient = asyncio.ensure_future(flight.do("a", fetch))
+        patient = asyncio.ensure_future(flight.do("a", fetch))
+        await asyncio.sleep(0.01)
+        impatient.cancel()
+        return await patient
+
+    assert asyncio.run(run()) == "done"
+
+def test_latest_observation_coalesced_upstream():
+    """Concurrent latest-observation requests for one buoy hit NDBC once."""
+    hits = []
+
+    async def handler(request):
+        hits.append(request.url.path)
+        await asyncio.sleep(0.01)
+        return httpx.Response(404)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as ndbc:
+            return await asyncio.gather(*[get_latest_obvservation("46042", ndbc) for _ in range(5)])
+
+    single_flight.reset()
+    assert asyncio.run(run()) == [None] * 5
+    assert len(hits) == 1
+    assert single_flight.group(NDBC_LATEST_OBSERVATION).stats()["coalesced"] == 4
+
+def test_cache_status_reports_single_flight():
+    single_flight.group(NDBC_LATEST_OBSERVATION)
+    response = client.get("/api/v1/cache/status")
+    assert response.status_code == 200
+    assert set(response.json()["single_flight"][NDBC_LATEST_OBSERVATION]) == {"calls", "coalesced", "in_flight"}
@@ -0,0 +1,116 @@
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app import models
+from app.main import app
+from app.routers.location import parse_buoy_coordinates
+from app.services import spatial_index
+
+client = TestClient(app)
+
+@pytest.fixture
+def spatial_db(memory_db):
+    """An in-memory SQLite database with the R*Tree index and a few places."""
+    memory_db.add_all([
+        models.SpotLocation(id=1, name="Steamer Lane", timezone="America/Los_Angeles", latitude=36.9519, longitude=-122.0308, subregion_name="Santa Cruz", slug="steamer-lane"),
+        models.SpotLocation(id=2, name="Malibu", timezone="America/Los_Angeles", latitude=34.0359, longitude=-118.6775, subregion_name="Los Angeles", slug="malibu"),
+        models.SpotLocation(id=3, name="Pipeline", timezone="Pacific/Honolulu", latitude=21.6650, longitude=-158.0530, subregion_name="North Shore", slug="pipeline"),
+        models.BuoyLocation(id=1, location_id="46042", name="Monterey", location="36.785 N 122.396 W", latitude=36.785, longitude=-122.396, active=True),
+        models.BuoyLocation(id=2, location_id="46221", name="Santa Monica Bay", location="33.855 N 118.633 W", latitude=33.855, longitude=-118.633, active=True),
+        models.BuoyLocation(id=3, location_id="46012", name="Half Moon Bay", location="37.356 N 122.881 W", latitude=37.356, longitude=-122.881, active=False),
+        models.TideStation(id=1, station_id="9413745", station_name="Santa Cruz", latitude=36.9583, longitude=-122.0173),
+    ])
+    memory_db.commit()
+    return memory_db
+
+NORCAL_BBOX = (-123.0, 36.0, -121.0, 38.0)
+
+def test_parse_bbox():
+    """bbox strings parse to (west, south, east, north)."""
+    assert spatial_index.parse_bbox("-123,36,-121,38") == NORCAL_BBOX
+    for bad in ["-123,36,-121", "a,b,c,d", "-123,38,-121,36", "-190,0,0,10"]:
+        with pytest.raises(ValueError):
+            spatial_index.parse_bbox(bad)
+
+def test_spots_within_bbox(spatial_db):
+    """Only spots inside the box are returned."""
+    spots = spatial_index.spots_within(spatial_db, NORCAL_BBOX)
+    assert [s.slug for s in spots] == ["steamer-lane"]
+
+def test_triggers_follow_spot_writes(spatial_db):
+    """Inserting, moving and deleting spots keeps the R*Tree in sync."""
+    spatial_db.add(models.SpotLocation(id=4, name="Mavericks", timezone="America/Los_Angeles", latitude=37.4950, longitude=-122.4970, subregion_name="San Mateo", slug="mavericks"))
+    malibu = spatial_db.query(models.SpotLocation).filter(models.SpotLocation.id == 2).first()
+    malibu.latitude, malibu.longitude = 36.6, -121.9
+    spatial_db.commit()
+    assert sorted(s.slug for s in spatial_index.spots_within(spatial_db, NORCAL_BBOX)) == ["malibu", "mavericks", "steamer-lane"]
+
+    spatial_db.query(models.SpotLocation).filter(models.SpotLocation.id == 4).delete()
+    spatial_db.commit()
+    assert "mavericks" not in [s.slug for s in spatial_index.spots_within(spatial_db, NORCAL_BBOX)]
+
+def test_bbox_across_antimeridian(spatial_db):
+    """A viewport that wraps past 180 degrees still matches."""
+    spots = spatial_index.spots_within(spatial_db, (170.0, 15.0, -150.0, 30.0))
+    assert [s.slug for s in spots] == ["pipeline"]
+
+def test_buoys_within_skips_inactive(spatial_db):
+    """Inactive buoys are not returned."""
+    buoys = spatial_index.buoys_within(spatial_db, NORCAL_BBOX)
+    assert [b.location_id for b in buoys] == ["46042"]
+
+def test_triggers_follow_buoy_writes(spatial_db):
+    """Buoy moves and deletes are mirrored by triggers on the coordinate columns."""
+    buoy = spatial_db.query(models.BuoyLocation).filter(models.BuoyLocation.id == 2).first()
+    buoy.latitude, buoy.longitude = 36.9, -122.1
+    spatial_db.commit()
+    assert sorted(b.location_id for b in spatial_index.buoys_within(spatial_db, NORCAL_BBOX)) == ["46042", "46221"]
+
+    spatial_db.query(models.BuoyLocation).filter(models.BuoyLocation.id == 1).delete()
+    spatial_db.commit()
+    assert [b.location_id for b in spatial_index.buoys_within(spatial_db, NORCAL_BBOX)] == ["46221"]
+
+def test_parse_buoy_coordinates():
+    """Buoy location text is parsed once on write, and bad text is rejected there."""
+    assert parse_buoy_coordinates("36.785 N 122.396 W") == {"latitude": 36.785, "longitude": -122.396}
+    assert parse_buoy_coordinates(None) == {"latitude": None, "longitude": None}
+    with pytest.raises(HTTPException) as exc:
+        parse_buoy_coordinates("somewhere off Monterey")
+    assert exc.value.status_code == 422
+
+def test_tide_stations_within(spatial_db):
+    """Tide stations are indexed by trigger too."""
+    assert [t.station_id for t in spatial_index.tide_stations_within(spatial_db, NORCAL_BBOX)] == ["9413745"]
+
+def test_spots_within_endpoint(spatial_db):
+    """GET /spots/within answers viewport queries."""
+    response = client.get("/api/v1/spots/within?bbox=-123,36,-121,38")
+    assert response.status_code == 200
+    assert [s["slug"] for s in response.json()] == ["steamer-lane"]
+
+def test_locations_within_endpoint(spatial_db):
+    """GET /locations/within answers viewport queries."""
+    response = client.get("/api/v1/locations/within?bbox=-123,36,-121,38")
+    assert response.status_code == 200
+    assert [b["location_id"] for b in response.json()] == ["46042"]
+
+def test_within_endpoint_errors(spatial_db):
+    """Bad boxes are 400s and empty viewports are 404s."""
+    assert client.get("/api/v1/spots/within?bbox=nope").status_code == 400
+    assert client.get("/api/v1/spots/within?bbox=0,0,1,1").status_code == 404
+    assert client.get("/api/v1/locations/within?bbox=0,0,1,1").status_code == 404
+
+def test_startup_resyncs_only_drifted_indexes(spatial_db):
+    """A second ensure_spatial_index leaves an in-sync R*Tree alone and rebuilds a drifted one."""
+    engine = spatial_db.get_bind()
+    spatial_db.execute(text("UPDATE spot_location_rtree SET min_lat = 0, max_lat = 0 WHERE id = 1"))
+    spatial_db.commit()
+    spatial_index.ensure_spatial_index(engine)
+    assert spatial_index.spots_within(spatial_db, NORCAL_BBOX) == []
+
+    spatial_db.execute(text("DELETE FROM spot_location_rtree WHERE id = 3"))
+    spatial_db.commit()
+    spatial_index.ensure_spatial_index(engine)
+    assert [s.slug for s in spatial_index.spots_within(spatial_db, NORCAL_BBOX)] == ["steamer-lane"]
@@ -0,0 +1,122 @@
+import asyncio
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.clients.noaa_tides_client import NOAATidesClient
+from app.clients.tide_cache import TideCache, tide_cache_key
+
+client = TestClient(app)
+
+HILO = {"station": "9414290", "product": "predictions", "datum": "MLLW", "date": "today",
+        "time_zone": "gmt", "interval": "hilo", "units": "english"}
+WATER_LEVEL = dict(HILO, product="water_level", date="latest", interval="hour")
+
+def counting_fetch(values):
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        value = values[len(calls) - 1]
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    return fetch, calls
+
+def test_today_resolves_to_the_utc_day():
+    """A GMT "today" is keyed by the calendar day, so it rolls over at midnight."""
+    before = tide_cache_key(HILO, datetime(2026, 10, 17, 23, 59, tzinfo=timezone.utc))
+    after = tide_cache_key(HILO, datetime(2026, 10, 18, 0, 1, tzinfo=timezone.utc))
+
+    assert before[3] == "20261017"
+    assert after[3] == "20261018"
+
+def test_predictions_expire_at_next_utc_midnight():
+    cache = TideCache(8, ttl_seconds=360)
+    now = datetime(2026, 10, 17, 15, 30, tzinfo=timezone.utc)
+
+    assert cache.expires_at(HILO, now) == datetime(2026, 10, 18, tzinfo=timezone.utc).timestamp()
+    assert cache.expires_at(WATER_LEVEL, now) == now.timestamp() + 360
+    # a station-local "today" rolls over at an unknown offset
+    assert cache.expires_at(dict(HILO, time_zone="lst_ldt"), now) == now.timestamp() + 360
+
+def test_predictions_are_served_from_cache():
+    cache = TideCache(8, ttl_seconds=360)
+    fetch, calls = counting_fetch([{"predictions": [1]}, {"predictions": [2]}])
+
+    async def run():
+        return [await cache.get(HILO, fetch), await cache.get(dict(HILO), fetch)]
+
+    assert asyncio.run(run()) == [{"predictions": [1]}] * 2
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+
+def test_water_levels_refetch_after_ttl():
+    cache = TideCache(8, ttl_seconds=0)
+    fetch, calls = counting_fetch([{"data": [1]}, {"data": [2]}])
+
+    async def run():
+        return [await cache.get(WATER_LEVEL, fetch), await cache.get(WATER_LEVEL, fetch)]
+
+    assert asyncio.run(run()) == [{"data": [1]}, {"data": [2]}]
+    assert len(calls) == 2
+
+def test_failures_are_not_cached():
+    cache = TideCache(8, ttl_seconds=360)
+    fetch, calls = counting_fetch([Exception("NOAA API error: 503"), {"predictions": [1]}])
+
+    async def run():
+        with pytest.raises(Exception):
+            await cache.get(HILO, fetch)
+        return await cache.get(HILO, fetch)
+
+    assert asyncio.run(run()) == {"predictions": [1]}
+    assert len(calls) == 2
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TideCache(2, ttl_seconds=360)
+    fetch, calls = counting_fetch([{"n": i} for i in range(4)])
+
+    async def run():
+        for station in ["a", "b", "a", "c", "a"]:
+            await cache.get(dict(HILO, station=station), fetch)
+
+    asyncio.run(run())
+    # "b" was evicted when "c" arrived; "a" stayed hot
+    assert len(calls) == 3
+    assert cache.stats()["size"] == 2
+
+def test_tides_route_reuses_cached_predictions():
+    """Repeat /tides calls for a station are answered without going back to CO-OPS."""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"predictions": [{"t": "2026-10-17 04:12", "v": "5.1", "type": "H"}]})
+
+    tides = NOAATidesClient(client=httpx.AsyncClient(transport=httpx.MockTransport(handler)), cache=TideCache(8, 360))
+    with patch("app.services.tides_service.tides_client", tides):
+        first = client.get("/api/v1/tides?station=9414290")
+        second = client.get("/api/v1/tides?station=9414290")
+
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+    assert len(requests) == 1
+
+def test_error_bodies_are_not_cached():
+    """CO-OPS reports failures as 200 with an error body; those are refetched."""
+    cache = TideCache(8, ttl_seconds=360)
+    error = {"error": {"message": "No Predictions data was found."}}
+    fetch, calls = counting_fetch([error, {"predictions": [1]}])
+
+    async def run():
+        return [await cache.get(HILO, fetch), await cache.get(HILO, fetch)]
+
+    assert asyncio.run(run()) == [error, {"predictions": [1]}]
+    assert len(calls) == 2
+    assert cache.stats()["size"] == 1
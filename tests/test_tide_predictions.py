@@ -0,0 +1,125 @@
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app import models
+from app.main import app
+from app.clients.noaa_tides_client import NOAATidesClient
+from app.clients.tide_cache import TideCache
+from app.services.tide_predictions import TidePredictionService, prediction_rows
+
+client = TestClient(app)
+
+TODAY = datetime(datetime.utcnow().year, datetime.utcnow().month, datetime.utcnow().day)
+
+def coops_predictions(request):
+    """Fake CO-OPS: two hilo points or four hourly points per requested day."""
+    params = request.url.params
+    if params["station"] == "0000000":
+        return {"error": {"message": "No Predictions data was found."}}
+    begin = datetime.strptime(params["begin_date"], "%Y%m%d")
+    days = (datetime.strptime(params["end_date"], "%Y%m%d") - begin).days + 1
+    predictions = []
+    for day in range(days):
+        if params["interval"] == "hilo":
+            predictions.append({"t": (begin + timedelta(days=day, hours=4)).strftime("%Y-%m-%d %H:%M"), "v": "5.123", "type": "H"})
+            predictions.append({"t": (begin + timedelta(days=day, hours=10)).strftime("%Y-%m-%d %H:%M"), "v": "-0.250", "type": "L"})
+        else:
+            predictions.extend({"t": (begin + timedelta(days=day, hours=h)).strftime("%Y-%m-%d %H:%M"), "v": "2.000"} for h in range(4))
+    return {"predictions": predictions}
+
+def tides_client(handler):
+    return NOAATidesClient(client=httpx.AsyncClient(transport=httpx.MockTransport(handler)), cache=TideCache(64, 360))
+
+@pytest.fixture
+def tides_db(memory_db):
+    memory_db.add_all([
+        models.TideStation(id=1, station_id="9413745", station_name="Santa Cruz", latitude=36.9583, longitude=-122.0173),
+        models.TideStation(id=2, station_id="9410840", station_name="Santa Monica", latitude=34.0083, longitude=-118.5),
+    ])
+    memory_db.commit()
+    return memory_db
+
+def test_prediction_rows_rejects_error_body():
+    with pytest.raises(ValueError, match="No Predictions"):
+        prediction_rows("0000000", "hilo", {"error": {"message": "No Predictions data was found."}})
+
+def test_precompute_stores_every_station(tides_db):
+    service = TidePredictionService(tides_db, tides_client(lambda request: httpx.Response(200, json=coops_predictions(request))))
+
+    count = asyncio.run(service.precompute(days=3, today=TODAY))
+
+    # 2 stations x 3 days x (2 hilo + 4 hourly)
+    assert count == 36
+    assert tides_db.query(models.TidePrediction).filter(models.TidePrediction.interval == "hilo").count() == 12
+    assert service.get_day("9413745", "hilo", TODAY) == [
+        {"t": (TODAY + timedelta(hours=4)).strftime("%Y-%m-%d %H:%M"), "v": "5.123", "type": "H"},
+        {"t": (TODAY + timedelta(hours=10)).strftime("%Y-%m-%d %H:%M"), "v": "-0.250", "type": "L"},
+    ]
+
+def test_precompute_bounds_concurrency(tides_db):
+    in_flight = {"now": 0, "peak": 0}
+
+    async def handler(request):
+        in_flight["now"] += 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+        return httpx.Response(200, json=coops_predictions(request))
+
+    service = TidePredictionService(tides_db, tides_client(handler))
+    asyncio.run(service.precompute(station_ids=[str(9410000 + i) for i in range(10)], days=1, concurrency=3, today=TODAY))
+
+    assert in_flight["peak"] == 3
+
+def test_failed_station_keeps_previous_rows(tides_db):
+    service = TidePredictionService(tides_db, tides_client(lambda request: httpx.Response(200, json=coops_predictions(request))))
+    asyncio.run(service.precompute(station_ids=["9413745"], days=1, today=TODAY))
+
+    failing = TidePredictionService(tides_db, tides_client(lambda request: httpx.Response(503)))
+    assert asyncio.run(failing.precompute(station_ids=["9413745"], days=1, today=TODAY)) == 0
+    assert len(service.get_day("9413745", "h", TODAY)) == 4
+
+def test_tides_summary_served_without_upstream_call(tides_db):
+    service = TidePredictionService(tides_db, tides_client(lambda request: httpx.Response(200, json=coops_predictions(request))))
+    asyncio.run(service.precompute(days=1, today=TODAY))
+
+    def unreachable(request):
+        raise AssertionError("/tides went upstream")
+
+    with patch("app.services.tides_service.tides_client", tides_client(unreachable)):
+        response = client.get("/api/v1/tides?station=9410840")
+
+    assert response.status_code == 200
+    assert [p["type"] for p in response.json()["predictions"]] == ["H", "L"]
+
+def test_tides_summary_falls_back_for_uncovered_station(tides_db):
+    """A station the precompute has not covered is still answered from CO-OPS."""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"predictions": [{"t": "2026-10-17 04:12", "v": "5.123", "type": "H"}]})
+
+    with patch("app.services.tides_service.tides_client", tides_client(handler)):
+        response = client.get("/api/v1/tides?station=9413745")
+
+    assert response.status_code == 200
+    assert len(requests) == 1
+    assert requests[0].url.params["interval"] == "hilo"
+
+def test_predictions_endpoint(tides_db):
+    service = TidePredictionService(tides_db, tides_client(lambda request: httpx.Response(200, json=coops_predictions(request))))
+    asyncio.run(service.precompute(days=3, today=TODAY))
+
+    hourly = client.get("/api/v1/tides/predictions?station=9413745&interval=h&days=2")
+    missing = client.get("/api/v1/tides/predictions?station=9999999")
+    unknown = client.get("/api/v1/tides/predictions?station=9413745&interval=6")
+
+    assert hourly.status_code == 200
+    assert len(hourly.json()["predictions"]) == 8
+    assert missing.status_code == unknown.status_code == 404
@@ -0,0 +1,85 @@
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app import models
+from app.main import app
+from app.services.geojson_cache import build_spot_features
+from app.services.tile_index import TileIndex, is_valid_tile, lnglat_to_world, world_to_tile
+
+client = TestClient(app)
+
+def _feature(name, lng, lat):
+    return {"type": "Feature", "geometry": {"type": "Point", "coordinates": [lng, lat]}, "properties": {"name": name}}
+
+FEATURES = [
+    _feature("Steamer Lane", -122.0308, 36.9519),
+    _feature("Cowells", -122.0262, 36.9614),
+    _feature("Pleasure Point", -121.9700, 36.9560),
+    _feature("Pipeline", -158.0530, 21.6650),
+]
+
+def _tile_for(z, lng, lat):
+    return world_to_tile(*lnglat_to_world(lng, lat), z)
+
+def test_low_zoom_clusters_nearby_points():
+    """At low zoom the Santa Cruz spots collapse into one cluster."""
+    index = TileIndex(FEATURES)
+    assert index.get_tile(0, 0, 0)["features"][0]["properties"]["point_count"] == 4
+
+    features = index.get_tile(4, *_tile_for(4, -122.0308, 36.9519))["features"]
+    clusters = [f for f in features if f["properties"].get("cluster")]
+    assert len(clusters) == 1
+    assert clusters[0]["properties"]["point_count"] == 3
+    west, south, east, north = clusters[0]["properties"]["bbox"]
+    assert west <= -122.0308 and east >= -121.97 and south <= 36.9519 and north >= 36.9614
+
+def test_high_zoom_returns_points():
+    """Past the cluster zoom every point is returned as-is."""
+    index = TileIndex(FEATURES)
+    x, y = _tile_for(14, -122.0308, 36.9519)
+    names = [f["properties"]["name"] for f in index.get_tile(14, x, y)["features"]]
+    assert "Steamer Lane" in names
+    assert all(not f["properties"].get("cluster") for f in index.get_tile(14, x, y)["features"])
+
+def test_over_zoom_filters_parent_tile():
+    """Zoom levels past the precomputed max are cut from the parent tile."""
+    index = TileIndex(FEATURES)
+    x, y = _tile_for(20, -122.0262, 36.9614)
+    assert [f["properties"]["name"] for f in index.get_tile(20, x, y)["features"]] == ["Cowells"]
+    assert index.get_tile(20, x + 1, y)["features"] == []
+
+def test_is_valid_tile():
+    assert is_valid_tile(0, 0, 0)
+    assert is_valid_tile(3, 7, 7)
+    assert not is_valid_tile(3, 8, 0)
+    assert not is_valid_tile(-1, 0, 0)
+    assert not is_valid_tile(23, 0, 0)
+
+@patch("app.routers.location.tile_index")
+def test_spots_tile_endpoint(mock_tile_index):
+    """The endpoint serves the precomputed tile, and empty tiles are 200s."""
+    mock_tile_index.get.return_value = TileIndex(FEATURES)
+    response = client.get("/api/v1/spots/tiles/0/0/0")
+    assert response.status_code == 200
+    assert response.json()["type"] == "FeatureCollection"
+    assert response.json()["features"][0]["properties"]["point_count"] == 4
+
+    response = client.get("/api/v1/locations/tiles/1/0/1")
+    assert response.status_code == 200
+    assert response.json()["features"] == []
+
+def test_tile_endpoint_rejects_invalid_tiles():
+    assert client.get("/api/v1/spots/tiles/2/4/0").status_code == 400
+    assert client.get("/api/v1/locations/tiles/30/0/0").status_code == 400
+
+def test_spot_tiles_skip_spots_without_coordinates(memory_db):
+    """A spot with NULL coordinates is left out instead of failing the whole index."""
+    memory_db.add_all([
+        models.SpotLocation(id=1, name="Steamer Lane", timezone="America/Los_Angeles", latitude=36.9519, longitude=-122.0308, subregion_name="Santa Cruz", slug="steamer-lane"),
+        models.SpotLocation(id=2, name="Unmapped", timezone="America/Los_Angeles", latitude=None, longitude=None, subregion_name="Santa Cruz", slug="unmapped"),
+    ])
+    memory_db.commit()
+
+    index = TileIndex(build_spot_features(memory_db))
+    assert index.get_tile(0, 0, 0)["features"][0]["properties"]["name"] == "Steamer Lane"
@@ -5,6 +5,8 @@ import json
 import sqlite3 as sql
 from dotenv import load_dotenv
 
+from app.classes.buoylocation import BuoyLocation
+
 # POSTGRES connection string, not needed for sqlite
 load_dotenv()
 
@@ -20,6 +22,15 @@ load_dotenv()
 database = os.environ.get('SQLITE_DB')
 conn = sql.connect(database, check_same_thread=False)
 
+def parse_coordinates(row):
+    '''latitude/longitude from the location text; the geo index, tiles and neighbors skip buoys without them'''
+    try:
+        lng, lat = BuoyLocation(row['location'] or '', '', '', '', '').parse_location()
+    except ValueError:
+        print(f"buoy {row['location_id']} has an unparseable location {row['location']!r}, leaving coordinates empty")
+        return None, None
+    return lat, lng
+
 def import_locations(json_data_file):
     '''runs the import from our json file'''
     if not json_data_file:
@@ -29,10 +40,11 @@ def import_locations(json_data_file):
         data = json.load(data_file)
         for row in data:
             try:
-                cursor.execute('''INSERT INTO buoy_location(location_id, name, url, active, description, location, weight)
-                    VALUES(?,?,?,?,?,?,?)''',
+                lat, lng = parse_coordinates(row)
+                cursor.execute('''INSERT INTO buoy_location(location_id, name, url, active, description, location, weight, latitude, longitude)
+                    VALUES(?,?,?,?,?,?,?,?,?)''',
                     (
-                        row['location_id'], row['name'], row['url'], True, row['description'], row['location'], row['weight'] or 0
+                        row['location_id'], row['name'], row['url'], True, row['description'], row['location'], row['weight'] or 0, lat, lng
                     ))
             except Exception as error:
                 print(f"Error inserting row: {error}")
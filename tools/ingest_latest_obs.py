@@ -0,0 +1,29 @@
+import logging
+
+import httpx
+
+from app.database import SessionLocal
+from app.services.latest_obs_ingest import LATEST_OBS_URL, LatestObsIngestService
+
+'''
+Write a summary for every active buoy from NDBC's combined latest_obs.txt,
+one download instead of a request per station. Run from the repo root:
+
+    python3 -m tools.ingest_latest_obs
+'''
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    logging.info("Starting ingest_latest_obs.py")
+    r = httpx.get(LATEST_OBS_URL, headers={"User-Agent": "surfe-diem.com"}, timeout=30.0, follow_redirects=True)
+    r.raise_for_status()
+    db = SessionLocal()
+    try:
+        count = LatestObsIngestService(db).ingest(r.text)
+        logging.info(f"Wrote {count} summaries")
+    finally:
+        db.close()
+    logging.info("Finished ingest_latest_obs.py")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,27 @@
+import asyncio
+import logging
+
+from app.database import SessionLocal
+from app.services.tide_predictions import TidePredictionService
+
+'''
+Fetch the next TIDE_PRECOMPUTE_DAYS days of hilo and hourly predictions for
+every tide station into the tide_prediction table, which /tides serves from.
+Run nightly from the repo root:
+
+    python3 -m tools.precompute_tide_predictions
+'''
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    logging.info("Starting precompute_tide_predictions.py")
+    db = SessionLocal()
+    try:
+        count = asyncio.run(TidePredictionService(db).precompute())
+        logging.info(f"Wrote {count} tide predictions")
+    finally:
+        db.close()
+    logging.info("Finished precompute_tide_predictions.py")
+
+if __name__ == '__main__':
+    main()
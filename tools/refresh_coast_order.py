@@ -0,0 +1,25 @@
+import logging
+
+from app.database import SessionLocal
+from app.services.coast_order import CoastOrderService
+
+'''
+Recompute the along-coast ordering (coast_rank, coast_position) of every surf
+spot. Run from the repo root:
+
+    python3 -m tools.refresh_coast_order
+'''
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    logging.info("Starting refresh_coast_order.py")
+    db = SessionLocal()
+    try:
+        count = CoastOrderService(db).refresh()
+        logging.info(f"Ordered {count} spots")
+    finally:
+        db.close()
+    logging.info("Finished refresh_coast_order.py")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,25 @@
+import logging
+
+from app.database import SessionLocal
+from app.services.neighbors_service import NeighborsService
+
+'''
+Recompute the place_neighbor table: the nearest buoys and tide station for
+every surf spot and active buoy. Run from the repo root:
+
+    python3 -m tools.refresh_place_neighbors
+'''
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    logging.info("Starting refresh_place_neighbors.py")
+    db = SessionLocal()
+    try:
+        count = NeighborsService(db).refresh_all()
+        logging.info(f"Wrote {count} place_neighbor rows")
+    finally:
+        db.close()
+    logging.info("Finished refresh_place_neighbors.py")
+
+if __name__ == '__main__':
+    main()